@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""
+Aikaan sidottu animaatio: kiinteä logiikka-askel ja piirron interpolointi.
+
+Pelilogiikka päivitetään aina config.LOGIC_STEP_MS millisekunnin askelin
+(ruudun todellinen kesto kerätään akkuun), ja piirto interpoloi kahden
+viimeisen tilan välillä kertoimella alpha. Kierroksen kesto pysyy näin samana
+riippumatta siitä, piirtääkö laite 20, 30 vai 60 ruutua sekunnissa.
+"""
+
+import config
+
+
+def linear(t):
+    return t
+
+
+def ease_in_quad(t):
+    return t * t
+
+
+def lerp(a, b, t):
+    return a + (b - a) * t
+
+
+class FixedStepClock:
+    """
+    pygame.time.Clock + kiinteä askel. tick() odottaa ruudun (config.FPS) ja
+    palauttaa ajettavien logiikka-askelten määrän; alpha = osuus seuraavasta askeleesta.
+    """
+
+    def __init__(self, clock, fps=None, step_ms=None, max_frame_ms=None):
+        self.clock = clock
+        self.fps = config.FPS if fps is None else fps
+        self.step_ms = config.LOGIC_STEP_MS if step_ms is None else step_ms
+        # Pitkä katko (esim. latausta) ei saa ajaa satoja askelia kerralla
+        self.max_frame_ms = config.MAX_FRAME_MS if max_frame_ms is None else max_frame_ms
+        self.frame_ms = 0
+        self.accumulator = 0.0
+        self.alpha = 0.0
+
+    def tick(self):
+        self.frame_ms = self.clock.tick(self.fps)
+        self.accumulator += min(self.frame_ms, self.max_frame_ms)
+        steps = int(self.accumulator // self.step_ms)
+        self.accumulator -= steps * self.step_ms
+        self.alpha = self.accumulator / self.step_ms
+        return steps
+
+    def resync(self):
+        """Odotuksen (idle.IDLE) jälkeen: odotettua aikaa ei ajeta logiikka-askelina."""
+        self.clock.tick()
+
+
+class Tween:
+    """
+    0..1-eteneminen ajassa: update(dt_ms) logiikka-askeleella, progress(alpha)
+    ja value(alpha) piirrossa (interpoloitu edellisen ja nykyisen askeleen välillä).
+    """
+
+    def __init__(self, duration_ms, delay_ms=0, ease=linear):
+        self.duration_ms = duration_ms
+        self.delay_ms = delay_ms
+        self.ease = ease
+        self.elapsed = 0.0
+        self.prev_elapsed = 0.0
+
+    @property
+    def end_ms(self):
+        return self.delay_ms + self.duration_ms
+
+    @property
+    def done(self):
+        return self.elapsed >= self.end_ms
+
+    def update(self, dt_ms):
+        self.prev_elapsed = self.elapsed
+        self.elapsed = min(self.elapsed + dt_ms, self.end_ms)
+
+    def time(self, alpha=1.0):
+        """Interpoloitu kulunut aika (ms)."""
+        return lerp(self.prev_elapsed, self.elapsed, alpha)
+
+    def progress(self, alpha=1.0):
+        if self.duration_ms <= 0:
+            return 1.0 if self.time(alpha) >= self.delay_ms else 0.0
+        t = (self.time(alpha) - self.delay_ms) / self.duration_ms
+        return min(max(t, 0.0), 1.0)
+
+    def value(self, alpha=1.0):
+        return self.ease(self.progress(alpha))
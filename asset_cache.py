@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+"""
+Kuvien yhteinen välimuisti tavubudjetilla (korttiatlakset, kortin selät,
+minikortit, hedelmäkuvat ja rullanauhat).
+
+Jokainen merkintä kirjataan pintojensa tavumäärällä (leveys x korkeus x
+tavua pikselille); atlaksen alipinnat kuuluvat atlaksen merkintään. Kun
+config.ASSET_CACHE_MAX_BYTES ylittyy, poistetaan vähiten äskettäin käytetyt
+merkinnät (LRU). Käynnissä olevan pelin kuvat kiinnitetään (pin): niitä ei
+poisteta, vaikka budjetti ylittyisi. Avaimet ovat tupleja, joiden ensimmäinen
+kenttä on laji ("cards", "back", "mini", "fruit", "strip"); kiinnitys
+tehdään avaimen alkuosalla, esim. ("cards", 80, 112).
+
+config.ASSET_CACHE_OPAQUE_16BIT: läpinäkymättömät pinnat (ei pikselikohtaista
+alfaa) tallennetaan 16-bittisinä, jolloin ne vievät puolet muistista
+(hitaampi blit 32-bittiseen kohteeseen, joten oletuksena pois).
+
+Palautettuja pintoja ei saa muokata, vain blitata.
+"""
+
+from collections import OrderedDict
+
+import pygame
+
+import config
+
+
+def surface_bytes(surf):
+    """Pinnan pikselidatan koko tavuina."""
+    return surf.get_width() * surf.get_height() * surf.get_bytesize()
+
+
+def reduce_surface(surf):
+    """Läpinäkymätön pinta 16-bittiseksi (config.ASSET_CACHE_OPAQUE_16BIT), muuten sellaisenaan."""
+    if not config.ASSET_CACHE_OPAQUE_16BIT or surf.get_flags() & pygame.SRCALPHA or surf.get_bitsize() <= 16:
+        return surf
+    return surf.convert(16)
+
+
+class AssetCache:
+    def __init__(self, max_bytes=None):
+        self.max_bytes = config.ASSET_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+        self._entries = OrderedDict()  # avain -> (arvo, tavut)
+        self._pins = {}  # omistaja -> avainten alkuosat
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __contains__(self, key):
+        """Onko avain muistissa (ei päivitä LRU-järjestystä eikä tilastoja)."""
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """Arvo tai None (ohitus)."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, key, value, size=None):
+        """
+        Tallentaa arvon (Surface tai pintoja sisältävä rakenne, jolloin size
+        annetaan tavuina) ja poistaa vanhimpia budjetin ylittyessä. Palauttaa
+        arvon; budjettia suurempaa kiinnittämätöntä arvoa ei tallenneta.
+        """
+        if size is None:
+            size = surface_bytes(value)
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.bytes -= old[1]
+        if size > self.max_bytes and not self._pinned(key):
+            return value
+        self._entries[key] = (value, size)
+        self.bytes += size
+        self._evict()
+        return value
+
+    def discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.bytes -= entry[1]
+
+    def clear(self):
+        self._entries.clear()
+        self.bytes = 0
+
+    def pin(self, owner, *prefixes):
+        """Kiinnittää avaimet, jotka alkavat jollakin prefixes-tuplella (korvaa omistajan aiemmat)."""
+        self._pins[owner] = tuple(prefixes)
+
+    def unpin(self, owner):
+        """Vapauttaa omistajan kiinnitykset; budjetin ylitys poistetaan heti."""
+        if self._pins.pop(owner, None) is not None:
+            self._evict()
+
+    def _pinned(self, key):
+        for prefixes in self._pins.values():
+            for prefix in prefixes:
+                if key[:len(prefix)] == prefix:
+                    return True
+        return False
+
+    def _evict(self):
+        if self.bytes <= self.max_bytes:
+            return
+        for key in list(self._entries):
+            if self.bytes <= self.max_bytes:
+                break
+            if self._pinned(key):
+                continue
+            _, size = self._entries.pop(key)
+            self.bytes -= size
+            self.evictions += 1
+
+    def pinned_bytes(self):
+        return sum(size for key, (_, size) in self._entries.items() if self._pinned(key))
+
+    def stats(self):
+        """Koko, budjetti, kiinnitetyt tavut, osumat, ohitukset, osumaprosentti ja poistot."""
+        lookups = self.hits + self.misses
+        return {
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "pinned_bytes": self.pinned_bytes(),
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+        }
+
+    def report(self):
+        s = self.stats()
+        return (f"Kuvat {s['bytes'] / 1048576:.1f}/{s['max_bytes'] / 1048576:.0f} MB "
+                f"({s['entries']} kpl, kiinnitetty {s['pinned_bytes'] / 1048576:.1f} MB), "
+                f"osumat {100 * s['hit_rate']:.1f} %, poistot {s['evictions']}")
+
+
+ASSETS = AssetCache()
@@ -1,12 +1,18 @@
 # -*- coding: utf-8 -*-
 """Asetukset – video poker / 80-luku arcade -tyyli (sininen näyttö, keltainen teksti)."""
 
+import os
+
 SCREEN_WIDTH = 800
 SCREEN_HEIGHT = 480
 FULLSCREEN = False
 
-# Resoluutio: 1 = tarkka (ei skaalausta), 2 = pixel-art
+# Pixel-art: näyttötila pysyy SCREEN_WIDTH x SCREEN_HEIGHT, mutta kohtaus piirretään
+# PIXEL_SCALE kertaa pienempään kohteeseen (asettelu ja fontit skaalattuina) ja
+# skaalataan näytölle lähimmän naapurin menetelmällä (1 = ei skaalausta)
 PIXEL_SCALE = 1
+SCENE_WIDTH = SCREEN_WIDTH // PIXEL_SCALE
+SCENE_HEIGHT = SCREEN_HEIGHT // PIXEL_SCALE
 SCANLINE_ALPHA = 18
 
 # Video poker -tyyli: syvä sininen pelialue, keltainen teksti, vihreä/harmaa
@@ -39,6 +45,8 @@ COLOR_BUTTON_HOVER = COLOR_BUTTON_GREY_HOVER
 COLOR_BORDER_ALT = COLOR_CARD_BORDER
 
 MIN_BET = 1
+# Suurin panos per käsi / linja; pelipalvelin hylkää suuremmat (voitto mahtuu protokollan 32 bittiin)
+MAX_BET = 1000
 DEFAULT_CREDITS_ADD = 10
 
 # Fonttikoot natiiviresoluutiolla (800x480)
@@ -50,7 +58,112 @@ FONT_SIZE_SMALL = 18
 # Paytable-paneelin leveys (vasemmalla)
 PAYTABLE_PANEL_WIDTH = 200
 
-SHUFFLE_DURATION_FRAMES = 45
-DEAL_DELAY_FRAMES = 8
-SLOT_REEL_SPEED = 18
-SLOT_STOP_DELAY = 15
+# Ruudunpäivitys ja animaatiot (anim.py): logiikka kiinteällä askeleella, ajat millisekunteina
+FPS = 30
+LOGIC_STEP_MS = 1000 / 60
+MAX_FRAME_MS = 250  # pidempi ruutu (esim. lataus) lasketaan tämän mittaiseksi
+
+SHUFFLE_DURATION_MS = 1500
+DEAL_DELAY_MS = 267         # kortti kerrallaan
+POKER_RESULT_MS = 4000      # tulos näkyvissä ennen uutta jakoa
+SLOT_REEL_SPEED = 15        # symbolia sekunnissa
+SLOT_SPIN_MS = 1000         # ensimmäisen rullan pysäytys alkaa
+SLOT_STOP_DELAY_MS = 500    # seuraavat rullat tämän välein
+SLOT_REEL_HALF_LIFE_MS = 220  # pysähtyvän rullan nopeus puolittuu
+SLOT_RESULT_MS = 3000
+# Rullan liike-epäterävyys: sumennettu nauha (pikseliä, 0 = pois) tätä nopeammin pyörivälle rullalle
+SLOT_MOTION_BLUR_PX = 16
+SLOT_BLUR_MIN_SPEED = 8     # symbolia sekunnissa
+
+# Välimuistit (strategiataulukot, kuva-atlakset): projektin cache/-hakemisto
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache")
+
+# Pokerin optimistrategia (taulukko: python -m games.strategy)
+POKER_HINTS = True       # näytä optimi-HOLD "VIHJE"-merkinnöillä (H-näppäin = pidä vihjeen kortit)
+POKER_AUTO_HOLD = False  # valitse optimi-HOLD automaattisesti jaon jälkeen
+# Moniläpeli: pidetyt kortit kopioidaan N käteen (KÄDET-nappi vaihtaa jaon päätyttyä)
+POKER_HAND_COUNTS = (1, 3, 10, 50, 100)
+
+# Monilinjapeli 5x3 (games/lines.py): LINJAT-napin vaihtoehdot ja oletus, panos = MIN_BET per linja
+VIDEO_SLOT_LINE_COUNTS = (1, 5, 10, 20, 50)
+VIDEO_SLOT_LINES = 20
+
+# Tyhjäkäynti (idle.py): kun mikään ei animoidu, silmukka odottaa syötettä eikä piirrä FPS-tahdissa
+IDLE_WAIT = True
+IDLE_WAIT_MS = 1000        # pisin odotus ilman tapahtumia
+IDLE_ATTRACT_MIN = 5       # attract-tila näin monen minuutin tyhjäkäynnin jälkeen (0 = pois)
+IDLE_ATTRACT_FPS = 4
+IDLE_REPORT = True         # tulosta säästetty CPU-aika tunnin välein
+
+# Piirto: vain muuttuneet alueet näytölle (pygame.display.update(rects))
+DIRTY_RECTS = True
+DEBUG_DIRTY_RECTS = False  # piirrä päivitetyt alueet magentalla kehyksellä
+# Pelien ruudut kerätään piirtolistaan (ui.DrawList) ja viedään Surface.blits()-erinä
+DRAW_LIST = True
+# Vähintään näin suuri (px²) läpinäkymätön piirto karsii kokonaan alleen jäävät
+DRAW_OCCLUDER_MIN_AREA = 4096
+
+# Renderöityjen tekstien välimuistin enimmäiskoko (tavua), LRU-poisto
+TEXT_CACHE_MAX_BYTES = 2 * 1024 * 1024
+
+# Kuvavälimuistin (asset_cache.py) budjetti tavuina, LRU-poisto; käynnissä
+# olevan pelin kuvat kiinnitetään eikä niitä poisteta
+ASSET_CACHE_MAX_BYTES = 32 * 1024 * 1024
+# Läpinäkymättömät kuvat (kortin selät, rullanauhat) 16-bittisinä: puolet muistista, hitaampi blit
+ASSET_CACHE_OPAQUE_16BIT = False
+# Tulosta välimuistin koko, osumaprosentti ja poistot lopetettaessa
+ASSET_CACHE_REPORT = False
+
+# Kuvien esilataus valikossa: enintään näin monta ms ruutua kohden
+PREFETCH_BUDGET_MS = 4
+
+# Ruutuajan profilointi (profiler.py): F3 = p50/p95/p99-näkymä, F4 = CSV
+PROFILER_ENABLED = False  # kerää ruutuajat myös ilman näkymää
+PROFILER_FRAMES = 300     # rengaspuskurin koko (ruutua)
+PROFILER_CSV_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "profiles")
+
+# Pysyvä data (kierrospäiväkirja ym.): projektin data/-hakemisto, ei välimuistia
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+# Kierrospäiväkirja (journal.py, toisto: python -m tools.replay)
+JOURNAL_ENABLED = True
+JOURNAL_PATH = os.path.join(DATA_DIR, "rounds.jnl")
+JOURNAL_FLUSH_MS = 500   # kirjoituserän keräysaika taustasäikeessä
+JOURNAL_FSYNC = True
+
+# Creditien pysyvä tallennus (credits.py): loki kirjoitetaan ja fsyncataan kierroksen rajalla
+CREDITS_PERSIST = True
+CREDITS_PATH = os.path.join(DATA_DIR, "credits.wal")
+CREDITS_COMPACT_RECORDS = 1000  # näin monen tietueen jälkeen loki tiivistetään yhteen
+CREDITS_FSYNC = True
+
+# Kirjanpitomittarit (meters.py): coin-in/out, kierrokset ja osumat, minuutti-/tunti-/päivärenkaat
+METERS_ENABLED = True
+METERS_PATH = os.path.join(DATA_DIR, "meters.snap")
+METERS_SAVE_S = 60          # tilannekuva levylle enintään näin usein (ja lopetettaessa)
+
+# Progressiivinen jackpot (jackpot.py): yhteinen potti saman koneen peliprosesseille.
+# Voitto: Royal Flush (pokeri), 777 (hedelmäpeli) tai viisi 7:ää linjalla (videoslot).
+JACKPOT_ENABLED = True
+JACKPOT_SEED = 0                      # potin alkuarvo voiton jälkeen (credittejä, kasinon rahaa)
+JACKPOT_CONTRIBUTION_PERMILLE = 10    # panoksesta pottiin (promillea)
+JACKPOT_STRIPES = 64                  # laskureita jaetussa muistissa (prosessia kohden yksi)
+JACKPOT_SHM_PATH = None               # None = /dev/shm/retro_jackpot (tai data/jackpot.shm)
+JACKPOT_CHECKPOINT_PATH = os.path.join(DATA_DIR, "jackpot.ckpt")
+JACKPOT_CHECKPOINT_S = 10             # tilannekuva levylle kierroksen lopussa enintään näin usein (ja aina voiton jälkeen)
+
+# Satunnaisluvut (rng.py): pelin ja paikan omat virrat, puskurit täytetään taustasäikeessä
+RNG_SEED = None             # None = käyttöjärjestelmän entropia; kiinteä arvo vain testeihin
+RNG_BUFFER = 4096           # 64-bittisiä sanoja per puskuri
+RNG_HEALTH_WINDOW = 10000   # havaintoa (korttia, pyöräytystä) per khiin neliö -testi
+RNG_HEALTH_Z = 3.719        # hälytysraja normaalikvantiilina (p = 0,0001 per testi)
+RNG_REPORT = False          # yhteenveto lopetettaessa (hälytysten jälkeen aina stderriin)
+
+# Pelipalvelin (server.py): monen kaapin RNG, jako, pyöräytykset ja creditit yhdessä prosessissa.
+# SERVER_ENABLED = True: tämä kaappi on ohut asiakas (ei omaa päiväkirjaa eikä credit-lokia).
+SERVER_ENABLED = False
+SERVER_HOST = "127.0.0.1"
+SERVER_PORT = 7420
+SERVER_SEAT = 1             # kaapin paikkanumero palvelimella
+SERVER_TIMEOUT_S = 2.0
+SERVER_DATA_DIR = os.path.join(DATA_DIR, "server")  # palvelimen päiväkirja ja paikkojen credit-lokit
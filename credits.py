@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""
+Creditien ja mittarien pysyvä tallennus (kaatumisen kestävä).
+
+Tila (saldo ja kumulatiiviset mittarit) kirjoitetaan write-ahead-lokiin
+kiinteän mittaisina tilannekuvina, joissa on järjestysnumero ja CRC32.
+Muutokset kerätään muistiin update()-kutsuilla ja viedään levylle yhdellä
+commit()-kutsulla (write + fsync) kierroksen rajalla, ei joka ruudulla.
+Käynnistyksessä luetaan viimeinen ehjä tietue; katkennut loppu ohitetaan
+ja leikataan pois. Kun lokissa on config.CREDITS_COMPACT_RECORDS tietuetta,
+se korvataan atomisesti yhden tietueen tiedostolla (SD-kortin kuluminen).
+"""
+
+import os
+import struct
+import zlib
+
+import config
+
+_MAGIC = b"CWAL"
+_HEADER = struct.Struct("<4sHH")
+# seq, saldo, lisätyt, panokset, voitot, CRC32
+_RECORD = struct.Struct("<QqqqqI")
+_CRC_SPAN = _RECORD.size - 4
+
+
+def _pack(seq, credits, total_in, total_bet, total_won):
+    body = _RECORD.pack(seq, credits, total_in, total_bet, total_won, 0)[:_CRC_SPAN]
+    return body + struct.pack("<I", zlib.crc32(body))
+
+
+def _fsync_dir(path):
+    """Uudelleennimeämisen pysyvyys (POSIX); Windowsissa ei tarvita/onnistu."""
+    try:
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def read_last(path):
+    """(viimeinen ehjä tietue tai None, ehjän osan pituus tavuina) lokitiedostosta."""
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return None, 0
+    if len(data) < _HEADER.size or _HEADER.unpack_from(data)[0] != _MAGIC:
+        return None, 0
+    last = None
+    good = _HEADER.size
+    for offset in range(_HEADER.size, len(data) - _RECORD.size + 1, _RECORD.size):
+        fields = _RECORD.unpack_from(data, offset)
+        if zlib.crc32(data[offset:offset + _CRC_SPAN]) != fields[-1]:
+            break  # katkennut tai vioittunut kirjoitus: sitä seuraaviin ei luoteta
+        if last is not None and fields[0] <= last[0]:
+            break
+        last = fields[:-1]
+        good = offset + _RECORD.size
+    return last, good
+
+
+class CreditStore:
+    """Saldo (credits) ja mittarit total_in / total_bet / total_won."""
+
+    def __init__(self, path=None, compact_records=None, fsync=None):
+        self.path = config.CREDITS_PATH if path is None else path
+        self.compact_records = config.CREDITS_COMPACT_RECORDS if compact_records is None else compact_records
+        self.fsync = config.CREDITS_FSYNC if fsync is None else fsync
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._fd = None
+        last, good = read_last(self.path)
+        if last is None:
+            last = (0, 0, 0, 0, 0)
+        self.seq, self.credits, self.total_in, self.total_bet, self.total_won = last
+        self.dirty = False
+        if good == 0:
+            self._rewrite()
+        else:
+            if good != os.path.getsize(self.path):
+                with open(self.path, "r+b") as f:
+                    f.truncate(good)
+            self._records = (good - _HEADER.size) // _RECORD.size
+            self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | getattr(os, "O_BINARY", 0))
+
+    def update(self, credits, added=0, bet=0, won=0):
+        """Uusi saldo ja mittarien lisäykset muistiin (levylle commit()-kutsulla)."""
+        self.credits = credits
+        self.total_in += added
+        self.total_bet += bet
+        self.total_won += won
+        self.dirty = True
+
+    def commit(self):
+        """Kirjoittaa muuttuneen tilan lokiin ja fsyncaa. Ei tee mitään, jos muutoksia ei ole."""
+        if not self.dirty:
+            return
+        self.seq += 1
+        if self._records >= self.compact_records:
+            self._rewrite()
+        else:
+            os.write(self._fd, _pack(self.seq, self.credits, self.total_in, self.total_bet, self.total_won))
+            if self.fsync:
+                os.fsync(self._fd)
+            self._records += 1
+        self.dirty = False
+
+    def _rewrite(self):
+        """Tiivistys: uusi loki, jossa vain nykyinen tila; atominen korvaus."""
+        if self._fd is not None:
+            os.close(self._fd)
+        tmp = self.path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, 1, _RECORD.size))
+            f.write(_pack(self.seq, self.credits, self.total_in, self.total_bet, self.total_won))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        _fsync_dir(self.path)
+        self._records = 1
+        self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | getattr(os, "O_BINARY", 0))
+
+    def close(self):
+        if self._fd is None:
+            return
+        self.commit()
+        os.close(self._fd)
+        self._fd = None
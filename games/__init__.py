@@ -1,7 +1,16 @@
 # -*- coding: utf-8 -*-
 """Pelit: Pokeri ja hedelmäpeli (slot)."""
 
-from .slot import SlotGame
-from .poker import PokerGame
-
 __all__ = ["SlotGame", "PokerGame"]
+
+
+def __getattr__(name):
+    # Pelit tuodaan laiskasti, jotta pygamea tarvitsemattomat moduulit
+    # (esim. games.hand_eval) toimivat myös offline-työkaluissa.
+    if name == "SlotGame":
+        from .slot import SlotGame
+        return SlotGame
+    if name == "PokerGame":
+        from .poker import PokerGame
+        return PokerGame
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
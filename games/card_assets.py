@@ -1,11 +1,29 @@
 # -*- coding: utf-8 -*-
-"""Korttikuvausten lataus SVG-cards-1.3 -kansiosta."""
+"""
+Korttikuvausten lataus SVG-cards-1.3 -kansiosta.
 
+Kortit rasteroidaan kokoa kohden kerran yhdeksi atlakseksi (13 rankkia x 4 maata),
+joka tallennetaan config.CACHE_DIR-hakemistoon raakana RGBA-datana. Tiedoston
+nimessä on SVG-tiedostojen sisällön tiiviste ja koko, joten muuttuneet kuvat
+rasteroidaan uudelleen. Käynnistyksessä atlas luetaan yhdellä lukukerralla
+yhdeksi pinnaksi, ja kortit ovat sen alipintoja. cairosvg:tä tarvitaan vain,
+kun atlasta ei vielä ole.
+
+Atlakset, selät, minikortit ja reunustetut kortit ovat asset_cache.ASSETS-
+välimuistissa (avaimet "cards", "back", "mini" ja "framed"); poistettu atlas luetaan levyltä uudelleen.
+"""
+
+import glob
+import hashlib
 import os
+import struct
 from io import BytesIO
 
 import pygame
 
+import config
+from asset_cache import ASSETS, reduce_surface, surface_bytes
+
 # RANKS / SUITS vastaavat poker.py
 RANKS = "A 2 3 4 5 6 7 8 9 10 J Q K".split()
 SUITS = ["S", "H", "D", "C"]
@@ -16,8 +34,13 @@ RANK_TO_NAME = {
 }
 SUIT_TO_NAME = {"S": "spades", "H": "hearts", "D": "diamonds", "C": "clubs"}
 
-_CARD_CACHE = {}
 _CARDS_DIR = None
+_SVG_HASH = None
+_ATLAS_FAILED = set()  # koot, joille atlasta ei saatu (ei cairosvg:tä eikä välimuistia)
+
+# Atlastiedosto: otsake (tunniste, leveys, korkeus) + RGBA-rivit
+_ATLAS_MAGIC = b"CATL"
+_ATLAS_HEADER = struct.Struct("<4sHH")
 
 
 def _cards_dir():
@@ -38,37 +61,205 @@ def _svg_path(rank, suit):
     return path2 if os.path.isfile(path2) else path1
 
 
-def load_card_surface(rank, suit, width, height):
-    """Lataa yhden kortin pygame-Surface (width x height). Käyttää cairosvg."""
-    key = (rank, suit, width, height)
-    if key in _CARD_CACHE:
-        return _CARD_CACHE[key]
-    path = _svg_path(rank, suit)
+def _svg_hash():
+    """Kaikkien korttien SVG-sisällön tiiviste (lasketaan kerran)."""
+    global _SVG_HASH
+    if _SVG_HASH is None:
+        h = hashlib.sha1()
+        for rank in RANKS:
+            for suit in SUITS:
+                path = _svg_path(rank, suit)
+                h.update(os.path.basename(path).encode("utf-8"))
+                try:
+                    with open(path, "rb") as f:
+                        h.update(f.read())
+                except OSError:
+                    pass
+        _SVG_HASH = h.hexdigest()[:16]
+    return _SVG_HASH
+
+
+def _atlas_path(width, height):
+    return os.path.join(config.CACHE_DIR, f"cards_{width}x{height}_{_svg_hash()}.rgba")
+
+
+def rasterize_card_png(rank, suit, width, height):
+    """SVG -> PNG-tavut cairosvg:llä. Ei koske pygameen, joten ajettavissa säikeessä."""
+    import cairosvg
+    buf = BytesIO()
+    cairosvg.svg2png(url=_svg_path(rank, suit), output_width=width, output_height=height, write_to=buf)
+    return buf.getvalue()
+
+
+def _finish_surface(surf):
+    # convert_alpha vaatii näyttötilan; ilman sitä (työkalut) pinta sellaisenaan
+    return surf.convert_alpha() if pygame.display.get_surface() is not None else surf
+
+
+def _register_atlas(atlas, width, height):
+    """Kortit atlaksen alipintoina välimuistiin (koko = atlaksen koko). Palauttaa {(rank, suit): pinta}."""
+    faces = {
+        (rank, suit): atlas.subsurface((ri * width, si * height, width, height))
+        for ri, rank in enumerate(RANKS) for si, suit in enumerate(SUITS)
+    }
+    return ASSETS.put(("cards", width, height), faces, surface_bytes(atlas))
+
+
+def _read_atlas(width, height):
+    """Lukee atlaksen levyltä yhdellä read()-kutsulla. None jos puuttuu/viallinen."""
+    path = _atlas_path(width, height)
     try:
-        import cairosvg
-        buf = BytesIO()
-        cairosvg.svg2png(url=path, output_width=width, output_height=height, write_to=buf)
-        buf.seek(0)
-        surf = pygame.image.load(buf).convert_alpha()
-        _CARD_CACHE[key] = surf
-        return surf
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    size = (len(RANKS) * width, len(SUITS) * height)
+    if len(data) != _ATLAS_HEADER.size + size[0] * size[1] * 4:
+        return None
+    magic, w, h = _ATLAS_HEADER.unpack_from(data)
+    if magic != _ATLAS_MAGIC or (w, h) != (width, height):
+        return None
+    atlas = pygame.image.frombuffer(memoryview(data)[_ATLAS_HEADER.size:], size, "RGBA")
+    # frombuffer viittaa luettuun dataan: kopio näytön pikselimuotoon (ilman näyttöä sellaisenaan)
+    return atlas.convert_alpha() if pygame.display.get_surface() is not None else atlas.copy()
+
+
+def save_card_atlas(atlas, width, height):
+    """Kirjoittaa atlaksen välimuistiin (atominen korvaus) ja poistaa vanhentuneet."""
+    os.makedirs(config.CACHE_DIR, exist_ok=True)
+    path = _atlas_path(width, height)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(_ATLAS_HEADER.pack(_ATLAS_MAGIC, width, height))
+        f.write(pygame.image.tostring(atlas, "RGBA"))
+    os.replace(tmp, path)
+    for old in glob.glob(os.path.join(config.CACHE_DIR, f"cards_{width}x{height}_*.rgba")):
+        if old != path:
+            try:
+                os.remove(old)
+            except OSError:
+                pass
+
+
+def new_card_atlas(width, height):
+    return pygame.Surface((len(RANKS) * width, len(SUITS) * height), pygame.SRCALPHA)
+
+
+def blit_card_png(atlas, rank, suit, width, height, png):
+    """Sijoittaa rasteroidun kortin atlakseen oikealle paikalle."""
+    img = pygame.image.load(BytesIO(png))
+    atlas.blit(img, (RANKS.index(rank) * width, SUITS.index(suit) * height))
+
+
+def install_card_atlas(atlas, width, height, save=True):
+    """Valmis atlas käyttöön (kortit alipintoina) ja levylle (save=False: kutsuja tallentaa)."""
+    if save:
+        save_card_atlas(atlas, width, height)
+    _ATLAS_FAILED.discard((width, height))
+    return _register_atlas(_finish_surface(atlas), width, height)
+
+
+def mark_card_atlas_failed(width, height):
+    """Kokoa ei saatu rasteroitua: load_card_surface palauttaa None yrittämättä uudelleen."""
+    _ATLAS_FAILED.add((width, height))
+
+
+def _load_faces(width, height, build=True):
+    """Koon width x height kortit levyltä tai (build=True) rasteroimalla ja tallentamalla. None jos ei saatu."""
+    atlas = _read_atlas(width, height)
+    if atlas is not None:
+        return _register_atlas(atlas, width, height)
+    if not build or (width, height) in _ATLAS_FAILED:
+        return None
+    try:
+        atlas = new_card_atlas(width, height)
+        for rank in RANKS:
+            for suit in SUITS:
+                blit_card_png(atlas, rank, suit, width, height, rasterize_card_png(rank, suit, width, height))
+        return install_card_atlas(atlas, width, height)
     except Exception:
+        _ATLAS_FAILED.add((width, height))
         return None
 
 
-_BACK_CACHE = {}
+def load_card_atlas(width, height, build=True):
+    """
+    Varmistaa, että koon width x height kortit ovat muistissa: levyltä tai
+    (build=True) rasteroimalla kaikki kortit ja tallentamalla atlaksen.
+    """
+    if ("cards", width, height) in ASSETS:
+        return True
+    return _load_faces(width, height, build) is not None
+
+
+def load_card_surface(rank, suit, width, height):
+    """Lataa yhden kortin pygame-Surface (width x height) atlaksesta."""
+    faces = ASSETS.get(("cards", width, height))
+    if faces is None:
+        if (width, height) in _ATLAS_FAILED:
+            return None
+        faces = _load_faces(width, height)
+        if faces is None:
+            return None
+    return faces.get((rank, suit))
+
+
+# Kuvapuoli skaalataan minikortiksi tästä koosta (sama kuin pelin kortit)
+_MINI_SOURCE_SIZE = (80 // config.PIXEL_SCALE, 112 // config.PIXEL_SCALE)
+SUIT_COLORS = {"S": (40, 40, 40), "H": (200, 50, 50), "D": (200, 50, 50), "C": (40, 40, 40)}
+
+
+def load_mini_card_surface(rank, suit, width, height):
+    """
+    Pieni kortti moniläpelin käsiin. Isommat skaalataan kortin kuvasta; hyvin
+    pienet (tai ilman kuvia) piirretään valkoisena korttina maan värisellä merkillä.
+    """
+    key = ("mini", width, height, rank, suit)
+    surf = ASSETS.get(key)
+    if surf is not None:
+        return surf
+    face = load_card_surface(rank, suit, *_MINI_SOURCE_SIZE) if width >= 16 else None
+    if face is not None:
+        surf = pygame.transform.smoothscale(face, (width, height))
+    else:
+        surf = pygame.Surface((width, height))
+        surf.fill((235, 235, 240))
+        color = SUIT_COLORS.get(suit, (50, 50, 50))
+        mark = max(2, width // 2)
+        pygame.draw.rect(surf, color, ((width - mark) // 2, (height - mark) // 2, mark, mark))
+    return ASSETS.put(key, reduce_surface(surf))
 
 
 def load_card_back_surface(width, height):
     """Piirrettävä kortin selkä (yksinkertainen)."""
-    key = (width, height)
-    if key in _BACK_CACHE:
-        return _BACK_CACHE[key]
+    key = ("back", width, height)
+    surf = ASSETS.get(key)
+    if surf is not None:
+        return surf
     surf = pygame.Surface((width, height))
     surf.fill((40, 60, 100))
     for x in range(0, width, 10):
         for y in range(0, height, 10):
             pygame.draw.rect(surf, (60, 80, 120), (x + 1, y + 1, 6, 6))
     pygame.draw.rect(surf, (255, 255, 255), (0, 0, width, height), 2)
-    _BACK_CACHE[key] = surf
-    return surf
+    return ASSETS.put(key, reduce_surface(surf))
+
+
+def load_framed_card_surface(rank, suit, width, height, color, border=2):
+    """
+    Kortti (rank None = selkä) ja sen reunus yhtenä pintana, jolloin kortti
+    piirretään yhdellä blitillä. None jos kortin kuvaa ei ole.
+    """
+    key = ("framed", width, height, rank, suit, tuple(color), border)
+    surf = ASSETS.get(key)
+    if surf is not None:
+        return surf
+    if rank is None:
+        base = load_card_back_surface(width, height)
+    else:
+        base = load_card_surface(rank, suit, width, height)
+    if base is None:
+        return None
+    surf = base.copy()
+    pygame.draw.rect(surf, color, (0, 0, width, height), border)
+    return ASSETS.put(key, surf)
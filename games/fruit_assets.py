@@ -1,13 +1,17 @@
 # -*- coding: utf-8 -*-
-"""Hedelmäkuvien lataus 10_fruit_icons -kansiosta."""
+"""Hedelmäkuvien lataus 10_fruit_icons -kansiosta (välimuistiavain ("fruit", leveys, korkeus, symboli))."""
 
 import os
 
 import pygame
 
-SYMBOLS = ["CHER", "LEM", "ORA", "GRAP", "GEM", "7"]
-# set1_01.png ... set1_06.png vastaavat CHER, LEM, ORA, GRAP, GEM, 7
-_IMAGE_CACHE = {}
+from asset_cache import ASSETS
+
+SYMBOLS = ["CHER", "LEM", "ORA", "GRAP", "GEM", "7", "WILD", "SCAT"]
+# set1_01.png ... set1_07.png vastaavat CHER, LEM, ORA, GRAP, GEM, 7 ja
+# monilinjapelin WILD (sipuli); SCAT on omenakuva set1_10.png (paprika
+# set1_08 muistuttaa liikaa seiskan chiliä)
+_ICON_NUMBERS = {"SCAT": 10}
 _ICONS_DIR = None
 
 
@@ -18,19 +22,33 @@ def _icons_dir():
     return _ICONS_DIR
 
 
-def load_fruit_surface(symbol, width, height):
-    """Lataa yhden symbolin kuvan skaalattuna. symbol in SYMBOLS."""
-    key = (symbol, width, height)
-    if key in _IMAGE_CACHE:
-        return _IMAGE_CACHE[key]
+def decode_fruit_image(symbol, width, height):
+    """Lataa ja skaalaa kuvan ilman näyttömuunnosta (ajettavissa säikeessä). None jos puuttuu."""
     idx = SYMBOLS.index(symbol) if symbol in SYMBOLS else 0
-    path = os.path.join(_icons_dir(), f"set1_{idx + 1:02d}.png")
+    path = os.path.join(_icons_dir(), f"set1_{_ICON_NUMBERS.get(symbol, idx + 1):02d}.png")
     if not os.path.isfile(path):
         return None
     try:
-        img = pygame.image.load(path).convert_alpha()
-        surf = pygame.transform.smoothscale(img, (width, height))
-        _IMAGE_CACHE[key] = surf
-        return surf
+        img = pygame.image.load(path)
+        if img.get_bitsize() not in (24, 32):
+            img = img.convert(32, pygame.SRCALPHA)
+        return pygame.transform.smoothscale(img, (width, height))
     except Exception:
         return None
+
+
+def store_fruit_surface(symbol, width, height, surf):
+    """Vie dekoodatun kuvan näytön pikselimuotoon ja välimuistiin (pääsäikeessä)."""
+    if surf is None:
+        return None
+    if pygame.display.get_surface() is not None:
+        surf = surf.convert_alpha()
+    return ASSETS.put(("fruit", width, height, symbol), surf)
+
+
+def load_fruit_surface(symbol, width, height):
+    """Lataa yhden symbolin kuvan skaalattuna. symbol in SYMBOLS."""
+    surf = ASSETS.get(("fruit", width, height, symbol))
+    if surf is not None:
+        return surf
+    return store_fruit_surface(symbol, width, height, decode_fruit_image(symbol, width, height))
@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+"""
+Taulukkopohjainen pokerikäden arviointi (Jacks or Better).
+
+Kortit koodataan kokonaisluvuiksi 0–51: kortti = rank_index * 4 + suit_index
+(RANKS- ja SUITS-järjestyksessä). Käsi luokitellaan kahdella taulukolla:
+  - maa (flush): 13-bittinen rank-maski -> käsiluokka
+  - muut: rankkien alkulukujen tulo -> käsiluokka
+Taulukot rakennetaan kerran moduulin latauksessa; yksi arviointi on viisi
+listahakua, kertolaskut ja yksi dict-haku. Moduuli ei tarvitse pygamea,
+joten simulaatiot ja muut offline-työkalut voivat käyttää sitä suoraan.
+"""
+
+import random
+
+RANKS = "A 2 3 4 5 6 7 8 9 10 J Q K".split()
+SUITS = ["S", "H", "D", "C"]
+
+PAYTABLE = {
+    "Royal Flush": 250,
+    "Straight Flush": 50,
+    "Four of a Kind": 25,
+    "Full House": 9,
+    "Flush": 6,
+    "Straight": 4,
+    "Three of a Kind": 3,
+    "Two Pair": 2,
+    "Jacks or Better": 1,
+}
+
+PAYTABLE_ORDER = [
+    "Royal Flush", "Straight Flush", "Four of a Kind", "Full House", "Flush",
+    "Straight", "Three of a Kind", "Two Pair", "Jacks or Better",
+]
+
+# Käsiluokan koodi: 0 = ei voittoa, 1.. = PAYTABLE_ORDER-indeksi + 1
+NO_WIN = 0
+HAND_NAMES = [None] + PAYTABLE_ORDER
+HAND_CODES = {name: i for i, name in enumerate(HAND_NAMES) if name}
+
+_PRIMES = [2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41]
+
+# Korttikohtaiset esilasketut arvot (indeksi = kortin koodi)
+CARD_RANK = [c // 4 for c in range(52)]
+CARD_SUIT = [c % 4 for c in range(52)]
+_CARD_PRIME = [_PRIMES[c // 4] for c in range(52)]
+_CARD_RANKBIT = [1 << (c // 4) for c in range(52)]
+_CARD_SUITBIT = [1 << (c % 4) for c in range(52)]
+
+_CARD_INDEX = {(r, s): ri * 4 + si for ri, r in enumerate(RANKS) for si, s in enumerate(SUITS)}
+_CARD_TUPLE = [(RANKS[c // 4], SUITS[c % 4]) for c in range(52)]
+
+
+def encode_card(card):
+    """(rank, suit) -> 0..51."""
+    return _CARD_INDEX[card]
+
+
+def decode_card(code):
+    """0..51 -> (rank, suit)."""
+    return _CARD_TUPLE[code]
+
+
+def encode_cards(cards):
+    return [_CARD_INDEX[c] for c in cards]
+
+
+def decode_cards(codes):
+    return [_CARD_TUPLE[c] for c in codes]
+
+
+def make_deck_codes(rng=random):
+    """Sekoitettu pakka korttikoodeina (jako pop():lla lopusta kuten make_deck)."""
+    deck = list(range(52))
+    rng.shuffle(deck)
+    return deck
+
+
+def make_deck(rng=random):
+    """Sekoitettu pakka (rank, suit)-tupleina; sama sekoitus kuin make_deck_codes."""
+    return [_CARD_TUPLE[c] for c in make_deck_codes(rng)]
+
+
+def deal_codes(seed):
+    """(jaetut 5 korttia, jäljellä oleva pakka) kierroksen siemenestä kuten pelissä: pop() lopusta."""
+    deck = make_deck_codes(random.Random(seed))
+    dealt = [deck.pop() for _ in range(5)]
+    return dealt, deck
+
+
+def draw_hands(seed, dealt, rest, held_mask, hands=1):
+    """
+    Kierroksen lopulliset kädet: pääkäsi (vaihdot pakan lopusta järjestyksessä)
+    ja moniläpelin lisäkädet 1..hands-1 (extra_hand).
+    """
+    deck = list(rest)
+    main = [dealt[i] if held_mask >> i & 1 else deck.pop() for i in range(5)]
+    return [main] + [extra_hand(seed, k, held_mask, dealt, rest) for k in range(1, hands)]
+
+
+def extra_hand(seed, index, held_mask, dealt, rest):
+    """
+    Moniläpelin lisäkäsi `index` (1..255): HOLD-maskin kortit jaetusta kädestä,
+    muut arvotaan jäljellä olevasta pakasta `rest` käden omalla satunnaisvirralla
+    (kierroksen siemen + indeksi), joten jokainen käsi on toistettavissa erikseen.
+    """
+    rng = random.Random((seed << 8) | index)
+    fill = iter(rng.sample(rest, 5 - bin(held_mask).count("1")))
+    return [dealt[i] if held_mask >> i & 1 else next(fill) for i in range(5)]
+
+
+def _classify(ranks, is_flush):
+    """Referenssiluokittelu rank-indekseistä (sama logiikka kuin alkuperäinen eval_hand)."""
+    ranks = sorted(ranks)
+    is_straight = False
+    if len(set(ranks)) == 5:
+        if ranks[4] - ranks[0] == 4:
+            is_straight = True
+        if ranks == [0, 1, 2, 3, 12]:
+            is_straight = True
+    counts = {}
+    for r in ranks:
+        counts[r] = counts.get(r, 0) + 1
+    vals = sorted(counts.values(), reverse=True)
+    if is_straight and is_flush:
+        if ranks[4] == 12 and ranks[3] == 11:
+            return HAND_CODES["Royal Flush"]
+        return HAND_CODES["Straight Flush"]
+    if vals[0] == 4:
+        return HAND_CODES["Four of a Kind"]
+    if vals[0] == 3 and vals[1] == 2:
+        return HAND_CODES["Full House"]
+    if is_flush:
+        return HAND_CODES["Flush"]
+    if is_straight:
+        return HAND_CODES["Straight"]
+    if vals[0] == 3:
+        return HAND_CODES["Three of a Kind"]
+    if vals[0] == 2 and vals[1] == 2:
+        return HAND_CODES["Two Pair"]
+    for r, count in counts.items():
+        if count == 2 and r >= 9:
+            return HAND_CODES["Jacks or Better"]
+    return NO_WIN
+
+
+def _build_tables():
+    """Kaikki rank-multijoukot (max 4 samaa) -> luokka; maille 5 eri rankkia -> luokka."""
+    flush = {}
+    product = {}
+
+    def walk(start, picked):
+        if len(picked) == 5:
+            p = 1
+            for r in picked:
+                p *= _PRIMES[r]
+            product[p] = _classify(picked, False)
+            if len(set(picked)) == 5:
+                mask = 0
+                for r in picked:
+                    mask |= 1 << r
+                flush[mask] = _classify(picked, True)
+            return
+        for r in range(start, 13):
+            if picked.count(r) < 4:
+                walk(r, picked + [r])
+
+    walk(0, [])
+    flush_table = [NO_WIN] * (1 << 13)
+    for mask, code in flush.items():
+        flush_table[mask] = code
+    return flush_table, product
+
+
+_FLUSH_TABLE, _PRODUCT_TABLE = _build_tables()
+
+
+def eval_code(a, b, c, d, e):
+    """Viisi korttikoodia -> käsiluokan koodi (0 = ei voittoa)."""
+    if _CARD_SUITBIT[a] & _CARD_SUITBIT[b] & _CARD_SUITBIT[c] & _CARD_SUITBIT[d] & _CARD_SUITBIT[e]:
+        return _FLUSH_TABLE[_CARD_RANKBIT[a] | _CARD_RANKBIT[b] | _CARD_RANKBIT[c] | _CARD_RANKBIT[d] | _CARD_RANKBIT[e]]
+    return _PRODUCT_TABLE[_CARD_PRIME[a] * _CARD_PRIME[b] * _CARD_PRIME[c] * _CARD_PRIME[d] * _CARD_PRIME[e]]
+
+
+def eval_hand_codes(codes):
+    """Korttikoodit -> (käden nimi tai None, PAYTABLE-kerroin)."""
+    name = HAND_NAMES[eval_code(*codes)]
+    return name, PAYTABLE[name] if name else 0
+
+
+def eval_hands(batch):
+    """
+    Eräarviointi: iteroitava viiden korttikoodin jonoja -> lista käsiluokkien koodeja.
+    Nimi ja kerroin: HAND_NAMES[code], pay_multipliers()[code].
+    """
+    suitbit = _CARD_SUITBIT
+    rankbit = _CARD_RANKBIT
+    prime = _CARD_PRIME
+    flush_table = _FLUSH_TABLE
+    product_table = _PRODUCT_TABLE
+    out = []
+    append = out.append
+    for a, b, c, d, e in batch:
+        if suitbit[a] & suitbit[b] & suitbit[c] & suitbit[d] & suitbit[e]:
+            append(flush_table[rankbit[a] | rankbit[b] | rankbit[c] | rankbit[d] | rankbit[e]])
+        else:
+            append(product_table[prime[a] * prime[b] * prime[c] * prime[d] * prime[e]])
+    return out
+
+
+def pay_multipliers(paytable=None):
+    """Käsiluokan koodi -> kerroin nykyisellä (tai annetulla) paytablella."""
+    if paytable is None:
+        paytable = PAYTABLE
+    return [0] + [paytable[name] for name in PAYTABLE_ORDER]
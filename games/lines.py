@@ -0,0 +1,286 @@
+# -*- coding: utf-8 -*-
+"""
+Monilinjaisen hedelmäpelin (5 rullaa x 3 riviä) säännöt ilman pygamea.
+
+Voittolinja on rivi-indeksi jokaiselle rullalle (PAYLINES, enintään 50).
+Linja maksaa vasemmalta alkavasta 3–5 saman symbolin sarjasta; WILD
+korvaa kaikki paitsi SCATTERia. SCATTER maksaa missä tahansa ruudukossa
+kokonaispanoksen kertoimella.
+
+Arviointi on taulukkopohjainen kuten games.hand_eval: linjan viisi
+symbolikoodia (3 bittiä kukin) muodostavat 15-bittisen avaimen, ja
+LINE_PAYS[avain] on linjan kerroin. Jokaiselle rullalle ja pysähdykselle on
+valmiiksi laskettu linjoittain se osuus avaimesta, jonka rulla tuottaa
+(linjamatriisi sovitettuna nauhaan). Rullaparien (0+1, 2+3) osuudet on
+lisäksi yhdistetty valmiiksi, joten pyöräytyksen kaikkien linjojen avaimet
+saadaan kahdella map(add)-läpikäynnillä. Sama koodi arvioi pelin yhden
+pyöräytyksen ja simuloinnin miljoonat pyöräytykset (eval_spins).
+"""
+
+import random
+import time
+from array import array
+from itertools import product
+from operator import add
+
+from games.reels import JACKPOT_SYMBOL, SYMBOLS, WeightedReel
+
+LINE_SYMBOLS = SYMBOLS + ["WILD", "SCAT"]
+SYMBOL_CODES = {sym: i for i, sym in enumerate(LINE_SYMBOLS)}
+WILD = SYMBOL_CODES["WILD"]
+SCATTER = SYMBOL_CODES["SCAT"]
+
+REEL_COUNT = 5
+ROWS = 3
+MAX_LINES = 50
+_BITS = 3
+
+# Kerroin linjapanokselle: 3, 4 tai 5 samaa vasemmalta
+LINE_PAYOUT = {
+    "CHER": (10, 25, 100),
+    "LEM": (10, 25, 100),
+    "ORA": (10, 30, 125),
+    "GRAP": (15, 40, 150),
+    "GEM": (25, 75, 300),
+    "7": (50, 150, 750),
+    "WILD": (100, 500, 2000),
+}
+# Kerroin kokonaispanokselle: scattereita ruudukossa
+SCATTER_PAYOUT = {3: 5, 4: 20, 5: 100}
+
+# Rivi (0 = ylin) jokaisella rullalla; 20 tavallista linjaa, loput 50:een
+# muodostetaan _fill_paylines()-funktiolla tasaisimmista kuvioista
+_CLASSIC_LINES = [
+    (1, 1, 1, 1, 1), (0, 0, 0, 0, 0), (2, 2, 2, 2, 2), (0, 1, 2, 1, 0), (2, 1, 0, 1, 2),
+    (0, 0, 1, 0, 0), (2, 2, 1, 2, 2), (1, 2, 2, 2, 1), (1, 0, 0, 0, 1), (1, 0, 1, 0, 1),
+    (1, 2, 1, 2, 1), (0, 1, 0, 1, 0), (2, 1, 2, 1, 2), (1, 1, 0, 1, 1), (1, 1, 2, 1, 1),
+    (0, 1, 1, 1, 0), (2, 1, 1, 1, 2), (0, 2, 0, 2, 0), (2, 0, 2, 0, 2), (0, 2, 2, 2, 0),
+]
+
+# Nauhat: 32 pysähdystä, kaikki yhtä todennäköisiä. Painotetut pysähdykset
+# (kuten games.reels) eivät sovi kolmen rivin ikkunaan: ylä- ja alarivin
+# symbolijakauma riippuisi naapuripysähdysten painoista, ja linjojen RTP:t
+# poikkeaisivat toisistaan. Symbolien yleisyys säädetään määrillä; WILD vain
+# rullilla 2–4.
+LINE_STRIPS = [
+    ["GRAP", "CHER", "ORA", "GRAP", "LEM", "ORA", "7", "LEM", "ORA", "GEM", "LEM", "ORA", "LEM", "SCAT", "ORA", "CHER",
+     "ORA", "CHER", "LEM", "GRAP", "CHER", "GRAP", "CHER", "7", "CHER", "GRAP", "GEM", "CHER", "LEM", "CHER", "GEM", "LEM"],
+    ["ORA", "LEM", "ORA", "LEM", "ORA", "CHER", "GRAP", "GEM", "CHER", "7", "CHER", "LEM", "CHER", "WILD", "LEM", "ORA",
+     "CHER", "LEM", "GRAP", "GEM", "SCAT", "CHER", "GEM", "LEM", "ORA", "CHER", "GRAP", "ORA", "GRAP", "LEM", "GRAP", "7"],
+    ["LEM", "ORA", "LEM", "GEM", "SCAT", "WILD", "ORA", "CHER", "ORA", "LEM", "7", "ORA", "LEM", "CHER", "LEM", "GRAP",
+     "CHER", "GEM", "LEM", "GRAP", "GEM", "CHER", "GRAP", "ORA", "CHER", "ORA", "CHER", "GRAP", "LEM", "CHER", "7", "GRAP"],
+    ["GRAP", "CHER", "LEM", "GEM", "ORA", "GRAP", "CHER", "GEM", "GRAP", "GEM", "CHER", "ORA", "LEM", "WILD", "CHER", "GRAP",
+     "ORA", "LEM", "ORA", "CHER", "LEM", "CHER", "GRAP", "LEM", "7", "SCAT", "LEM", "ORA", "LEM", "ORA", "CHER", "7"],
+    ["GRAP", "LEM", "CHER", "GEM", "ORA", "SCAT", "GEM", "7", "CHER", "ORA", "CHER", "GRAP", "CHER", "ORA", "CHER", "ORA",
+     "GRAP", "LEM", "CHER", "LEM", "CHER", "LEM", "ORA", "GRAP", "LEM", "ORA", "LEM", "CHER", "LEM", "7", "GRAP", "GEM"],
+]
+
+LINE_REELS = [WeightedReel([(sym, 1) for sym in strip]) for strip in LINE_STRIPS]
+
+
+def _fill_paylines(lines, count):
+    """Täydentää linjat count kappaleeseen tasaisimmilla (pienin rivien vaihtelu) uusilla kuvioilla."""
+    used = set(lines)
+    extra = sorted(
+        (p for p in product(range(ROWS), repeat=REEL_COUNT) if p not in used),
+        key=lambda p: (sum(abs(a - b) for a, b in zip(p, p[1:])), p),
+    )
+    return list(lines) + extra[:count - len(lines)]
+
+
+PAYLINES = _fill_paylines(_CLASSIC_LINES, MAX_LINES)
+
+
+def _line_multiplier(codes):
+    """Yhden linjan kerroin symbolikoodeista (vasemmalta oikealle)."""
+    if codes[0] == SCATTER:
+        return 0
+    wild_run = 0
+    while wild_run < REEL_COUNT and codes[wild_run] == WILD:
+        wild_run += 1
+    wild_pay = LINE_PAYOUT["WILD"][wild_run - 3] if wild_run >= 3 else 0
+    if wild_run == REEL_COUNT or codes[wild_run] == SCATTER:
+        return wild_pay
+    target = codes[wild_run]
+    run = wild_run
+    while run < REEL_COUNT and codes[run] in (target, WILD):
+        run += 1
+    pays = LINE_PAYOUT.get(LINE_SYMBOLS[target])
+    sym_pay = pays[run - 3] if pays and run >= 3 else 0
+    return max(wild_pay, sym_pay)
+
+
+def _shift(reel):
+    return _BITS * (REEL_COUNT - 1 - reel)
+
+
+def line_key(codes):
+    key = 0
+    for code in codes:
+        key = (key << _BITS) | code
+    return key
+
+
+# Kaikkien 8^5 symboliyhdistelmän kertoimet (32768 alkiota)
+LINE_PAYS = array("H", bytes(2 << (_BITS * REEL_COUNT)))
+for _codes in product(range(len(LINE_SYMBOLS)), repeat=REEL_COUNT):
+    LINE_PAYS[line_key(_codes)] = _line_multiplier(_codes)
+del _codes
+
+
+def window_codes(reel, stop):
+    """Rullan näkyvät symbolikoodit ylhäältä alas (keskimmäinen = pysähdyspaikka)."""
+    n = len(reel)
+    return [SYMBOL_CODES[reel.symbols[(stop + row - 1) % n]] for row in range(ROWS)]
+
+
+class LineTables:
+    """
+    Linjamatriisi sovitettuna rulliin: contrib[r][stop] = rullan r osuus
+    jokaisen linjan avaimesta, scatters[r][stop] = scattereita näkyvissä.
+    pair01[a * len(rulla 1) + b] = rullien 0 ja 1 yhteenlaskettu osuus (samoin pair23).
+    """
+
+    def __init__(self, lines, reels=LINE_REELS):
+        if not 1 <= lines <= len(PAYLINES):
+            raise ValueError(f"linjoja 1–{len(PAYLINES)}, ei {lines}")
+        self.lines = lines
+        self.reels = reels
+        self.contrib = []
+        self.scatters = []
+        for r, reel in enumerate(reels):
+            shift = _shift(r)
+            windows = [window_codes(reel, s) for s in range(len(reel))]
+            self.contrib.append([
+                tuple(w[line[r]] << shift for line in PAYLINES[:lines]) for w in windows
+            ])
+            self.scatters.append([w.count(SCATTER) for w in windows])
+        c0, c1, c2, c3, _ = self.contrib
+        self.pair01 = [tuple(map(add, x, y)) for x in c0 for y in c1]
+        self.pair23 = [tuple(map(add, x, y)) for x in c2 for y in c3]
+
+    def keys(self, stops):
+        """Jokaisen linjan avain (linjamatriisin järjestyksessä)."""
+        a, b, c, d, e = stops
+        n1 = len(self.contrib[1])
+        n3 = len(self.contrib[3])
+        return map(add, map(add, self.pair01[a * n1 + b], self.pair23[c * n3 + d]), self.contrib[4][e])
+
+    def line_multipliers(self, stops):
+        """Jokaisen linjan kerroin yhdellä läpikäynnillä."""
+        return list(map(LINE_PAYS.__getitem__, self.keys(stops)))
+
+    def scatter_count(self, stops):
+        return sum(sc[s] for sc, s in zip(self.scatters, stops))
+
+
+_TABLES = {}
+
+
+def line_tables(lines):
+    """LineTables välimuistista (yksi per linjamäärä)."""
+    tables = _TABLES.get(lines)
+    if tables is None:
+        tables = _TABLES[lines] = LineTables(lines)
+    return tables
+
+
+def spin_stops(rng=random, reels=LINE_REELS):
+    """Yhden pyöräytyksen pysähdyspaikat (keskimmäinen rivi)."""
+    return [reel.sample(rng) for reel in reels]
+
+
+def stop_window(stops, reels=LINE_REELS):
+    """Näkyvä ruudukko rullittain: [[ylä, keski, ala], ...] symboleina."""
+    return [[LINE_SYMBOLS[c] for c in window_codes(reel, s)] for reel, s in zip(reels, stops)]
+
+
+def check_win(stops, line_bet, lines):
+    """(kokonaisvoitto, [(linja, voitto), ...], scattereita) yhdelle pyöräytykselle."""
+    tables = line_tables(lines)
+    mults = tables.line_multipliers(stops)
+    line_wins = [(i, m * line_bet) for i, m in enumerate(mults) if m]
+    scatters = tables.scatter_count(stops)
+    scatter_win = SCATTER_PAYOUT.get(scatters, 0) * line_bet * lines
+    return sum(w for _, w in line_wins) + scatter_win, line_wins, scatters
+
+
+def jackpot_lines(stops, lines):
+    """Pelatut linjat, joilla on viisi JACKPOT_SYMBOLia (ei WILDeja): progressiivinen jackpot."""
+    window = stop_window(stops)
+    return [i for i, rows in enumerate(PAYLINES[:lines])
+            if all(window[r][row] == JACKPOT_SYMBOL for r, row in enumerate(rows))]
+
+
+def eval_spins(columns, lines):
+    """
+    Erä pyöräytyksiä: columns[r] = rullan r pysähdykset. Palauttaa kertoimet
+    linjapanokselle (lista), samat kuin check_win(...)[0] / linjapanos.
+    """
+    tables = line_tables(lines)
+    p01, p23, c4 = tables.pair01, tables.pair23, tables.contrib[4]
+    n1, n3 = len(tables.contrib[1]), len(tables.contrib[3])
+    s0, s1, s2, s3, s4 = tables.scatters
+    pays = LINE_PAYS.__getitem__
+    scatter_pays = [SCATTER_PAYOUT.get(n, 0) * lines for n in range(ROWS * REEL_COUNT + 1)]
+    return [
+        sum(map(pays, map(add, map(add, p01[a * n1 + b], p23[c * n3 + d]), c4[e])))
+        + scatter_pays[s0[a] + s1[b] + s2[c] + s3[d] + s4[e]]
+        for a, b, c, d, e in zip(*columns)
+    ]
+
+
+def _row_distributions(reel):
+    """[rivi][symbolikoodi] -> todennäköisyys."""
+    n = len(reel)
+    dist = [[0.0] * len(LINE_SYMBOLS) for _ in range(ROWS)]
+    for s in range(n):
+        p = reel.weights[s] / reel.total
+        for row, code in enumerate(window_codes(reel, s)):
+            dist[row][code] += p
+    return dist
+
+
+def line_stats(lines, reels=LINE_REELS):
+    """
+    Tarkka RTP (voitto / kokonaispanos): linjan odotusarvo lasketaan
+    rullien riippumattomista symbolijakaumista kaikkien 8^5 yhdistelmän yli,
+    scatter-osuus rullakohtaisten scatter-määrien konvoluutiosta.
+    """
+    dists = [_row_distributions(reel) for reel in reels]
+    nonzero = [(key, pay) for key, pay in enumerate(LINE_PAYS) if pay]
+    mask = (1 << _BITS) - 1
+    line_ev = 0.0
+    for line in PAYLINES[:lines]:
+        cols = [dists[r][line[r]] for r in range(REEL_COUNT)]
+        for key, pay in nonzero:
+            p = 1.0
+            for r in range(REEL_COUNT):
+                p *= cols[r][key >> _shift(r) & mask]
+                if not p:
+                    break
+            line_ev += p * pay
+    counts = [1.0]
+    for reel in reels:
+        per_reel = [0.0] * (ROWS + 1)
+        for s in range(len(reel)):
+            per_reel[window_codes(reel, s).count(SCATTER)] += reel.weights[s] / reel.total
+        merged = [0.0] * (len(counts) + ROWS)
+        for i, a in enumerate(counts):
+            for j, b in enumerate(per_reel):
+                merged[i + j] += a * b
+        counts = merged
+    scatter_ev = sum(p * SCATTER_PAYOUT.get(n, 0) for n, p in enumerate(counts))
+    return {"rtp": line_ev / lines + scatter_ev, "line_rtp": line_ev / lines, "scatter_rtp": scatter_ev}
+
+
+if __name__ == "__main__":
+    t0 = time.perf_counter()
+    stats = line_stats(MAX_LINES)
+    elapsed = (time.perf_counter() - t0) * 1000
+    # Jokaisella rullalla kaikki rivit ovat samoin jakautuneita, joten RTP ei riipu linjamäärästä
+    print(f"RTP:         {stats['rtp'] * 100:.4f} %")
+    print(f"  linjat:    {stats['line_rtp'] * 100:.4f} %")
+    print(f"  scatter:   {stats['scatter_rtp'] * 100:.4f} %")
+    print(f"Linjoja:     {len(PAYLINES)}")
+    print(f"Laskenta:    {elapsed:.3f} ms")
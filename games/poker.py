@@ -1,318 +1,592 @@
 # -*- coding: utf-8 -*-
 """Video Poker (Jacks or Better) – paytable, HOLD-napit, klassinen arcade-tyyli."""
 
-import random
 import math
+import random
+
 import pygame
 
 import config
-from ui import draw_text, draw_button, draw_button_hold, draw_credits_bar, draw_cash_big, draw_scanlines
-from games import card_assets
-
-
-RANKS = "A 2 3 4 5 6 7 8 9 10 J Q K".split()
-SUITS = ["S", "H", "D", "C"]
-SUIT_COLORS = {"S": (40, 40, 40), "H": (200, 50, 50), "D": (200, 50, 50), "C": (40, 40, 40)}
+from anim import FixedStepClock, Tween, ease_in_quad, lerp
+from asset_cache import ASSETS
+from journal import new_round_seed
+from rng import RNG
+from idle import IDLE
+from profiler import PROFILER
+from ui import (
+    draw_text, draw_button, draw_button_hold, draw_credits_bar, draw_cash_big, draw_scanlines, DirtyRects,
+    DrawList, LAYER_MOVING, LAYER_SPRITES, queue_blit, fill_rect,
+    blit_layer, get_layer, background_layer, get_mouse_pos, px, CREDITS_BAR_HEIGHT,
+)
+from games import card_assets, strategy
+from journal import GAME_POKER
+from games.hand_eval import (
+    PAYTABLE, PAYTABLE_ORDER, HAND_CODES, HAND_NAMES, NO_WIN, decode_card, encode_card, encode_cards,
+    decode_cards, eval_hand_codes, eval_hands, extra_hand, make_deck, pay_multipliers,
+)
+
+
+# Korttien koko pelissä (myös esilataus käyttää näitä)
+CARD_WIDTH = px(80)
+CARD_HEIGHT = px(112)
+
+SUIT_COLORS = card_assets.SUIT_COLORS
+# Progressiivisen jackpotin laukaiseva käsi
+ROYAL_FLUSH = HAND_CODES["Royal Flush"]
+
+# Moniläpelin lisäkädet pääkäden yläpuolella (oikealla COIN VALUE / WAGER)
+MULTI_AREA = pygame.Rect(px(config.PAYTABLE_PANEL_WIDTH + 8), CREDITS_BAR_HEIGHT + px(2),
+                         config.SCENE_WIDTH - px(config.PAYTABLE_PANEL_WIDTH + 116), px(118))
 
-PAYTABLE = {
-    "Royal Flush": 250,
-    "Straight Flush": 50,
-    "Four of a Kind": 25,
-    "Full House": 9,
-    "Flush": 6,
-    "Straight": 4,
-    "Three of a Kind": 3,
-    "Two Pair": 2,
-    "Jacks or Better": 1,
-}
 
-PAYTABLE_ORDER = [
-    "Royal Flush", "Straight Flush", "Four of a Kind", "Full House", "Flush",
-    "Straight", "Three of a Kind", "Two Pair", "Jacks or Better",
-]
-
-
-def make_deck():
-    deck = []
-    for r in RANKS:
-        for s in SUITS:
-            deck.append((r, s))
-    random.shuffle(deck)
-    return deck
+def eval_hand(cards):
+    """(rank, suit)-kortit -> (käden nimi tai None, kerroin). Ks. games.hand_eval."""
+    return eval_hand_codes(encode_cards(cards))
 
 
-def eval_hand(cards):
-    rank_vals = {r: i for i, r in enumerate(RANKS)}
-    ranks = [rank_vals[c[0]] for c in cards]
-    suits = [c[1] for c in cards]
-    ranks.sort()
-    is_flush = len(set(suits)) == 1
-    is_straight = False
-    if len(set(ranks)) == 5:
-        if ranks[4] - ranks[0] == 4:
-            is_straight = True
-        if ranks == [0, 1, 2, 3, 12]:
-            is_straight = True
-    counts = {}
-    for r in ranks:
-        counts[r] = counts.get(r, 0) + 1
-    vals = sorted(counts.values(), reverse=True)
-    if is_straight and is_flush:
-        if ranks[4] == 12 and ranks[3] == 11:
-            return "Royal Flush", PAYTABLE["Royal Flush"]
-        return "Straight Flush", PAYTABLE["Straight Flush"]
-    if vals[0] == 4:
-        return "Four of a Kind", PAYTABLE["Four of a Kind"]
-    if vals[0] == 3 and vals[1] == 2:
-        return "Full House", PAYTABLE["Full House"]
-    if is_flush:
-        return "Flush", PAYTABLE["Flush"]
-    if is_straight:
-        return "Straight", PAYTABLE["Straight"]
-    if vals[0] == 3:
-        return "Three of a Kind", PAYTABLE["Three of a Kind"]
-    if vals[0] == 2 and vals[1] == 2:
-        return "Two Pair", PAYTABLE["Two Pair"]
-    for r, count in counts.items():
-        if count == 2 and r >= 9:
-            return "Jacks or Better", PAYTABLE["Jacks or Better"]
-    return None, 0
-
-
-def _draw_paytable_full(surface, fonts):
-    """Paytable: vasen sarake kädet, oikealla 1-5 kolikon voitot."""
-    pw = config.PAYTABLE_PANEL_WIDTH
-    x, y = 8, 50
+def _draw_paytable_full(surface, fonts, bet=1):
+    """Paytable: vasen sarake kädet, oikealla 1-5 kolikon voitot (panoksen sarake korostettu)."""
+    pw = px(config.PAYTABLE_PANEL_WIDTH)
+    x, y = px(8), px(50)
     draw_text(surface, "COINS WAGERED", x + pw // 2, y, fonts["small"], config.COLOR_PAYTABLE_HEADER, center=True)
-    y += 20
+    y += px(20)
     # Sarakkeet: käsi ~100px, sitten 1 2 3 4 5
-    hand_w = 100
-    col_w = 18
+    hand_w = px(100)
+    col_w = px(18)
     start_col = x + hand_w
+    bet_col = start_col + (min(max(bet, 1), 5) - 1) * col_w
     for c in range(5):
         draw_text(surface, str(c + 1), start_col + c * col_w + col_w // 2, y, fonts["small"], config.COLOR_PAYTABLE_HEADER, center=True)
-    y += 14
+    y += px(14)
     for hand_name in PAYTABLE_ORDER:
         payout1 = PAYTABLE[hand_name]
-        # 1-kolikko sarake korostus
-        pygame.draw.rect(surface, config.COLOR_PAYTABLE_HIGHLIGHT_BG, (start_col, y - 2, col_w, 12))
+        # Panoksen sarakkeen korostus
+        pygame.draw.rect(surface, config.COLOR_PAYTABLE_HIGHLIGHT_BG, (bet_col, y - px(2), col_w, px(12)))
         # Käden nimi (lyhennetty)
         short = hand_name.replace(" of a Kind", "").replace(" or Better", "").replace(" ", " ")
         if len(short) > 12:
             short = short[:10] + ".."
-        draw_text(surface, short, x + 4, y - 1, fonts["small"], config.COLOR_PAYTABLE_TEXT)
+        draw_text(surface, short, x + px(4), y - px(1), fonts["small"], config.COLOR_PAYTABLE_TEXT)
         for c in range(5):
             val = payout1 * (c + 1)
-            draw_text(surface, str(val), start_col + c * col_w + col_w // 2, y - 1, fonts["small"], config.COLOR_PAYTABLE_TEXT, center=True)
-        y += 14
+            draw_text(surface, str(val), start_col + c * col_w + col_w // 2, y - px(1), fonts["small"], config.COLOR_PAYTABLE_TEXT, center=True)
+        y += px(14)
+
+
+def multi_grid(count, width, height):
+    """(sarakkeet, kortin leveys, kortin korkeus) suurimmille minikorteille, joilla count kättä mahtuu alueeseen."""
+    best = (1, 2, 3)
+    for cols in range(1, count + 1):
+        rows = -(-count // cols)
+        card_w = min((width // cols - 6) // 5, (height // rows - 3) * CARD_WIDTH // CARD_HEIGHT)
+        if card_w > best[1]:
+            best = (cols, card_w, card_w * CARD_HEIGHT // CARD_WIDTH)
+    return best
+
+
+def render_multi_hands(size, hands, wins=None):
+    """
+    Lisäkädet yhdeksi pinnaksi: käsi = 5 minikorttia (None = selkä), voittavat
+    kädet keltaisella kehyksellä. Pinta kootaan yhdellä blits()-kutsulla.
+    """
+    surf = pygame.Surface(size, pygame.SRCALPHA)
+    if not hands:
+        return surf
+    cols, card_w, card_h = multi_grid(len(hands), *size)
+    cell_w = size[0] // cols
+    hand_w = 5 * card_w + 4
+    back = card_assets.load_card_back_surface(card_w, card_h)
+    sprites = []
+    for k, hand in enumerate(hands):
+        x = (k % cols) * cell_w + (cell_w - hand_w) // 2
+        y = (k // cols) * (card_h + 3) + 1
+        for i, code in enumerate(hand):
+            img = back if code is None else card_assets.load_mini_card_surface(*decode_card(code), card_w, card_h)
+            sprites.append((img, (x + i * (card_w + 1), y)))
+        if wins and wins[k]:
+            pygame.draw.rect(surf, config.COLOR_CARD_HELD, (x - 1, y - 1, hand_w + 2, card_h + 2), 1)
+    surf.blits(sprites, doreturn=False)
+    return surf
+
+
+def _render_static_layer(size, fonts, game_left, bet, hands=1):
+    """Pelin muuttumaton osa: kehys, sininen pelialue, paytable, COIN VALUE / WAGER."""
+    surf = background_layer(size, game_left=game_left)
+    _draw_paytable_full(surf, fonts, bet)
+    wx = size[0] - px(100)
+    top = CREDITS_BAR_HEIGHT
+    draw_text(surf, "COIN VALUE", wx, top + px(8), fonts["small"], config.COLOR_TEXT_YELLOW)
+    draw_text(surf, str(bet), wx, top + px(24), fonts["normal"], config.COLOR_TEXT_YELLOW)
+    draw_text(surf, "WAGER", wx, top + px(44), fonts["small"], config.COLOR_TEXT_YELLOW)
+    draw_text(surf, str(bet * hands), wx, top + px(60), fonts["normal"], config.COLOR_TEXT_YELLOW)
+    return surf
 
 
 def _draw_card(surface, x, y, card_w, card_h, rank, suit, fonts, face_up=True, highlight=False):
-    """Piirtää kortin: SVG-kuva tai fallback (selkä). Ei uudelleenjakoefektiä vaihdon yhteydessä."""
-    if face_up and rank and suit:
-        img = card_assets.load_card_surface(rank, suit, card_w, card_h)
-        if img is not None:
-            surface.blit(img, (x, y))
-        else:
-            pygame.draw.rect(surface, config.COLOR_CARD_BG, (x, y, card_w, card_h))
-            draw_text(surface, rank, x + card_w // 2, y + 18, fonts["small"], (30, 30, 30), center=True, pixel_scale=config.PIXEL_SCALE)
-            draw_text(surface, suit, x + card_w // 2, y + 38, fonts["normal"], SUIT_COLORS.get(suit, (50, 50, 50)), center=True, pixel_scale=config.PIXEL_SCALE)
-    else:
-        back = card_assets.load_card_back_surface(card_w, card_h)
-        surface.blit(back, (x, y))
+    """Piirtää kortin reunuksineen: SVG-kuva (tai selkä) yhtenä blittinä tai fallback. Ei uudelleenjakoefektiä vaihdon yhteydessä."""
     border_col = config.COLOR_CARD_HELD if highlight else config.COLOR_CARD_BORDER
-    pygame.draw.rect(surface, border_col, (x, y, card_w, card_h), 2)
+    if not (face_up and rank and suit):
+        rank = suit = None
+    img = card_assets.load_framed_card_surface(rank, suit, card_w, card_h, border_col, px(2))
+    if img is not None:
+        queue_blit(surface, img, (x, y))
+        return
+    fill_rect(surface, config.COLOR_CARD_BG, (x, y, card_w, card_h))
+    draw_text(surface, rank, x + card_w // 2, y + px(18), fonts["small"], (30, 30, 30), center=True)
+    draw_text(surface, suit, x + card_w // 2, y + px(38), fonts["normal"], SUIT_COLORS.get(suit, (50, 50, 50)), center=True)
+    fill_rect(surface, border_col, (x, y, card_w, card_h), px(2))
 
 
 class PokerGame:
-    def __init__(self, screen, clock, fonts):
+    def __init__(self, screen, clock, fonts, journal=None, credit_store=None, hands=None, server=None, jackpot=None,
+                 meters=None):
         self.screen = screen
         self.clock = clock
         self.fonts = fonts
+        self.journal = journal  # journal.RoundJournal tai None
+        self.credit_store = credit_store  # credits.CreditStore tai None
+        self.server = server  # remote.RemoteSeat tai None (jako, vaihto ja creditit palvelimella)
+        self.jackpot = jackpot  # jackpot.JackpotPool tai None
+        self.meters = meters  # meters.Meters tai None
         self.bet = config.MIN_BET
+        # Moniläpeli: käsien määrä ja lisäkäsien (1..) kortit koodeina sekä voitot
+        self.hand_count = config.POKER_HAND_COUNTS[0] if hands is None else hands
+        self.extra_hands = []
+        self.extra_wins = []
+        self.round_seed = 0
         self.deck = []
         self.hand = []
+        self.dealt = []
         self.held = [False] * 5
         self.phase = "shuffle"
         self.result_text = ""
         self.win_amount = 0
-        self.result_timer = 0
-        self.shuffle_frame = 0
-        self.deal_frame = 0
-        self.card_w = 80
-        self.card_h = 112
+        self.result_ms = 0
+        self.shuffle = None
+        self.deal_tweens = []
+        self._reset_tweens()
+        self.card_w = CARD_WIDTH
+        self.card_h = CARD_HEIGHT
         self.slot_positions = []
         self.deck_pos = (0, 0)
         self.hold_rects = []
-        self.game_left = config.PAYTABLE_PANEL_WIDTH
-        self.game_width = config.SCREEN_WIDTH - self.game_left
+        self.game_left = px(config.PAYTABLE_PANEL_WIDTH)
+        self.game_width = config.SCENE_WIDTH - self.game_left
+        # Optimistrategia: vihje, auto-hold ja päätösten pisteytys
+        self.strategy_ready = strategy.load_tables()
+        self.hold_evs = None
+        self.hint_mask = None
+        self.decision_text = ""
+        self.decisions = 0
+        self.ev_lost = 0.0
+
+    def _new_round(self, dealt=None):
+        """
+        Uusi jako: pakka kierroksen siemenestä (toistettavissa päiväkirjasta).
+        dealt = palvelimen jakamat korttikoodit; siemen ja pakka saadaan vasta vaihdossa.
+        """
+        if dealt is None:
+            self.round_seed = new_round_seed(RNG.stream(GAME_POKER))
+            self.deck = make_deck(random.Random(self.round_seed))
+            self.hand = [self.deck.pop() for _ in range(5)]
+            RNG.health.observe_cards(encode_cards(self.hand))
+        else:
+            self.round_seed = 0
+            self.deck = []
+            self.hand = decode_cards(dealt)
+        self.dealt = list(self.hand)
+        self.held = [False] * 5
+        self.phase = "shuffle"
+        self.result_text = ""
+        self.win_amount = 0
+        self.result_ms = 0
+        self.decision_text = ""
+        self.extra_hands = []
+        self.extra_wins = []
+        self._reset_tweens()
+
+    @property
+    def wager(self):
+        """Kierroksen kokonaispanos (panos per käsi x kädet)."""
+        return self.bet * self.hand_count
+
+    def _next_hand_count(self):
+        counts = config.POKER_HAND_COUNTS
+        i = counts.index(self.hand_count) if self.hand_count in counts else -1
+        self.hand_count = counts[(i + 1) % len(counts)]
+
+    def _begin_round(self, credits):
+        """Panos ja uusi jako. Palauttaa saldon panoksen jälkeen."""
+        if self.server is not None:
+            dealt = self.server.poker_deal(self.bet, self.hand_count)
+            self._meter_bet()
+            self._new_round(dealt)
+            return self.server.credits
+        self._meter_bet()
+        credits -= self.wager
+        if self.credit_store is not None:
+            # Levylle vasta kierroksen lopussa (kesken jäänyt kierros ei veloita)
+            self.credit_store.update(credits, bet=self.wager)
+        if self.jackpot is not None:
+            self.jackpot.contribute(self.wager)
+        self._new_round()
+        return credits
+
+    def _meter_bet(self):
+        if self.meters is not None:
+            self.meters.record_bet(GAME_POKER, self.wager)
+
+    def _finish_round(self, credits):
+        """Vaihto ja voitto. Palauttaa saldon kierroksen jälkeen."""
+        win = self._draw_cards()
+        if self.server is not None:
+            return self.server.credits
+        credits += win
+        if self.credit_store is not None:
+            # Kierros päättyi: panos ja voitto levylle samalla kertaa
+            self.credit_store.update(credits, won=win)
+            self.credit_store.commit()
+        if self.jackpot is not None:
+            self.jackpot.maybe_checkpoint()
+        return credits
+
+    def _draw_cards(self):
+        """DEAL pidettyjen jälkeen: vaihto, arviointi ja päiväkirja. Palauttaa kaikkien käsien voiton."""
+        self._score_decision()
+        mask = strategy.held_to_mask(self.held)
+        dealt = encode_cards(self.dealt)
+        if self.server is not None:
+            # Palvelin arpoi kierroksen; pakka johdetaan paljastetusta siemenestä piirtoa varten
+            self.round_seed = self.server.poker_draw(mask)[0]
+            self.deck = make_deck(random.Random(self.round_seed))
+            del self.deck[-5:]
+        rest = encode_cards(self.deck)  # lisäkädet täydennetään pakasta ennen pääkäden vaihtoa
+        for i in range(5):
+            if not self.held[i]:
+                self.hand[i] = self.deck.pop()
+        hand_name, mult = eval_hand(self.hand)
+        main_win = self.bet * mult if mult else 0
+
+        # Lisäkädet: jako ja arviointi erissä
+        self.extra_hands = [extra_hand(self.round_seed, k, mask, dealt, rest) for k in range(1, self.hand_count)]
+        codes = eval_hands(self.extra_hands)
+        pays = pay_multipliers()
+        self.extra_wins = [self.bet * pays[code] for code in codes]
+
+        self.win_amount = main_win + sum(self.extra_wins)
+        jackpot_win = self._award_jackpot(dealt, [HAND_CODES[hand_name] if hand_name else NO_WIN] + codes)
+        if self.meters is not None:
+            hits = [HAND_NAMES[code] for code in codes if code != NO_WIN]
+            if hand_name:
+                hits.append(hand_name)
+            self.meters.record_round(GAME_POKER, self.win_amount, hits, jackpot_win)
+        self.win_amount += jackpot_win
+        if jackpot_win:
+            self.result_text = f"JACKPOT! +{self.win_amount}"
+        elif self.hand_count > 1:
+            winners = sum(1 for w in self.extra_wins if w) + bool(main_win)
+            self.result_text = f"{hand_name or 'Ei voittoa'} | {winners}/{self.hand_count} voittoa: +{self.win_amount}"
+        else:
+            self.result_text = f"{hand_name}: +{self.win_amount}" if hand_name else "Ei voittoa"
+        self.phase = "result"
+        self.result_ms = config.POKER_RESULT_MS
+        if self.journal is not None:
+            self.journal.record_poker(
+                self.round_seed, self.bet, main_win, mask,
+                HAND_CODES[hand_name] if hand_name else NO_WIN, dealt, encode_cards(self.hand),
+            )
+            for k, (hand, code, win) in enumerate(zip(self.extra_hands, codes, self.extra_wins), 1):
+                self.journal.record_poker(self.round_seed, self.bet, win, mask, code, dealt, hand, index=k)
+        return self.win_amount
+
+    def _award_jackpot(self, dealt, codes):
+        """Royal Flush missä tahansa kädessä: progressiivinen potti (kerran kierroksessa). Palauttaa potin."""
+        if self.jackpot is None or ROYAL_FLUSH not in codes:
+            return 0
+        k = codes.index(ROYAL_FLUSH)
+        amount = self.jackpot.award()
+        if self.journal is not None:
+            final = encode_cards(self.hand) if k == 0 else self.extra_hands[k - 1]
+            self.journal.record_jackpot(self.round_seed, amount, GAME_POKER, dealt=dealt, final=final, index=k)
+        return amount
+
+    def _multi_layer_key(self):
+        """Lisäkäsien kerroksen avain: HOLD-vaiheessa pidetyt kortit, tuloksessa kierros."""
+        if self.phase == "hold":
+            return (self.hand_count, tuple(self.dealt), strategy.held_to_mask(self.held), "hold")
+        return (self.hand_count, self.round_seed, len(self.extra_hands), "result")
+
+    def _render_multi_layer(self):
+        if self.phase == "hold":
+            held = [encode_card(c) if h else None for c, h in zip(self.hand, self.held)]
+            return render_multi_hands(MULTI_AREA.size, [held] * (self.hand_count - 1))
+        return render_multi_hands(MULTI_AREA.size, self.extra_hands, self.extra_wins)
+
+    def _reset_tweens(self):
+        """Sekoitus ja jako (kortti kerrallaan DEAL_DELAY_MS välein) alusta."""
+        self.shuffle = Tween(config.SHUFFLE_DURATION_MS)
+        self.deal_tweens = [
+            Tween(config.DEAL_DELAY_MS, delay_ms=i * config.DEAL_DELAY_MS, ease=ease_in_quad)
+            for i in range(5)
+        ]
+
+    def _update(self, dt_ms):
+        """Yksi logiikka-askel (dt_ms): animaatiot ja vaiheiden vaihdot."""
+        if self.phase == "shuffle":
+            self.shuffle.update(dt_ms)
+            if self.shuffle.done:
+                self.phase = "dealing"
+        elif self.phase == "dealing":
+            for tween in self.deal_tweens:
+                tween.update(dt_ms)
+            if self.deal_tweens[-1].done:
+                self._enter_hold()
+
+        if self.result_ms > 0:
+            self.result_ms = max(0, self.result_ms - dt_ms)
+            if self.result_ms == 0:
+                self.phase = "finished"
+
+    def _animating(self):
+        """Sekoitus, jako tai ajastettu tulos käynnissä (HOLD- ja lopetusvaihe odottavat syötettä)."""
+        return self.phase in ("shuffle", "dealing") or self.result_ms > 0
+
+    def _enter_hold(self):
+        """Jako valmis: lasketaan HOLD-valintojen odotusarvot nykyiselle kädelle."""
+        self.phase = "hold"
+        self.result_text = "Valitse HOLD ja paina DEAL"
+        self.hold_evs = strategy.hold_evs(self.hand) if self.strategy_ready else None
+        self.hint_mask = None
+        if self.hold_evs is not None:
+            self.hint_mask, _ = strategy.best_hold(self.hand)
+            if config.POKER_AUTO_HOLD:
+                self.held = strategy.mask_to_held(self.hint_mask)
+
+    def _score_decision(self):
+        """Pelaajan HOLD-valinnan odotusarvo verrattuna optimiin."""
+        if self.hold_evs is None:
+            self.decision_text = ""
+            return
+        best_ev = self.hold_evs[self.hint_mask]
+        loss = best_ev - self.hold_evs[strategy.held_to_mask(self.held)]
+        self.decisions += 1
+        self.ev_lost += loss
+        if loss < 1e-9:
+            self.decision_text = "Optimaalinen valinta"
+        else:
+            self.decision_text = f"Optimi EV {best_ev:.3f}, valinta -{loss:.3f}"
 
     def _get_slot_positions(self):
-        start_x = self.game_left + (self.game_width - 5 * self.card_w - 4 * 8) // 2
-        return [(start_x + i * (self.card_w + 8), 168) for i in range(5)]
+        gap = px(8)
+        start_x = self.game_left + (self.game_width - 5 * self.card_w - 4 * gap) // 2
+        return [(start_x + i * (self.card_w + gap), px(168)) for i in range(5)]
 
     def _get_hold_rects(self):
         return [
-            pygame.Rect(self.slot_positions[i][0], self.slot_positions[i][1] + self.card_h + 4, self.card_w, 28)
+            pygame.Rect(self.slot_positions[i][0], self.slot_positions[i][1] + self.card_h + px(4), self.card_w, px(28))
             for i in range(5)
         ]
 
     def _get_deck_pos(self):
-        cx = self.game_left + self.game_width // 2 - self.card_w // 2 - 16
-        return (cx, 52)
+        cx = self.game_left + self.game_width // 2 - self.card_w // 2 - px(16)
+        return (cx, px(52))
 
     def run(self, credits):
-        if credits < self.bet:
+        """Pelisilmukka; pelin kortit, selät, minikortit ja reunustetut kortit pysyvät välimuistissa pelin ajan."""
+        ASSETS.pin(self, ("cards", self.card_w, self.card_h), ("back",), ("mini",), ("framed",))
+        try:
+            return self._run(credits)
+        finally:
+            ASSETS.unpin(self)
+
+    def _run(self, credits):
+        if credits < self.wager:
             return credits
-        credits -= self.bet
-        self.deck = make_deck()
-        self.hand = [self.deck.pop() for _ in range(5)]
-        self.held = [False] * 5
-        self.phase = "shuffle"
-        self.result_text = ""
-        self.win_amount = 0
-        self.result_timer = 0
-        self.shuffle_frame = 0
-        self.deal_frame = 0
+        credits = self._begin_round(credits)
         self.slot_positions = self._get_slot_positions()
         self.hold_rects = self._get_hold_rects()
         self.deck_pos = self._get_deck_pos()
 
-        bottom_y = config.SCREEN_HEIGHT - 52
-        back_rect = pygame.Rect(self.game_left + 20, bottom_y, 100, 36)
-        action_rect = pygame.Rect(config.SCREEN_WIDTH - 120, bottom_y, 100, 36)
-        new_game_rect = pygame.Rect(config.SCREEN_WIDTH - 120, bottom_y, 100, 36)
+        bottom_y = config.SCENE_HEIGHT - px(52)
+        back_rect = pygame.Rect(self.game_left + px(20), bottom_y, px(100), px(36))
+        action_rect = pygame.Rect(config.SCENE_WIDTH - px(120), bottom_y, px(100), px(36))
+        new_game_rect = pygame.Rect(config.SCENE_WIDTH - px(120), bottom_y, px(100), px(36))
+        hands_rect = pygame.Rect(config.SCENE_WIDTH - px(120), bottom_y - px(44), px(100), px(36))
         cash_center_x = self.game_left + self.game_width // 2
+        dirty = DirtyRects(self.screen)
+        draws = DrawList(self.screen)
+        drawn_phase = None
+        timer = FixedStepClock(self.clock)
 
         while True:
-            self.clock.tick(30)
-            mouse_pos = pygame.mouse.get_pos()
-
-            for event in pygame.event.get():
+            PROFILER.frame()
+            steps = timer.tick()
+            PROFILER.mark("tick")
+            events = IDLE.events(self._animating(), timer)
+            # Hiiren sijainti vasta tyhjäkäynnin odotuksen jälkeen (hover ajan tasalla)
+            mouse_pos = get_mouse_pos()
+
+            for event in events:
+                if PROFILER.handle_event(event):
+                    continue
                 if event.type == pygame.QUIT:
                     return credits
                 if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
                     return credits
+                if event.type == pygame.KEYDOWN and event.key == pygame.K_h:
+                    if self.phase == "hold" and self.hint_mask is not None:
+                        self.held = strategy.mask_to_held(self.hint_mask)
                 if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-                    if back_rect.collidepoint(mouse_pos):
+                    if back_rect.collidepoint(event.pos):
                         return credits
                     if self.phase == "finished":
-                        if new_game_rect.collidepoint(mouse_pos) and credits >= self.bet:
-                            credits -= self.bet
-                            self.deck = make_deck()
-                            self.hand = [self.deck.pop() for _ in range(5)]
-                            self.held = [False] * 5
-                            self.phase = "shuffle"
-                            self.result_text = ""
-                            self.win_amount = 0
-                            self.result_timer = 0
-                            self.shuffle_frame = 0
-                            self.deal_frame = 0
-                        elif back_rect.collidepoint(mouse_pos):
-                            return credits
-                    elif self.phase == "hold" and action_rect.collidepoint(mouse_pos):
-                        for i in range(5):
-                            if not self.held[i]:
-                                self.hand[i] = self.deck.pop()
-                        hand_name, mult = eval_hand(self.hand)
-                        self.win_amount = self.bet * mult if mult else 0
-                        credits += self.win_amount
-                        self.result_text = f"{hand_name}: +{self.win_amount}" if hand_name else "Ei voittoa"
-                        self.phase = "result"
-                        self.result_timer = 120
+                        if new_game_rect.collidepoint(event.pos) and credits >= self.wager:
+                            credits = self._begin_round(credits)
+                        elif hands_rect.collidepoint(event.pos):
+                            self._next_hand_count()
+                    elif self.phase == "hold" and action_rect.collidepoint(event.pos):
+                        credits = self._finish_round(credits)
                     elif self.phase == "hold":
                         for i in range(5):
-                            if self.hold_rects[i].collidepoint(mouse_pos):
+                            if self.hold_rects[i].collidepoint(event.pos):
                                 self.held[i] = not self.held[i]
                                 break
 
-            if self.phase == "shuffle":
-                self.shuffle_frame += 1
-                if self.shuffle_frame >= config.SHUFFLE_DURATION_FRAMES:
-                    self.phase = "dealing"
-                    self.deal_frame = 0
-            elif self.phase == "dealing":
-                self.deal_frame += 1
-                total_deal_frames = 5 * config.DEAL_DELAY_FRAMES
-                if self.deal_frame >= total_deal_frames:
-                    self.phase = "hold"
-                    self.result_text = "Valitse HOLD ja paina DEAL"
-
-            if self.result_timer > 0:
-                self.result_timer -= 1
-                if self.result_timer == 0:
-                    self.phase = "finished"
-
-            # Tausta: kehys + sininen pelialue
-            self.screen.fill(config.COLOR_BG)
-            pygame.draw.rect(self.screen, config.COLOR_SCREEN_BLUE, (self.game_left, 0, self.game_width, config.SCREEN_HEIGHT))
-            bar_h = draw_credits_bar(self.screen, credits, self.fonts)
-
-            _draw_paytable_full(self.screen, self.fonts)
-
-            # Oikealla ylhäällä: COIN VALUE, WAGER
-            wx = config.SCREEN_WIDTH - 100
-            draw_text(self.screen, "COIN VALUE", wx, bar_h + 8, self.fonts["small"], config.COLOR_TEXT_YELLOW)
-            draw_text(self.screen, str(self.bet), wx, bar_h + 24, self.fonts["normal"], config.COLOR_TEXT_YELLOW)
-            draw_text(self.screen, "WAGER", wx, bar_h + 44, self.fonts["small"], config.COLOR_TEXT_YELLOW)
-            draw_text(self.screen, str(self.bet), wx, bar_h + 60, self.fonts["normal"], config.COLOR_TEXT_YELLOW)
-
+            PROFILER.mark("events")
+            for _ in range(steps):
+                self._update(timer.step_ms)
+            PROFILER.mark("update")
+
+            # Vaiheen vaihtuessa koko ruutu, animaation aikana koko pelialue
+            if self.phase != drawn_phase:
+                dirty.invalidate()
+                drawn_phase = self.phase
+            if self.phase in ("shuffle", "dealing"):
+                dirty.add((self.game_left, CREDITS_BAR_HEIGHT, self.game_width,
+                           self.hold_rects[0].bottom + px(24) - CREDITS_BAR_HEIGHT))
+
+            # Tausta, paytable ja COIN VALUE / WAGER: välimuistitettu kerros
+            size = self.screen.get_size()
+            layer_key = (size, self.bet, self.hand_count, tuple(PAYTABLE.items()))
+            blit_layer(self.screen, "poker_bg", layer_key,
+                       lambda: _render_static_layer(size, self.fonts, self.game_left, self.bet, self.hand_count))
+            PROFILER.mark("background")
+            draws.begin()
+            jackpot = self.jackpot.amount if self.jackpot is not None else None
+            bar_h = draw_credits_bar(self.screen, credits, self.fonts, jackpot)
+            dirty.track("credits", (0, 0, config.SCENE_WIDTH, bar_h + px(2)), (credits, jackpot))
+            dirty.track("bet", (config.SCENE_WIDTH - px(100), bar_h + px(8), px(100), px(72)), (self.bet, self.hand_count))
+
+            # Moniläpelissä lisäkädet pääkäden yläpuolella ja tulosteksti HOLD-rivin alla
+            multi = self.hand_count > 1 and self.phase in ("hold", "result", "finished")
+            multi_key = None
+            if multi:
+                multi_key = self._multi_layer_key()
+                queue_blit(self.screen, get_layer("poker_multi", multi_key, self._render_multi_layer), MULTI_AREA)
+            dirty.track("multi", MULTI_AREA, multi_key)
+            result_y = self.hold_rects[0].bottom + px(24) if self.hand_count > 1 else px(128)
+
+            result_rect = None
             if self.phase not in ("shuffle", "dealing"):
-                draw_text(
+                result_rect = draw_text(
                     self.screen, self.result_text,
-                    cash_center_x, 128,
+                    cash_center_x, result_y,
                     self.fonts["normal"], config.COLOR_WIN if self.win_amount else config.COLOR_TEXT,
                     center=True
                 )
+            dirty.track("result", result_rect, (self.result_text, self.win_amount))
+            PROFILER.mark("ui")
 
             dx, dy = self.deck_pos
+            alpha = timer.alpha
             if self.phase == "shuffle":
-                wobble = 4 * math.sin(self.shuffle_frame * 0.35)
+                # Pakka heiluu ~1.7 kertaa sekunnissa (10.5 rad/s)
+                wobble = px(4) * math.sin(self.shuffle.time(alpha) * 0.0105)
                 for i in range(5):
-                    _draw_card(self.screen, int(dx + wobble + i * 2), dy + i * 2, self.card_w, self.card_h, None, None, self.fonts, face_up=False)
-                draw_text(self.screen, "Sekoitetaan...", cash_center_x, dy + self.card_h + 6,
+                    _draw_card(self.screen, int(dx + wobble + i * px(2)), dy + i * px(2), self.card_w, self.card_h, None, None, self.fonts, face_up=False)
+                draw_text(self.screen, "Sekoitetaan...", cash_center_x, dy + self.card_h + px(6),
                           self.fonts["small"], config.COLOR_TEXT_DIM, center=True)
             elif self.phase == "dealing":
-                cards_left = 5 - min(5, (self.deal_frame + config.DEAL_DELAY_FRAMES - 1) // config.DEAL_DELAY_FRAMES)
+                # Pakassa ovat kortit, joiden lento ei ole vielä alkanut
+                cards_left = sum(1 for tween in self.deal_tweens if tween.time(alpha) <= tween.delay_ms)
                 for i in range(cards_left):
-                    _draw_card(self.screen, dx + i * 2, dy + i * 2, self.card_w, self.card_h, None, None, self.fonts, face_up=False)
-                for i in range(5):
+                    _draw_card(self.screen, dx + i * px(2), dy + i * px(2), self.card_w, self.card_h, None, None, self.fonts, face_up=False)
+                for i, tween in enumerate(self.deal_tweens):
                     slot_x, slot_y = self.slot_positions[i]
-                    start_f = i * config.DEAL_DELAY_FRAMES
-                    end_f = (i + 1) * config.DEAL_DELAY_FRAMES
-                    if self.deal_frame >= end_f:
+                    progress = tween.progress(alpha)
+                    if progress >= 1.0:
                         _draw_card(self.screen, slot_x, slot_y, self.card_w, self.card_h,
                                    self.hand[i][0], self.hand[i][1], self.fonts, highlight=self.held[i])
-                    else:
-                        t = (self.deal_frame - start_f) / config.DEAL_DELAY_FRAMES
-                        t = t * t
-                        cx = int(dx + 2 + (slot_x - (dx + 2)) * t)
-                        cy = int(dy + 2 + (slot_y - (dy + 2)) * t)
+                    elif progress > 0.0:
+                        # Lentävät kortit pakan ja paikoillaan olevien korttien päällä
+                        t = tween.value(alpha)
+                        cx = int(lerp(dx + px(2), slot_x, t))
+                        cy = int(lerp(dy + px(2), slot_y, t))
+                        draws.layer = LAYER_MOVING
                         _draw_card(self.screen, cx, cy, self.card_w, self.card_h,
                                    self.hand[i][0], self.hand[i][1], self.fonts)
+                        draws.layer = LAYER_SPRITES
             else:
                 for i, (r, s) in enumerate(self.hand):
                     rx, ry = self.slot_positions[i]
                     _draw_card(self.screen, rx, ry, self.card_w, self.card_h, r, s, self.fonts, highlight=self.held[i])
+                    dirty.track(("card", i), (rx, ry, self.card_w, self.card_h), (r, s, self.held[i]))
+
+            PROFILER.mark("blits")
 
             # HOLD-napit korttien alla
             if self.phase in ("hold", "result", "finished"):
                 for i in range(5):
+                    hover = self.hold_rects[i].collidepoint(mouse_pos)
                     draw_button_hold(self.screen, self.hold_rects[i], "HOLD", self.fonts["small"],
-                                    active=self.held[i], hover=self.hold_rects[i].collidepoint(mouse_pos))
+                                    active=self.held[i], hover=hover)
+                    dirty.track(("hold", i), self.hold_rects[i], (self.held[i], hover))
+
+            # Vihje (optimi-HOLD) ja edellisen valinnan pisteytys HOLD-nappien alla
+            if self.phase == "hold" and config.POKER_HINTS and self.hint_mask is not None:
+                for i in range(5):
+                    if self.hint_mask >> i & 1:
+                        hr = self.hold_rects[i]
+                        draw_text(self.screen, "VIHJE", hr.centerx, hr.bottom + px(4),
+                                  self.fonts["small"], config.COLOR_TEXT_YELLOW, center=True)
+            elif self.phase in ("result", "finished") and self.decision_text:
+                draw_text(self.screen, self.decision_text, cash_center_x, self.hold_rects[0].bottom + px(4),
+                          self.fonts["small"], config.COLOR_TEXT_DIM, center=True)
+            dirty.track("hints", (self.game_left, self.hold_rects[0].bottom + px(2), self.game_width, px(20)),
+                        (self.phase, self.hint_mask, self.decision_text))
 
             # Alaosa: Takaisin | CASH | DEAL / Uusi peli
-            draw_cash_big(self.screen, credits, self.fonts, cash_center_x, bottom_y - 8)
+            cash_rect = draw_cash_big(self.screen, credits, self.fonts, cash_center_x, bottom_y - px(8))
+            dirty.track("cash", cash_rect, credits)
+            action_hover = None
             if self.phase == "hold":
+                action_hover = action_rect.collidepoint(mouse_pos)
                 draw_button(self.screen, action_rect, "DEAL", self.fonts["menu"],
-                            action_rect.collidepoint(mouse_pos), style="green")
+                            action_hover, style="green")
             elif self.phase == "finished":
+                action_hover = new_game_rect.collidepoint(mouse_pos) and credits >= self.wager
                 draw_button(self.screen, new_game_rect, "DEAL", self.fonts["menu"],
-                            new_game_rect.collidepoint(mouse_pos) and credits >= self.bet, style="green")
+                            action_hover, style="green")
+            dirty.track("action", action_rect, action_hover)
+            hands_hover = None
+            if self.phase == "finished":
+                hands_hover = hands_rect.collidepoint(mouse_pos)
+                draw_button(self.screen, hands_rect, f"KÄDET {self.hand_count}", self.fonts["small"],
+                            hands_hover, style="grey")
+            dirty.track("hands", hands_rect, (hands_hover, self.hand_count))
+            back_hover = back_rect.collidepoint(mouse_pos)
             draw_button(self.screen, back_rect, "EXIT", self.fonts["small"],
-                        back_rect.collidepoint(mouse_pos), style="grey")
+                        back_hover, style="grey")
+            dirty.track("exit", back_rect, back_hover)
+            PROFILER.mark("ui")
+            draws.flush()
+            PROFILER.mark("blits")
 
             if config.SCANLINE_ALPHA > 0:
                 draw_scanlines(self.screen)
-            pygame.display.flip()
+            PROFILER.mark("scanlines")
+            IDLE.draw_attract(self.screen, self.fonts, dirty)
+            PROFILER.draw_overlay(self.screen, self.fonts, dirty)
+            dirty.present()
+            PROFILER.mark("present")
         return credits
@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+"""
+Kuvien esilataus päävalikon tyhjäkäynnillä.
+
+Työt ajetaan pieninä paloina step()-kutsuissa enintään config.PREFETCH_BUDGET_MS
+millisekuntia ruutua kohden. CPU-raskas osa tehdään taustasäikeessä: SVG-korttien
+rasterointi (cairosvg, PNG-tavuiksi) sekä hedelmäkuvien PNG-dekoodaus ja
+skaalaus (pygame.image.load, smoothscale), joista syntyy näytöstä riippumattomia
+ohjelmistopintoja. Näyttöön sidottu työ jää pääsäikeeseen: korttien kokoaminen
+atlakseen, convert_alpha() näytön pikselimuotoon ja välimuistiin vienti.
+"""
+
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import config
+from games import card_assets, fruit_assets
+
+
+class _Job:
+    """Esilataustyö: run() palauttaa True kun valmis; advanced = jo valmistuneet kuvat."""
+
+    def __init__(self, name, count, run):
+        self.name = name
+        self.count = count
+        self.run = run
+        self.advanced = 0
+
+
+class AssetPrefetcher:
+    def __init__(self, budget_ms=None):
+        self.budget_ms = config.PREFETCH_BUDGET_MS if budget_ms is None else budget_ms
+        self.total = 0   # kuvia yhteensä
+        self.done = 0    # valmiita (tai ohitettuja) kuvia
+        self._jobs = deque()
+        self._cost_ms = {}     # työn nimi -> viimeisin kesto (arvio seuraavalle kerralle)
+        self._executor = None
+        self._futures = []
+
+    @property
+    def finished(self):
+        return not self._jobs
+
+    def progress(self):
+        """(valmiit, yhteensä)"""
+        return self.done, self.total
+
+    def _add(self, name, count, run):
+        job = _Job(name, count, run)
+        self.total += count
+        self._jobs.append(job)
+        return job
+
+    def _submit(self, fn, *args):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1)
+        future = self._executor.submit(fn, *args)
+        self._futures.append(future)
+        return future
+
+    def add_card_faces(self, width, height):
+        """Korttien kuvapuolet: levyltä atlaksena tai rasteroimalla taustasäikeessä."""
+        state = {"atlas": None, "pending": None}
+
+        def run():
+            if state["pending"] is None:
+                if card_assets.load_card_atlas(width, height, build=False):
+                    return True
+                state["atlas"] = card_assets.new_card_atlas(width, height)
+                state["pending"] = [
+                    (rank, suit, self._submit(card_assets.rasterize_card_png, rank, suit, width, height))
+                    for rank in card_assets.RANKS for suit in card_assets.SUITS
+                ]
+                return False
+            # Kootaan yksi valmis kortti per kutsu
+            pending = state["pending"]
+            ready = next((p for p in pending if p[2].done()), None)
+            if ready is not None:
+                pending.remove(ready)
+                rank, suit, future = ready
+                try:
+                    card_assets.blit_card_png(state["atlas"], rank, suit, width, height, future.result())
+                    job.advanced += 1
+                except Exception:
+                    # cairosvg puuttuu tai rasterointi epäonnistui: peli käyttää varakorttia
+                    for _, _, f in pending:
+                        f.cancel()
+                    pending.clear()
+                    state["atlas"] = None
+                    card_assets.mark_card_atlas_failed(width, height)
+            if pending:
+                return False
+            if state["atlas"] is not None:
+                # Käyttöön heti, levylle kirjoitus taustasäikeessä (atlasta ei enää muuteta)
+                card_assets.install_card_atlas(state["atlas"], width, height, save=False)
+                self._submit(card_assets.save_card_atlas, state["atlas"], width, height)
+                state["atlas"] = None
+            return True
+
+        job = self._add("cards", len(card_assets.RANKS) * len(card_assets.SUITS), run)
+
+    def add_card_back(self, width, height):
+        self._add("card_back", 1, lambda: card_assets.load_card_back_surface(width, height) or True)
+
+    def add_threaded(self, name, work, finish):
+        """Työ taustasäikeessä (work), tulos pääsäikeessä (finish(tulos))."""
+        state = {}
+
+        def run():
+            if "future" not in state:
+                state["future"] = self._submit(work)
+                return False
+            if not state["future"].done():
+                return False
+            try:
+                finish(state["future"].result())
+            except Exception:
+                pass  # kuva ladataan myöhemmin tavalliseen tapaan
+            return True
+
+        self._add(name, 1, run)
+
+    def add_fruits(self, width, height, symbols=None):
+        for sym in fruit_assets.SYMBOLS if symbols is None else symbols:
+            self.add_threaded(
+                "fruit",
+                lambda sym=sym: fruit_assets.decode_fruit_image(sym, width, height),
+                lambda surf, sym=sym: fruit_assets.store_fruit_surface(sym, width, height, surf),
+            )
+
+    def step(self):
+        """Ajaa töitä enintään budjetin verran. Palauttaa True kun kaikki on valmista."""
+        start = time.perf_counter()
+        ran = 0
+        waiting = 0
+        while self._jobs and waiting < len(self._jobs):
+            elapsed = (time.perf_counter() - start) * 1000
+            if elapsed >= self.budget_ms:
+                break
+            job = self._jobs[0]
+            # Ei aloiteta työtä, jonka arvioitu kesto ylittäisi budjetin (ellei ruudussa ole vielä tehty mitään)
+            if ran and elapsed + self._cost_ms.get(job.name, 0.0) > self.budget_ms:
+                break
+            before = job.advanced
+            t0 = time.perf_counter()
+            finished = job.run()
+            self._cost_ms[job.name] = (time.perf_counter() - t0) * 1000
+            ran += 1
+            self.done += job.advanced - before
+            if finished:
+                self._jobs.popleft()
+                self.done += job.count - job.advanced
+                waiting = 0
+            else:
+                # Odottaa taustasäiettä: vuoro seuraavalle työlle
+                self._jobs.rotate(-1)
+                waiting = 0 if job.advanced > before else waiting + 1
+        if not self._jobs and self._executor is not None:
+            # Jäljellä voi olla atlaksen tallennus; säie päättyy sen jälkeen
+            self._executor.shutdown(wait=False)
+            self._executor = None
+            self._futures = []
+        return not self._jobs
+
+    def close(self):
+        """Peruu odottavat taustatyöt (esim. ohjelman sulkeutuessa)."""
+        for future in self._futures:
+            future.cancel()
+        self._futures = []
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+def game_prefetcher():
+    """Esilataus pelien käyttämille kokoille (PokerGame-kortit, SlotGame- ja VideoSlotGame-hedelmät)."""
+    from games.poker import CARD_WIDTH, CARD_HEIGHT
+    from games.reels import SYMBOLS
+    from games.slot import ICON_WIDTH, ICON_HEIGHT
+    from games import video_slot
+    prefetcher = AssetPrefetcher()
+    prefetcher.add_card_back(CARD_WIDTH, CARD_HEIGHT)
+    prefetcher.add_fruits(ICON_WIDTH, ICON_HEIGHT, SYMBOLS)
+    prefetcher.add_fruits(video_slot.ICON_WIDTH, video_slot.ICON_HEIGHT)
+    prefetcher.add_card_faces(CARD_WIDTH, CARD_HEIGHT)
+    return prefetcher
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""
+Hedelmäpelin säännöt ilman pygamea: symbolit, voittotaulukko, rullat ja voiton tarkistus.
+
+Jokainen rulla on kiinteä REEL_LENGTH-pysähdyksen nauha, jonka pysähdyksillä
+on painot (virtuaalirulla). Pysähdyspaikka arvotaan kumulatiivisten painojen
+taulukosta puolitushaulla. Koska symbolien todennäköisyydet tunnetaan, RTP,
+osumatiheys ja varianssi saadaan suoraan laskemalla (reel_stats).
+"""
+
+import random
+import time
+from bisect import bisect_right
+from itertools import accumulate
+
+SYMBOLS = ["CHER", "LEM", "ORA", "GRAP", "GEM", "7"]
+PAYOUT = {"7": 10, "GEM": 5, "GRAP": 4, "ORA": 3, "LEM": 2, "CHER": 2}
+
+# Kuinka monta symbolia rullassa (toistuu)
+REEL_LENGTH = 20
+
+# Rullanauhat: (symboli, paino) per pysähdys. Painot antavat jokaiselle
+# symbolille saman kokonaispainon (12/72), eli sama todennäköisyys kuin
+# aiemmassa tasajakaumassa random.choice(SYMBOLS).
+REEL_STRIPS = [
+    [("CHER", 3), ("ORA", 4), ("LEM", 3), ("GEM", 4), ("GRAP", 4), ("7", 4),
+     ("CHER", 3), ("LEM", 3), ("ORA", 4), ("CHER", 3), ("GRAP", 4), ("LEM", 3),
+     ("GEM", 4), ("CHER", 3), ("7", 4), ("ORA", 4), ("LEM", 3), ("GRAP", 4),
+     ("GEM", 4), ("7", 4)],
+    [("LEM", 3), ("GRAP", 4), ("CHER", 3), ("7", 4), ("ORA", 4), ("LEM", 3),
+     ("GEM", 4), ("CHER", 3), ("GRAP", 4), ("LEM", 3), ("7", 4), ("ORA", 4),
+     ("CHER", 3), ("GEM", 4), ("LEM", 3), ("GRAP", 4), ("CHER", 3), ("ORA", 4),
+     ("7", 4), ("GEM", 4)],
+    [("ORA", 4), ("CHER", 3), ("GEM", 4), ("LEM", 3), ("7", 4), ("CHER", 3),
+     ("GRAP", 4), ("LEM", 3), ("ORA", 4), ("CHER", 3), ("GEM", 4), ("7", 4),
+     ("LEM", 3), ("GRAP", 4), ("CHER", 3), ("ORA", 4), ("LEM", 3), ("7", 4),
+     ("GRAP", 4), ("GEM", 4)],
+]
+
+
+class WeightedReel:
+    """Yksi rulla: nauhan symbolit ja pysähdysten kumulatiiviset painot."""
+
+    def __init__(self, stops):
+        self.symbols = [sym for sym, _ in stops]
+        self.weights = [w for _, w in stops]
+        self.cum_weights = list(accumulate(self.weights))
+        self.total = self.cum_weights[-1]
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def sample(self, rng=random):
+        """Arpoo pysähdyspaikan (indeksi nauhaan), O(log n)."""
+        return bisect_right(self.cum_weights, rng.randrange(self.total))
+
+    def probability(self, symbol):
+        return sum(w for sym, w in zip(self.symbols, self.weights) if sym == symbol) / self.total
+
+
+# Progressiivinen jackpot (jackpot.py): kolme tätä symbolia
+JACKPOT_SYMBOL = "7"
+
+# Rullat ladataan kerran moduulin latauksessa
+REELS = [WeightedReel(stops) for stops in REEL_STRIPS]
+
+
+def spin_stops(rng=random, reels=REELS):
+    """Yhden pyöräytyksen pysähdyspaikat."""
+    return [reel.sample(rng) for reel in reels]
+
+
+def stop_symbols(stops, reels=REELS):
+    return [reel.symbols[s] for reel, s in zip(reels, stops)]
+
+
+def spin_symbols(rng=random, reels=REELS):
+    """Yhden pyöräytyksen tulos: symboli per rulla."""
+    return stop_symbols(spin_stops(rng, reels), reels)
+
+
+def check_win(reels, bet):
+    """Kolme samaa = panos * PAYOUT, muuten 0."""
+    if reels[0] == reels[1] == reels[2]:
+        return bet * PAYOUT.get(reels[0], 1)
+    return 0
+
+
+def is_jackpot(reels):
+    """Progressiivisen jackpotin laukaisu: kaikki rullat JACKPOT_SYMBOL."""
+    return all(sym == JACKPOT_SYMBOL for sym in reels)
+
+
+def reel_stats(reels=REELS, payout=None):
+    """
+    Tarkka RTP, osumatiheys ja varianssi (voitto / panos) rullista ja
+    voittotaulukosta: voitto vain kun kaikki rullat näyttävät saman symbolin.
+    """
+    if payout is None:
+        payout = PAYOUT
+    rtp = 0.0
+    hit_rate = 0.0
+    second_moment = 0.0
+    for sym in SYMBOLS:
+        p = 1.0
+        for reel in reels:
+            p *= reel.probability(sym)
+        pay = payout.get(sym, 1)
+        hit_rate += p
+        rtp += p * pay
+        second_moment += p * pay * pay
+    return {"rtp": rtp, "hit_rate": hit_rate, "variance": second_moment - rtp * rtp}
+
+
+if __name__ == "__main__":
+    t0 = time.perf_counter()
+    stats = reel_stats()
+    elapsed = (time.perf_counter() - t0) * 1000
+    print(f"RTP:         {stats['rtp'] * 100:.4f} %")
+    print(f"Osumatiheys: {stats['hit_rate'] * 100:.4f} %")
+    print(f"Varianssi:   {stats['variance']:.4f}")
+    print(f"Laskenta:    {elapsed:.3f} ms")
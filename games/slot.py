@@ -2,184 +2,384 @@
 """Hedelmäpeli (slot) – visuaaliset pyörivät rullat, 80-luku pixel-tyyli."""
 
 import random
+
 import pygame
 
 import config
-from ui import draw_text, draw_button, draw_credits_bar, draw_scanlines
+from anim import FixedStepClock
+from asset_cache import ASSETS, reduce_surface
+from journal import GAME_SLOT, new_round_seed
+from rng import RNG
+from idle import IDLE
+from profiler import PROFILER
+from ui import (
+    draw_text, draw_button, draw_credits_bar, draw_scanlines, DirtyRects, DrawList, queue_blit, fill_rect,
+    blit_layer, background_layer, get_mouse_pos, px, CREDITS_BAR_HEIGHT,
+)
 from games import fruit_assets
+from games.reels import REELS, check_win, is_jackpot, spin_stops, stop_symbols
 
 
-SYMBOLS = ["CHER", "LEM", "ORA", "GRAP", "GEM", "7"]
-PAYOUT = {"7": 10, "GEM": 5, "GRAP": 4, "ORA": 3, "LEM": 2, "CHER": 2}
-
 # Rullan korkeus yhdelle symbolille (pikseliä)
-SYMBOL_HEIGHT = 72
-# Kuinka monta symbolia rullassa (toistuu)
-REEL_LENGTH = 20
+SYMBOL_HEIGHT = px(72)
 # Näkyvissä 3 symbolia per rulla (keskimmäinen = tulos)
 VISIBLE_SYMBOLS = 3
+# Rullaikkunan leveys ja hedelmäkuvan koko (myös esilataus käyttää näitä)
+SLOT_WIDTH = px(110)
+ICON_WIDTH = SLOT_WIDTH - px(12)
+ICON_HEIGHT = SYMBOL_HEIGHT - px(8)
+# Rullaikkunoiden yläreuna
+REEL_TOP = px(165)
+# Alle tämän nopeuden (symbolia/s) pysähtyvä rulla napsahtaa tulokseen
+REEL_STOP_SPEED = 1.8
 
 
-def _build_reel_strip(final_symbol):
-    """Rulla jossa final_symbol on varmasti jossain (indeksissä REEL_LENGTH//2)."""
-    strip = [random.choice(SYMBOLS) for _ in range(REEL_LENGTH)]
-    strip[REEL_LENGTH // 2] = final_symbol
-    return strip
+def render_strip(strip, slot_w, symbol_h, icon_w, icon_h, font, blur=0):
+    """
+    Rullanauha yhdeksi korkeaksi pinnaksi: symbolit ylhäältä alas ja loppuun
+    VISIBLE_SYMBOLS + 1 ensimmäistä uudelleen, jotta ikkuna on aina yksi
+    yhtenäinen alue (blit area=) myös nauhan kierroksen kohdalla.
+    blur > 1: pystysuuntainen liike-epäterävyys (blur rivin keskiarvo).
+    """
+    period = len(strip) * symbol_h
+    surf = pygame.Surface((slot_w, period + (VISIBLE_SYMBOLS + 1) * symbol_h))
+    surf.fill(config.COLOR_CARD_BG)
+    ix = (slot_w - icon_w) // 2
+    iy = (symbol_h - icon_h) // 2
+    for i in range(len(strip) + VISIBLE_SYMBOLS + 1):
+        sym = strip[i % len(strip)]
+        y = i * symbol_h
+        img = fruit_assets.load_fruit_surface(sym, icon_w, icon_h)
+        if img is not None:
+            surf.blit(img, (ix, y + iy))
+        else:
+            draw_text(surf, sym, slot_w // 2, y + symbol_h // 2 - px(12), font, config.COLOR_TEXT, center=True)
+    if blur > 1:
+        sharp = surf.copy()
+        for k in range(1, blur):
+            # Juokseva keskiarvo: k+1:s siirretty kopio painolla 1/(k+1). Nauha on
+            # jaksollinen, joten ylimmät k riviä saadaan jakson lopusta.
+            sharp.set_alpha(round(255 / (k + 1)))
+            surf.blit(sharp, (0, k))
+            surf.blit(sharp, (0, 0), (0, period - k, slot_w, k))
+    if pygame.display.get_surface() is not None:
+        surf = surf.convert()
+    return surf
 
 
 class SlotGame:
-    def __init__(self, screen, clock, fonts):
+    # Rullasto, ikkunan mitat ja otsikko (games.video_slot.VideoSlotGame vaihtaa nämä)
+    reel_set = REELS
+    slot_width = SLOT_WIDTH
+    symbol_height = SYMBOL_HEIGHT
+    reel_gap = px(16)
+    reel_top = REEL_TOP
+    result_y = px(305)
+    title = "HEDELMAPELI"
+    game_id = GAME_SLOT  # pelipalvelimen SPIN-pyynnössä ja RNG-virta
+    health_name = "slot"  # rng.HealthMonitorin testi
+    lines = 1
+
+    def __init__(self, screen, clock, fonts, journal=None, credit_store=None, server=None, jackpot=None,
+                 meters=None):
         self.screen = screen
         self.clock = clock
         self.fonts = fonts
+        self.journal = journal  # journal.RoundJournal tai None
+        self.credit_store = credit_store  # credits.CreditStore tai None
+        self.server = server  # remote.RemoteSeat tai None (pyöräytys ja creditit palvelimella)
+        self.jackpot = jackpot  # jackpot.JackpotPool tai None
+        self.meters = meters  # meters.Meters tai None
         self.bet = config.MIN_BET
-        self.reels = [random.choice(SYMBOLS) for _ in range(3)]
-        self.reel_strips = [_build_reel_strip(s) for s in self.reels]
-        self.reel_offsets = [0.0, 0.0, 0.0]  # symboli-indeksi (float), pyörii
-        self.reel_speeds = [0.0, 0.0, 0.0]
-        self.stopped = [True, True, True]
-        self.stop_started = [False, False, False]  # pysaytys kaynnistyy perakkain
+        self.round_seed = 0
+        # Kiinteät painotetut rullanauhat (games.reels); tulos = pysähdyspaikat
+        self.reel_strips = [reel.symbols for reel in self.reel_set]
+        count = len(self.reel_strips)
+        self.stops = spin_stops(RNG.stream(self.game_id), self.reel_set)
+        self.reels = stop_symbols(self.stops, self.reel_set)
+        # symboli-indeksi (float), pyörii
+        self.reel_offsets = [(s - 1) % len(strip) for s, strip in zip(self.stops, self.reel_strips)]
+        self.prev_offsets = list(self.reel_offsets)  # edellisen logiikka-askeleen offsetit (interpolointi)
+        self.reel_speeds = [0.0] * count  # symbolia sekunnissa
+        self.stopped = [True] * count
+        self.stop_started = [False] * count  # pysaytys kaynnistyy perakkain
         self.spinning = False
         self.result_message = ""
-        self.result_timer = 0
-        self.stop_frame = 0
-        self.slot_w = 110
-        self.slot_h = SYMBOL_HEIGHT * VISIBLE_SYMBOLS
-        self.reel_start_x = (config.SCREEN_WIDTH - 3 * self.slot_w - 2 * 16) // 2
-        self.icon_w = self.slot_w - 12
-        self.icon_h = SYMBOL_HEIGHT - 8
+        self.result_ms = 0
+        self.spin_ms = 0
+        self.slot_w = self.slot_width
+        self.slot_h = self.symbol_height * VISIBLE_SYMBOLS
+        self.reel_start_x = (config.SCENE_WIDTH - count * self.slot_w - (count - 1) * self.reel_gap) // 2
+        self.icon_w = self.slot_w - px(12)
+        self.icon_h = self.symbol_height - px(8)
+        # Esikootut rullanauhat välimuistissa: ("strip", nauha, mitat) + (sumennus,)
+        self._strip_keys = [
+            ("strip", tuple(strip), self.slot_w, self.symbol_height, self.icon_w, self.icon_h) for strip in self.reel_strips
+        ]
+
+    @property
+    def wager(self):
+        """Pyöräytyksen kokonaispanos (panos per linja x linjat)."""
+        return self.bet * self.lines
+
+    def _bet_text(self):
+        return f"Panos: {self.bet}"
+
+    def _handle_click(self, pos):
+        """Pelikohtaiset napit pyöräytysten välillä. True jos klikkaus käsiteltiin."""
+        return False
+
+    def _draw_extras(self, dirty, mouse_pos):
+        """Pelikohtainen piirto rullien päälle (ja napit)."""
 
     def run(self, credits):
-        play_rect = pygame.Rect(config.SCREEN_WIDTH // 2 - 100, 380, 200, 50)
-        back_rect = pygame.Rect(20, config.SCREEN_HEIGHT - 60, 120, 40)
+        """Pelisilmukka; hedelmäkuvat ja rullanauhat pysyvät välimuistissa pelin ajan."""
+        ASSETS.pin(self, ("fruit", self.icon_w, self.icon_h), *self._strip_keys)
+        try:
+            return self._run(credits)
+        finally:
+            ASSETS.unpin(self)
+
+    def _run(self, credits):
+        play_rect = pygame.Rect(config.SCENE_WIDTH // 2 - px(100), px(380), px(200), px(50))
+        back_rect = pygame.Rect(px(20), config.SCENE_HEIGHT - px(60), px(120), px(40))
+        dirty = DirtyRects(self.screen)
+        draws = DrawList(self.screen)
+        self._prepare_strips()
+        timer = FixedStepClock(self.clock)
 
         while True:
-            self.clock.tick(30)
-            mouse_pos = pygame.mouse.get_pos()
-            dt = 1.0
+            PROFILER.frame()
+            steps = timer.tick()
+            PROFILER.mark("tick")
+            events = IDLE.events(self.spinning or self.result_ms > 0, timer)
+            # Hiiren sijainti vasta tyhjäkäynnin odotuksen jälkeen (hover ajan tasalla)
+            mouse_pos = get_mouse_pos()
 
-            for event in pygame.event.get():
+            for event in events:
+                if PROFILER.handle_event(event):
+                    continue
                 if event.type == pygame.QUIT:
                     return credits
                 if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
                     return credits
                 if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-                    if back_rect.collidepoint(mouse_pos):
+                    if back_rect.collidepoint(event.pos):
                         return credits
-                    if play_rect.collidepoint(mouse_pos) and not self.spinning and credits >= self.bet:
-                        credits -= self.bet
-                        self._start_spin()
-
-            if self.spinning:
-                self.stop_frame += 1
-                for i in range(3):
-                    if not self.stopped[i]:
-                        self.reel_offsets[i] += self.reel_speeds[i]
-                        if self.reel_offsets[i] >= REEL_LENGTH:
-                            self.reel_offsets[i] -= REEL_LENGTH
-                        # Pysaytys alkaa vain kun tämä rulla on vuorossa (rulla 0, sitten 1, sitten 2)
-                        stop_at = [30, 30 + config.SLOT_STOP_DELAY, 30 + 2 * config.SLOT_STOP_DELAY]
-                        if self.stop_frame >= stop_at[i]:
-                            self.stop_started[i] = True
-                        if self.stop_started[i]:
-                            if self.reel_speeds[i] > 0.06:
-                                self.reel_speeds[i] *= 0.90
-                            else:
-                                self.reel_speeds[i] = 0
-                                self.reel_offsets[i] = REEL_LENGTH // 2 - 0.5  # keski = tulos
-                                self.stopped[i] = True
-                if all(self.stopped):
-                    self.spinning = False
-                    self.reels = [
-                        self.reel_strips[i][(int(self.reel_offsets[i]) + 1) % REEL_LENGTH]
-                        for i in range(3)
-                    ]
-                    win = self._check_win()
-                    if win > 0:
-                        credits += win
-                        self.result_message = f"VOITTO: {win}!"
-                    else:
-                        self.result_message = "Ei voittoa"
-                    self.result_timer = 90
-
-            if self.result_timer > 0:
-                self.result_timer -= 1
-
-            self.screen.fill(config.COLOR_BG)
-            pygame.draw.rect(self.screen, config.COLOR_SCREEN_BLUE, (0, 0, config.SCREEN_WIDTH, config.SCREEN_HEIGHT))
-            bar_h = draw_credits_bar(self.screen, credits, self.fonts)
-
-            draw_text(
-                self.screen, "HEDELMAPELI",
-                config.SCREEN_WIDTH // 2, bar_h + 22,
-                self.fonts["title"], config.COLOR_TEXT_YELLOW, center=True
-            )
-            draw_text(
-                self.screen, f"Panos: {self.bet}",
-                config.SCREEN_WIDTH // 2, bar_h + 58,
-                self.fonts["normal"], config.COLOR_TEXT_DIM, center=True
-            )
-
-            # Kolme rullaa: ikkuna jossa symbolit liikkuvat (harmaa laatikko, valkoinen reuna)
-            for r in range(3):
-                rx = self.reel_start_x + r * (self.slot_w + 16)
-                ry = 165
-                pygame.draw.rect(self.screen, config.COLOR_CARD_BG, (rx, ry, self.slot_w, self.slot_h))
-                pygame.draw.rect(self.screen, config.COLOR_CARD_BORDER, (rx, ry, self.slot_w, self.slot_h), 3)
-                # Piirrä näkyvät symbolit (scroll) – hedelmäkuvat
-                base = self.reel_offsets[r]
-                for v in range(VISIBLE_SYMBOLS + 1):
-                    idx = (int(base) + v) % REEL_LENGTH
-                    sym = self.reel_strips[r][idx]
-                    py_ = ry + v * SYMBOL_HEIGHT - (base % 1.0) * SYMBOL_HEIGHT
-                    if py_ + SYMBOL_HEIGHT >= ry and py_ < ry + self.slot_h:
-                        img = fruit_assets.load_fruit_surface(sym, self.icon_w, self.icon_h)
-                        if img is not None:
-                            ix = rx + (self.slot_w - self.icon_w) // 2
-                            self.screen.blit(img, (ix, int(py_) + (SYMBOL_HEIGHT - self.icon_h) // 2))
-                        else:
-                            draw_text(
-                                self.screen, sym,
-                                rx + self.slot_w // 2, int(py_) + SYMBOL_HEIGHT // 2 - 12,
-                                self.fonts["normal"], config.COLOR_TEXT, center=True
-                            )
-
-            if self.result_timer > 0 and self.result_message:
+                    if not self.spinning and self._handle_click(event.pos):
+                        continue
+                    if play_rect.collidepoint(event.pos) and not self.spinning and credits >= self.wager:
+                        credits = self._begin_spin(credits)
+
+            PROFILER.mark("events")
+            for _ in range(steps):
+                win = self._update(timer.step_ms)
+                if win is not None:
+                    credits += win
+                    if self.credit_store is not None:
+                        self.credit_store.update(credits, won=win)
+                        self.credit_store.commit()
+                    if self.jackpot is not None:
+                        self.jackpot.maybe_checkpoint()
+            PROFILER.mark("update")
+
+            # Tausta, otsikko ja panos: välimuistitettu kerros
+            size = self.screen.get_size()
+            blit_layer(self.screen, "slot_bg", (size, self.title, self._bet_text()),
+                       lambda: self._render_static_layer(size))
+            PROFILER.mark("background")
+            draws.begin()
+            jackpot = self.jackpot.amount if self.jackpot is not None else None
+            bar_h = draw_credits_bar(self.screen, credits, self.fonts, jackpot)
+            dirty.track("credits", (0, 0, config.SCENE_WIDTH, bar_h + px(2)), (credits, jackpot))
+            dirty.track("bet", (0, bar_h + px(58), config.SCENE_WIDTH, px(24)), self._bet_text())
+            PROFILER.mark("ui")
+
+            # Rullat, offset interpoloituna logiikka-askelten välillä
+            for r in range(len(self.reel_strips)):
+                base = self._reel_offset(r, timer.alpha)
+                rect = self._draw_reel(self.screen, r, base)
+                dirty.track(("reel", r), rect, base)
+            self._draw_extras(dirty, mouse_pos)
+
+            PROFILER.mark("blits")
+
+            result_rect = None
+            if self.result_ms > 0 and self.result_message:
                 color = config.COLOR_WIN if "VOITTO" in self.result_message else config.COLOR_TEXT
-                draw_text(
+                result_rect = draw_text(
                     self.screen, self.result_message,
-                    config.SCREEN_WIDTH // 2, 305,
+                    config.SCENE_WIDTH // 2, self.result_y,
                     self.fonts["menu"], color, center=True
                 )
+            dirty.track("result", result_rect, self.result_message)
 
-            if not self.spinning and credits >= self.bet:
-                draw_button(self.screen, play_rect, "PELAA", self.fonts["menu"],
-                            play_rect.collidepoint(mouse_pos), style="green")
+            if not self.spinning and credits >= self.wager:
+                play_state = ("PELAA", play_rect.collidepoint(mouse_pos))
             else:
-                draw_button(self.screen, play_rect,
-                            "PELAA" if self.spinning else "Lisaa creditteja",
-                            self.fonts["menu"], False, style="green")
+                play_state = ("PELAA" if self.spinning else "Lisaa creditteja", False)
+            draw_button(self.screen, play_rect, play_state[0], self.fonts["menu"],
+                        play_state[1], style="green")
+            dirty.track("play", play_rect, play_state)
+            back_hover = back_rect.collidepoint(mouse_pos)
             draw_button(self.screen, back_rect, "EXIT", self.fonts["small"],
-                        back_rect.collidepoint(mouse_pos), style="grey")
+                        back_hover, style="grey")
+            dirty.track("exit", back_rect, back_hover)
+            PROFILER.mark("ui")
+            draws.flush()
+            PROFILER.mark("blits")
 
             if config.SCANLINE_ALPHA > 0:
                 draw_scanlines(self.screen)
-            pygame.display.flip()
+            PROFILER.mark("scanlines")
+            IDLE.draw_attract(self.screen, self.fonts, dirty)
+            PROFILER.draw_overlay(self.screen, self.fonts, dirty)
+            dirty.present()
+            PROFILER.mark("present")
+        return credits
+
+    def _strip_surface(self, r, blur=False):
+        """Rullan r esikoottu nauha (välimuistista); blur = liike-epäterävä versio."""
+        blur_px = config.SLOT_MOTION_BLUR_PX if blur else 0
+        key = self._strip_keys[r] + (blur_px,)
+        surf = ASSETS.get(key)
+        if surf is None:
+            surf = ASSETS.put(key, reduce_surface(render_strip(
+                self.reel_strips[r], self.slot_w, self.symbol_height, self.icon_w, self.icon_h,
+                self.fonts["normal"], blur_px,
+            )))
+        return surf
+
+    def _prepare_strips(self):
+        """Kootaan nauhat (ja sumennetut versiot) valmiiksi pelin alussa, ei ensimmäisen pyöräytyksen ruudulla."""
+        for r in range(len(self.reel_strips)):
+            self._strip_surface(r)
+            if config.SLOT_MOTION_BLUR_PX > 1:
+                self._strip_surface(r, blur=True)
+
+    def _draw_reel(self, surface, r, base):
+        """Rulla r offsetilla base: yksi blit esikootusta nauhasta ja ikkunan valkoinen reuna."""
+        window = pygame.Rect(self.reel_start_x + r * (self.slot_w + self.reel_gap), self.reel_top,
+                             self.slot_w, self.slot_h)
+        blur = config.SLOT_MOTION_BLUR_PX > 1 and self.reel_speeds[r] >= config.SLOT_BLUR_MIN_SPEED
+        period = len(self.reel_strips[r]) * self.symbol_height
+        y = int(round(base * self.symbol_height)) % period
+        queue_blit(surface, self._strip_surface(r, blur), window, (0, y, self.slot_w, self.slot_h))
+        fill_rect(surface, config.COLOR_CARD_BORDER, window, px(3))
+        return window
+
+    def _render_static_layer(self, size):
+        surf = background_layer(size, title=self.title, fonts=self.fonts, title_y=CREDITS_BAR_HEIGHT + px(22))
+        draw_text(
+            surf, self._bet_text(),
+            size[0] // 2, CREDITS_BAR_HEIGHT + px(58),
+            self.fonts["normal"], config.COLOR_TEXT_DIM, center=True
+        )
+        return surf
+
+    def _update(self, dt_ms):
+        """Yksi logiikka-askel (dt_ms). Palauttaa kierroksen voiton, kun pyöräytys päättyy, muuten None."""
+        self.prev_offsets = list(self.reel_offsets)
+        if self.result_ms > 0:
+            self.result_ms = max(0, self.result_ms - dt_ms)
+        if not self.spinning:
+            return None
+        self.spin_ms += dt_ms
+        decay = 0.5 ** (dt_ms / config.SLOT_REEL_HALF_LIFE_MS)
+        for i, strip in enumerate(self.reel_strips):
+            if self.stopped[i]:
+                continue
+            self.reel_offsets[i] = (self.reel_offsets[i] + self.reel_speeds[i] * dt_ms / 1000) % len(strip)
+            # Pysaytys alkaa vain kun tämä rulla on vuorossa (rulla 0, sitten 1, ...)
+            if self.spin_ms >= config.SLOT_SPIN_MS + i * config.SLOT_STOP_DELAY_MS:
+                self.stop_started[i] = True
+            if self.stop_started[i]:
+                if self.reel_speeds[i] > REEL_STOP_SPEED:
+                    self.reel_speeds[i] *= decay
+                else:
+                    self.reel_speeds[i] = 0
+                    # Keskimmäinen näkyvä rivi = arvottu pysähdyspaikka
+                    self.reel_offsets[i] = float((self.stops[i] - 1) % len(strip))
+                    self.stopped[i] = True
+        if not all(self.stopped):
+            return None
+        self.spinning = False
+        self.reels = [
+            strip[(int(offset) + 1) % len(strip)]
+            for strip, offset in zip(self.reel_strips, self.reel_offsets)
+        ]
+        win = self._check_win()
+        self.result_message = f"VOITTO: {win}!" if win > 0 else "Ei voittoa"
+        self.result_ms = config.SLOT_RESULT_MS
+        if self.journal is not None:
+            self._record(win)
+        amount = 0
+        if self.jackpot is not None and self._jackpot_hit():
+            amount = self.jackpot.award()
+            if self.journal is not None:
+                self.journal.record_jackpot(self.round_seed, amount, self.game_id, stops=self.stops, index=self.lines)
+            self.result_message = f"JACKPOT! VOITTO: {win + amount}!"
+        if self.meters is not None:
+            self.meters.record_round(self.game_id, win, self._outcomes(), amount)
+        return win + amount
+
+    def _jackpot_hit(self):
+        """Progressiivisen jackpotin laukaisu (games.reels.is_jackpot)."""
+        return is_jackpot(self.reels)
+
+    def _outcomes(self):
+        """Mittarien osumat: kolmen saman symboli."""
+        return [self.reels[0]] if len(set(self.reels)) == 1 else []
+
+    def _record(self, win):
+        self.journal.record_slot(self.round_seed, self.bet, win, self.stops)
+
+    def _reel_offset(self, r, alpha):
+        """Rullan offset piirtoa varten: edellisen ja nykyisen askeleen välistä."""
+        prev, cur = self.prev_offsets[r], self.reel_offsets[r]
+        length = len(self.reel_strips[r])
+        diff = (cur - prev) % length
+        if diff > length / 2:
+            diff -= length  # pysähdyksen napsahdus taaksepäin
+        return (prev + diff * alpha) % length
+
+    def _begin_spin(self, credits):
+        """
+        Panos ja pyöräytyksen aloitus. Palauttaa saldon panoksen jälkeen; voitto
+        lisätään vasta rullien pysähtyessä (myös palvelimen jo hyvittämä).
+        """
+        if self.server is not None:
+            seed, win, stops = self.server.spin(self.game_id, self.bet, self.lines)
+            self._start_spin(seed, stops[:len(self.reel_set)])
+            return self.server.credits - win
+        credits -= self.wager
+        if self.credit_store is not None:
+            # Levylle vasta pyöräytyksen lopussa (kesken jäänyt kierros ei veloita)
+            self.credit_store.update(credits, bet=self.wager)
+        if self.jackpot is not None:
+            self.jackpot.contribute(self.wager)
+        self._start_spin()
         return credits
 
-    def _start_spin(self):
-        self.reels = [random.choice(SYMBOLS) for _ in range(3)]
-        self.reel_strips = [_build_reel_strip(s) for s in self.reels]
-        self.reel_offsets = [0.0, 0.0, 0.0]
-        self.reel_speeds = [config.SLOT_REEL_SPEED / SYMBOL_HEIGHT * 2] * 3
-        self.stopped = [False, False, False]
+    def _start_spin(self, seed=None, stops=None):
+        # Tulos arvotaan heti kierroksen siemenestä (tai tulee palvelimelta); rullat jatkavat nykyisestä kohdasta
+        if self.meters is not None:
+            self.meters.record_bet(self.game_id, self.wager)
+        if stops is None:
+            self.round_seed = new_round_seed(RNG.stream(self.game_id))
+            self.stops = spin_stops(random.Random(self.round_seed), self.reel_set)
+            RNG.health.observe_stops(self.health_name, self.reel_set, self.stops)
+        else:
+            self.round_seed, self.stops = seed, stops
+        self.reels = stop_symbols(self.stops, self.reel_set)
+        count = len(self.reel_strips)
+        self.reel_speeds = [float(config.SLOT_REEL_SPEED)] * count
+        self.stopped = [False] * count
         self.spinning = True
         self.result_message = ""
-        self.result_timer = 0
-        self.stop_started = [False, False, False]
-        self.stop_frame = 0
+        self.result_ms = 0
+        self.stop_started = [False] * count
+        self.spin_ms = 0
 
     def _check_win(self):
-        if self.reels[0] == self.reels[1] == self.reels[2]:
-            return self.bet * PAYOUT.get(self.reels[0], 1)
-        return 0
+        return check_win(self.reels, self.bet)
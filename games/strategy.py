@@ -0,0 +1,311 @@
+# -*- coding: utf-8 -*-
+"""
+Jacks or Better -optimistrategia: kaikkien 32 HOLD-valinnan tarkka odotusarvo.
+
+Jokaiselle 0–4 kortin osajoukolle X lasketaan kerran T[X] = niiden viiden
+kortin käsien voittokertoimien summa, jotka sisältävät X:n. Pidä H, hylkää D:
+    summa = Σ_{S ⊆ D} (-1)^|S| · T[H ∪ S]
+(inkluusio–ekskluusio poistaa hylättyjä kortteja sisältävät täydennykset).
+Yksi käsi vaatii näin 32 taulukkohakua (käden osajoukot) ja 5 bitin
+Möbius-muunnoksen kaikille 32 valinnalle.
+
+Taulukko (~2.4 MB) rakennetaan kerran (`python -m games.strategy`) ja
+tallennetaan config.CACHE_DIR-hakemistoon paytablen mukaan nimettynä.
+Käsikohtaiset tulokset muistetaan maasymmetrian mukaan kanonisoituina.
+
+Simulointia varten `python -m games.strategy --best-masks` laskee lisäksi
+jokaisen 2 598 960 käden parhaan HOLD-maskin tavutaulukoksi (~2.6 MB),
+jolloin optimistrategia on yksi taulukkohaku kättä kohden.
+"""
+
+import hashlib
+import itertools
+import os
+import sys
+import time
+from array import array
+
+import config
+from games.hand_eval import PAYTABLE, encode_cards, eval_code, eval_hands, pay_multipliers
+
+# _BINOM[n][k] = C(n, k), k <= 5
+_BINOM = [[1, 0, 0, 0, 0, 0]]
+for _n in range(1, 53):
+    _prev = _BINOM[-1]
+    _BINOM.append([1] + [_prev[_k - 1] + _prev[_k] for _k in range(1, 6)])
+
+_TABLES = None       # [T0, T1, T2, T3, T4] array('q'), indeksi = colex-indeksi
+_TABLES_KEY = None
+_TABLES_PAYS = None  # taulukon paytablen kertoimet käsikoodeittain (_solve)
+_WARNED = set()      # puuttuvat taulukot, joista on jo varoitettu
+_EV_CACHE = {}
+_EV_CACHE_MAX = 4096
+
+# Maiden 24 permutaatiota kanonisointiin
+_SUIT_PERMS = list(itertools.permutations(range(4)))
+# HOLD-maskin täydennysten määrä C(47, hylätyt)
+_COMPLETIONS = [_BINOM[47][5 - bin(mask).count("1")] for mask in range(32)]
+
+
+def _colex(cards):
+    """Järjestetyn korttijoukon colex-indeksi."""
+    idx = 0
+    for i, c in enumerate(cards):
+        idx += _BINOM[c][i + 1]
+    return idx
+
+
+def _paytable_key(paytable):
+    pays = ",".join(str(p) for p in pay_multipliers(paytable))
+    return hashlib.sha1(pays.encode("ascii")).hexdigest()[:12]
+
+
+def _cache_path(paytable):
+    return os.path.join(config.CACHE_DIR, f"strategy_{_paytable_key(paytable)}.bin")
+
+
+def _masks_path(paytable):
+    return os.path.join(config.CACHE_DIR, f"bestmask_{_paytable_key(paytable)}.bin")
+
+
+def build_tables(paytable=None):
+    """Laskee osajoukkotaulukot läpikäymällä kaikki 2 598 960 kättä."""
+    pays = pay_multipliers(paytable)
+    t4 = array("q", bytes(8 * _BINOM[52][4]))
+    b1 = [_BINOM[c][1] for c in range(52)]
+    b2 = [_BINOM[c][2] for c in range(52)]
+    b3 = [_BINOM[c][3] for c in range(52)]
+    b4 = [_BINOM[c][4] for c in range(52)]
+    for a, b, c, d in itertools.combinations(range(52), 4):
+        tail = range(d + 1, 52)
+        codes = eval_hands([(a, b, c, d, e) for e in tail])
+        i_abcd = b1[a] + b2[b] + b3[c] + b4[d]
+        i_abc = b1[a] + b2[b] + b3[c]
+        i_ab = b1[a] + b2[b]
+        for e, code in zip(tail, codes):
+            p = pays[code]
+            if p:
+                t4[i_abcd] += p
+                t4[i_abc + b4[e]] += p
+                t4[i_ab + b3[d] + b4[e]] += p
+                t4[b1[a] + b2[c] + b3[d] + b4[e]] += p
+                t4[b1[b] + b2[c] + b3[d] + b4[e]] += p
+    tables = [None, None, None, None, t4]
+    # T_k[X] = Σ_{c ∉ X} T_{k+1}[X ∪ c] / (5 - k)
+    for k in (3, 2, 1, 0):
+        upper = tables[k + 1]
+        t = array("q", bytes(8 * _BINOM[52][k]))
+        for x in itertools.combinations(range(52), k):
+            total = 0
+            members = set(x)
+            for c in range(52):
+                if c not in members:
+                    total += upper[_colex(sorted(x + (c,)))]
+            t[_colex(x)] = total // (5 - k)
+        tables[k] = t
+    return tables
+
+
+def _save_tables(tables, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        for t in tables:
+            t.tofile(f)
+    os.replace(tmp, path)
+
+
+def _load_tables_file(path):
+    tables = []
+    with open(path, "rb") as f:
+        for k in range(5):
+            t = array("q")
+            t.fromfile(f, _BINOM[52][k])
+            tables.append(t)
+    return tables
+
+
+def load_tables(build=False, paytable=None):
+    """
+    Lataa nykyisen paytablen taulukot välimuistista. build=True rakentaa
+    puuttuvat (kestää kymmeniä sekunteja). Palauttaa True jos käytettävissä.
+    """
+    global _TABLES, _TABLES_KEY, _TABLES_PAYS
+    if paytable is None:
+        paytable = PAYTABLE
+    key = _paytable_key(paytable)
+    if _TABLES is not None and _TABLES_KEY == key:
+        return True
+    path = _cache_path(paytable)
+    tables = None
+    if os.path.isfile(path):
+        try:
+            tables = _load_tables_file(path)
+        except (OSError, EOFError):
+            tables = None
+    if tables is None:
+        if not build:
+            if path not in _WARNED:
+                _WARNED.add(path)
+                print(f"Strategiataulukko puuttuu ({path}), pokerin vihjeet pois päältä: "
+                      f"aja python -m games.strategy", file=sys.stderr)
+            return False
+        tables = build_tables(paytable)
+        _save_tables(tables, path)
+    _TABLES = tables
+    _TABLES_KEY = key
+    _TABLES_PAYS = pay_multipliers(paytable)
+    _EV_CACHE.clear()
+    return True
+
+
+def _canonical(codes):
+    """Maasymmetrian kanoninen muoto: (kanoninen käsi, permutaatio alkuperäisiin paikkoihin)."""
+    best = None
+    for perm in _SUIT_PERMS:
+        mapped = sorted(((c & ~3) | perm[c & 3], i) for i, c in enumerate(codes))
+        key = tuple(c for c, _ in mapped)
+        if best is None or key < best[0]:
+            best = (key, tuple(i for _, i in mapped))
+    return best
+
+
+def _solve(cards, tables, pays):
+    """
+    32 odotusarvoa järjestetylle kädelle; maski-bitti i = kortti i pidetään.
+    pays = taulukoiden paytablen kertoimet (koko käsi arvioidaan suoraan).
+    """
+    # values[S] = T[S] käden osajoukoille (järjestetyn käden osajoukko on järjestetty)
+    values = [0] * 32
+    for mask in range(31):
+        subset = [cards[i] for i in range(5) if mask >> i & 1]
+        values[mask] = tables[len(subset)][_colex(subset)]
+    values[31] = pays[eval_code(*cards)]
+    # values[H] = Σ_{S ⊇ H} (-1)^|S \ H| · T[S], bitti kerrallaan
+    for i in range(5):
+        bit = 1 << i
+        for mask in range(32):
+            if not mask & bit:
+                values[mask] -= values[mask | bit]
+    return [values[mask] / _COMPLETIONS[mask] for mask in range(32)]
+
+
+def hold_evs(cards):
+    """
+    Kaikkien HOLD-valintojen odotusarvot (kerroin / panos) listana, indeksi =
+    HOLD-maski (bitti i = kortti i). Kortit (rank, suit)-tupleina tai koodeina.
+    Palauttaa None jos taulukkoa ei ole ladattu.
+    """
+    if _TABLES is None:
+        return None
+    codes = [c if isinstance(c, int) else encode_cards((c,))[0] for c in cards]
+    canon, positions = _canonical(codes)
+    evs = _EV_CACHE.get(canon)
+    if evs is None:
+        evs = _solve(canon, _TABLES, _TABLES_PAYS)
+        if len(_EV_CACHE) >= _EV_CACHE_MAX:
+            _EV_CACHE.pop(next(iter(_EV_CACHE)))
+        _EV_CACHE[canon] = evs
+    # Kanonisen käden paikka j vastaa alkuperäistä paikkaa positions[j]
+    out = [0.0] * 32
+    for mask in range(32):
+        orig = 0
+        for j in range(5):
+            if mask >> j & 1:
+                orig |= 1 << positions[j]
+        out[orig] = evs[mask]
+    return out
+
+
+def _best_mask(evs):
+    """Suurin odotusarvo; tasatilanteessa vähiten pidettyjä kortteja."""
+    return max(range(32), key=lambda m: (evs[m], -bin(m).count("1")))
+
+
+def best_hold(cards):
+    """(paras HOLD-maski, sen odotusarvo) tai None."""
+    evs = hold_evs(cards)
+    if evs is None:
+        return None
+    mask = _best_mask(evs)
+    return mask, evs[mask]
+
+
+def build_best_masks(paytable=None):
+    """
+    Paras HOLD-maski kaikille käsille: array('B'), indeksi = järjestetyn käden
+    colex-indeksi, bitti j = järjestetyn käden kortti j. Jokainen maaluokka
+    ratkaistaan kerran (134 459 kättä) ja kopioidaan sen permutaatioihin.
+    """
+    if not load_tables(build=True, paytable=paytable):
+        return None
+    masks = array("B", b"\xff" * _BINOM[52][5])
+    for hand in itertools.combinations(range(52), 5):
+        if masks[_colex(hand)] != 0xFF:
+            continue
+        canon = _canonical(hand)[0]
+        best = _best_mask(_solve(canon, _TABLES, _TABLES_PAYS))
+        for perm in _SUIT_PERMS:
+            mapped = sorted(((c & ~3) | perm[c & 3], i) for i, c in enumerate(canon))
+            mask = 0
+            for j, (_, i) in enumerate(mapped):
+                if best >> i & 1:
+                    mask |= 1 << j
+            masks[_colex([c for c, _ in mapped])] = mask
+    return masks
+
+
+def load_best_masks(build=False, paytable=None):
+    """Paytablen maskitaulukko välimuistista (build=True rakentaa puuttuvan) tai None."""
+    if paytable is None:
+        paytable = PAYTABLE
+    path = _masks_path(paytable)
+    masks = array("B")
+    try:
+        with open(path, "rb") as f:
+            masks.fromfile(f, _BINOM[52][5])
+        return masks
+    except (OSError, EOFError):
+        if not build:
+            return None
+    masks = build_best_masks(paytable)
+    _save_tables([masks], path)
+    return masks
+
+
+def lookup_best_mask(masks, codes):
+    """Käden (5 korttikoodia) paras HOLD-maski maskitaulukosta; bitti i = codes[i]."""
+    order = sorted(range(5), key=codes.__getitem__)
+    index = 0
+    for j, i in enumerate(order):
+        index += _BINOM[codes[i]][j + 1]
+    best = masks[index]
+    mask = 0
+    for j, i in enumerate(order):
+        if best >> j & 1:
+            mask |= 1 << i
+    return mask
+
+
+def mask_to_held(mask):
+    return [bool(mask >> i & 1) for i in range(5)]
+
+
+def held_to_mask(held):
+    return sum(1 << i for i, h in enumerate(held) if h)
+
+
+if __name__ == "__main__":
+    t0 = time.perf_counter()
+    if "--rebuild" in sys.argv:
+        path = _cache_path(PAYTABLE)
+        if os.path.isfile(path):
+            os.remove(path)
+    load_tables(build=True)
+    print(f"Strategiataulukko valmis ({time.perf_counter() - t0:.1f} s): {_cache_path(PAYTABLE)}")
+    if "--best-masks" in sys.argv:
+        t0 = time.perf_counter()
+        if "--rebuild" in sys.argv and os.path.isfile(_masks_path(PAYTABLE)):
+            os.remove(_masks_path(PAYTABLE))
+        load_best_masks(build=True)
+        print(f"Maskitaulukko valmis ({time.perf_counter() - t0:.1f} s): {_masks_path(PAYTABLE)}")
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""Monilinjainen hedelmäpeli: 5 rullaa x 3 riviä, 1–50 voittolinjaa, WILD ja SCATTER."""
+
+import pygame
+
+import config
+from ui import draw_call, draw_text, draw_button, px
+from journal import GAME_LINES
+from games import lines
+from games.slot import SlotGame
+
+# Rullaikkunan leveys ja symbolin korkeus (myös esilataus käyttää ikonikokoa)
+SLOT_WIDTH = px(96)
+SYMBOL_HEIGHT = px(64)
+ICON_WIDTH = SLOT_WIDTH - px(12)
+ICON_HEIGHT = SYMBOL_HEIGHT - px(8)
+# Voittolinjojen värit (vuorotellen)
+LINE_COLORS = [(255, 255, 0), (255, 80, 80), (80, 255, 120), (80, 200, 255), (255, 150, 40)]
+
+
+class VideoSlotGame(SlotGame):
+    reel_set = lines.LINE_REELS
+    slot_width = SLOT_WIDTH
+    symbol_height = SYMBOL_HEIGHT
+    reel_gap = px(8)
+    reel_top = px(128)
+    result_y = px(326)
+    title = "VIDEOSLOT"
+    game_id = GAME_LINES
+    health_name = "lines"
+
+    def __init__(self, screen, clock, fonts, journal=None, credit_store=None, lines_count=None, server=None,
+                 jackpot=None, meters=None):
+        super().__init__(screen, clock, fonts, journal=journal, credit_store=credit_store, server=server,
+                         jackpot=jackpot, meters=meters)
+        self.lines = config.VIDEO_SLOT_LINES if lines_count is None else lines_count
+        self.line_wins = []  # [(linja, voitto), ...] viimeisimmästä pyöräytyksestä
+        self.scatters = 0
+        self.lines_rect = pygame.Rect(config.SCENE_WIDTH - px(180), px(385), px(160), px(40))
+
+    def _bet_text(self):
+        return f"Panos: {self.wager}  ({self.bet} x {self.lines} linjaa)"
+
+    def _handle_click(self, pos):
+        if not self.lines_rect.collidepoint(pos):
+            return False
+        counts = config.VIDEO_SLOT_LINE_COUNTS
+        i = counts.index(self.lines) if self.lines in counts else -1
+        self.lines = counts[(i + 1) % len(counts)]
+        self.line_wins = []
+        return True
+
+    def _start_spin(self, seed=None, stops=None):
+        super()._start_spin(seed, stops)
+        self.line_wins = []
+        self.scatters = 0
+
+    def _check_win(self):
+        win, self.line_wins, self.scatters = lines.check_win(self.stops, self.bet, self.lines)
+        return win
+
+    def _jackpot_hit(self):
+        return bool(lines.jackpot_lines(self.stops, self.lines))
+
+    def _outcomes(self):
+        """Mittarien osumat: voittolinjan symboli (ensimmäinen ei-WILD) ja SCAT."""
+        window = lines.stop_window(self.stops)
+        hits = []
+        for line, _ in self.line_wins:
+            symbols = [window[r][row] for r, row in enumerate(lines.PAYLINES[line])]
+            hits.append(next((sym for sym in symbols if sym != "WILD"), "WILD"))
+        if self.scatters >= 3:
+            hits.append("SCAT")
+        return hits
+
+    def _record(self, win):
+        self.journal.record_lines(self.round_seed, self.wager, win, self.lines, self.stops)
+
+    def _cell_center(self, reel, row):
+        x = self.reel_start_x + reel * (self.slot_w + self.reel_gap) + self.slot_w // 2
+        return x, self.reel_top + row * self.symbol_height + self.symbol_height // 2
+
+    def _draw_extras(self, dirty, mouse_pos):
+        # Voittaneet linjat murtoviivoina rullien päällä, kunnes seuraava pyöräytys alkaa
+        area = pygame.Rect(self.reel_start_x, self.reel_top,
+                           config.SCENE_WIDTH - 2 * self.reel_start_x, self.slot_h)
+        shown = tuple(self.line_wins) if not self.spinning else ()
+        for n, (line, _) in enumerate(shown):
+            points = [self._cell_center(r, row) for r, row in enumerate(lines.PAYLINES[line])]
+            draw_call(self.screen, pygame.draw.lines, LINE_COLORS[n % len(LINE_COLORS)], False, points, px(3), rect=area)
+        dirty.track("paylines", area, shown)
+
+        info_rect = None
+        if shown or (self.scatters >= 3 and not self.spinning):
+            info = f"{len(shown)} linjaa"
+            if self.scatters >= 3:
+                info += f", {self.scatters} x SCAT"
+            info_rect = draw_text(self.screen, info, config.SCENE_WIDTH // 2, self.result_y + px(30),
+                                  self.fonts["small"], config.COLOR_TEXT_DIM, center=True)
+        dirty.track("line_info", info_rect, (shown, self.scatters))
+
+        hover = None
+        if not self.spinning:
+            hover = self.lines_rect.collidepoint(mouse_pos)
+            draw_button(self.screen, self.lines_rect, f"LINJAT {self.lines}", self.fonts["small"],
+                        hover, style="grey")
+        dirty.track("lines", self.lines_rect, (hover, self.lines))
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""
+Tyhjäkäynti: silmukka nukkuu, kun ruudulla ei animoidu mitään.
+
+Silmukat hakevat tapahtumat IDLE.events(busy)-kutsulla pygame.event.get():n
+sijaan. Kun busy on epätosi (ei pyöritystä, jakoa tai ajastettua tulosta),
+kutsu odottaa seuraavaa tapahtumaa pygame.event.waitilla (enintään
+config.IDLE_WAIT_MS), joten ruutu piirretään vain syötteen (klikkaus,
+hiiren liike = hover) jälkeen eikä 30 kertaa sekunnissa.
+
+config.IDLE_ATTRACT_MIN minuutin kuluttua viimeisestä syötteestä siirrytään
+attract-tilaan: ruudulle vaihtuva mainosteksti config.IDLE_ATTRACT_FPS
+ruudun sekuntinopeudella. Ensimmäinen kosketus vain herättää (syöte hylätään).
+
+Säästö arvioidaan niin, että jokainen odotettu sekunti olisi piirtänyt
+config.FPS ruutua aktiivisen ruudun keskimääräisellä CPU-ajalla.
+"""
+
+import time
+
+import pygame
+
+import config
+from profiler import PROFILER
+from ui import draw_text, px, scene_event
+
+# Syöte, joka nollaa tyhjäkäynnin ajastimen (ja herättää attract-tilasta)
+INPUT_EVENTS = (pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP, pygame.MOUSEMOTION, pygame.KEYDOWN,
+                pygame.KEYUP, pygame.FINGERDOWN, pygame.FINGERUP, pygame.FINGERMOTION)
+ATTRACT_MESSAGES = ["RETRO UHKAPELI", "POKERI - HEDELMAPELI - VIDEOSLOT", "KOSKETA ALOITTAAKSESI"]
+ATTRACT_MESSAGE_MS = 2500
+# Aktiivisen ruudun CPU-ajan liukuva keskiarvo: uuden ruudun paino
+_CPU_EMA = 0.05
+
+
+class IdlePacer:
+    def __init__(self):
+        self.attract = False
+        self.last_input = time.monotonic()
+        self.started = self.last_input
+        self.waited_s = 0.0       # nukuttu aika yhteensä
+        self.saved_cpu_s = 0.0    # arvio säästetystä CPU-ajasta
+        self.frame_cpu_s = 0.0    # aktiivisen ruudun CPU-aika (liukuva keskiarvo)
+        self._last_cpu = None
+        self._next_report = self.started + 3600
+
+    def events(self, busy=False, timer=None):
+        """
+        Ruudun tapahtumat. busy = jokin animoituu (ei odotusta). timer =
+        anim.FixedStepClock, jonka aikaa ei lasketa odotuksen ajalta.
+        """
+        if self._last_cpu is not None:
+            # Edellisen ruudun työ (odotus ja clock.tickin uni eivät kuluta CPU-aikaa)
+            self.frame_cpu_s += (time.process_time() - self._last_cpu - self.frame_cpu_s) * _CPU_EMA
+        now = time.monotonic()
+        if busy or not config.IDLE_WAIT or PROFILER.enabled:
+            events = pygame.event.get()
+        else:
+            timeout = 1000 // config.IDLE_ATTRACT_FPS if self.attract else config.IDLE_WAIT_MS
+            event = pygame.event.wait(timeout)
+            events = [] if event.type == pygame.NOEVENT else [event] + pygame.event.get()
+            waited = time.monotonic() - now
+            self.waited_s += waited
+            self.saved_cpu_s += waited * config.FPS * self.frame_cpu_s
+            if timer is not None:
+                timer.resync()
+            now += waited
+
+        if config.PIXEL_SCALE > 1:
+            events = [scene_event(e) for e in events]
+        if any(e.type in INPUT_EVENTS for e in events):
+            self.last_input = now
+            if self.attract:
+                # Herätys: kosketus ei paina nappia eikä näppäin toimi
+                self.attract = False
+                events = [e for e in events if e.type not in INPUT_EVENTS]
+        elif not busy and config.IDLE_ATTRACT_MIN and now - self.last_input >= config.IDLE_ATTRACT_MIN * 60:
+            self.attract = True
+        if config.IDLE_REPORT and now >= self._next_report:
+            self._next_report = now + 3600
+            print(self.report(), flush=True)
+        self._last_cpu = time.process_time()
+        return events
+
+    def report(self):
+        hours = max(time.monotonic() - self.started, 1e-9) / 3600
+        return (f"Tyhjäkäynti {self.waited_s / 36 / hours:.0f} % ajasta, "
+                f"säästetty CPU-aikaa {self.saved_cpu_s / hours:.0f} s/h "
+                f"(aktiivinen ruutu {self.frame_cpu_s * 1000:.1f} ms CPU)")
+
+    def draw_attract(self, surface, fonts, dirty=None):
+        """Attract-tilan mainosteksti ruudun keskelle (vaihtuu ATTRACT_MESSAGE_MS välein)."""
+        rect = None
+        state = None
+        if self.attract:
+            phase = int(time.monotonic() * 1000 // ATTRACT_MESSAGE_MS)
+            state = ATTRACT_MESSAGES[phase % len(ATTRACT_MESSAGES)]
+            w, h = surface.get_size()
+            rect = pygame.Rect(px(40), h // 2 - px(40), w - px(80), px(80))
+            pygame.draw.rect(surface, config.COLOR_SCREEN_BLUE, rect)
+            pygame.draw.rect(surface, config.COLOR_TEXT_YELLOW, rect, px(3))
+            draw_text(surface, state, w // 2, rect.centery - px(14), fonts["menu"], config.COLOR_TEXT_YELLOW, center=True)
+        if dirty is not None:
+            dirty.track("attract", rect, state)
+        return rect
+
+
+IDLE = IdlePacer()
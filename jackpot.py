@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+"""
+Progressiivinen jackpot, jaettu saman koneen peliprosessien kesken.
+
+Potti on jaetussa muistissa (mmap, oletuksena /dev/shm): otsake ja
+config.JACKPOT_STRIPES laskuria omilla välimuistiriveillään. Jokainen
+prosessi varaa käynnistyessään yhden laskurin (fcntl-lukko laskurin
+tavualueeseen) ja kasvattaa vain sitä, joten panoksen osuuden lisäys on
+yksi 8 tavun kirjoitus ilman lukkoa ja ilman tiedoston uudelleenkirjoitusta.
+Potin arvo = pohja (otsakkeessa) + laskurien summa, tuhannesosacreditteinä.
+Lukoton lisäys ja luku edellyttävät, että 8 tavun kirjoitus on atominen, eli
+64-bittistä Pythonia; 32-bittisellä (esim. 32-bittinen Raspbian) lukija
+voisi nähdä puoliksi kirjoitetun laskurin, joten siellä laskureita ei varata
+ja sekä lisäykset että potin luku tehdään yhteisen lukon alla.
+
+Voitto (award) otetaan yhteisen lukon alla: potti luetaan, pohjaa
+pienennetään maksetuilla kokonaisilla crediteillä niin, että potti palaa
+alkuarvoon (config.JACKPOT_SEED) ja creditin osat siirtyvät seuraavaan
+pottiin, ja tila tallennetaan heti. Muuten tilannekuva (potti, voittojen määrä,
+CRC32) kirjoitetaan pysyvään tiedostoon atomisesti kierroksen lopussa
+(maybe_checkpoint), enintään config.JACKPOT_CHECKPOINT_S sekunnin välein;
+panoksen lisäys ei koskaan kirjoita levylle. Jos jaettu muisti puuttuu
+(uudelleenkäynnistys), potti palautetaan viimeisimmästä tilannekuvasta.
+"""
+
+import mmap
+import os
+import struct
+import time
+import zlib
+from contextlib import contextmanager
+
+import config
+
+try:
+    import fcntl
+except ImportError:  # Windows: yksi prosessi, ei lukkoja
+    fcntl = None
+
+_MAGIC = b"JPOT"
+# tunniste, versio, laskurien määrä, täyte, pohja (q), voitot (Q), viimeisin voitto (Q)
+_HEADER = struct.Struct("<4sHH8xqQQ")
+_BASE = 2  # pohjan paikka 8 tavun sanoina
+# Voitot ja viimeisin voitto otsakkeessa pohjan jälkeen
+_WINS = struct.Struct("<QQ")
+_WINS_OFFSET = 8 * (_BASE + 1)
+_LINE = 64  # laskuri per välimuistirivi (ei väärää jakamista prosessien kesken)
+_STRIPE_OFFSET = _LINE
+# Tilannekuva: aika, potti, voitot, CRC32
+_CHECKPOINT = struct.Struct("<dqQI")
+# 8 tavun laskurin kirjoitus on yksi atominen muistikirjoitus vain 64-bittisellä prosessilla
+_ATOMIC_64 = struct.calcsize("P") == 8
+
+# Tässä prosessissa varatut laskurit (fcntl-lukot ovat prosessikohtaisia)
+_CLAIMED = set()
+
+
+def _default_path():
+    if os.path.isdir("/dev/shm"):
+        return "/dev/shm/retro_jackpot"
+    return os.path.join(config.DATA_DIR, "jackpot.shm")
+
+
+def read_checkpoint(path):
+    """(potti tuhannesosina, voitot) tilannekuvasta tai None."""
+    try:
+        with open(path, "rb") as f:
+            data = f.read(_CHECKPOINT.size)
+    except OSError:
+        return None
+    if len(data) != _CHECKPOINT.size:
+        return None
+    _, pool, wins, crc = _CHECKPOINT.unpack(data)
+    if zlib.crc32(data[:-4]) != crc:
+        return None
+    return pool, wins
+
+
+class JackpotPool:
+    def __init__(self, path=None, checkpoint_path=None, stripes=None, seed=None, contribution=None):
+        self.path = (config.JACKPOT_SHM_PATH or _default_path()) if path is None else path
+        self.checkpoint_path = config.JACKPOT_CHECKPOINT_PATH if checkpoint_path is None else checkpoint_path
+        self.seed_milli = 1000 * (config.JACKPOT_SEED if seed is None else seed)
+        # Panoksen osuus promilleina = tuhannesosacreditteinä panoksen creditiä kohden
+        self.contribution = config.JACKPOT_CONTRIBUTION_PERMILLE if contribution is None else contribution
+        stripes = config.JACKPOT_STRIPES if stripes is None else stripes
+        self.checkpoint_s = config.JACKPOT_CHECKPOINT_S
+        os.makedirs(os.path.dirname(os.path.abspath(self.checkpoint_path)), exist_ok=True)
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT | getattr(os, "O_BINARY", 0), 0o666)
+        size = _STRIPE_OFFSET + stripes * _LINE
+        with self._locked():
+            if os.fstat(self._fd).st_size < _HEADER.size:
+                os.ftruncate(self._fd, size)
+                self._mm = mmap.mmap(self._fd, size)
+                restored = read_checkpoint(self.checkpoint_path)
+                base, wins = restored if restored is not None else (self.seed_milli, 0)
+                _HEADER.pack_into(self._mm, 0, _MAGIC, 1, stripes, base, wins, 0)
+            else:
+                self._mm = mmap.mmap(self._fd, os.fstat(self._fd).st_size)
+        magic, _, self.stripes, _, _, _ = _HEADER.unpack_from(self._mm, 0)
+        if magic != _MAGIC:
+            raise ValueError(f"{self.path}: ei jackpot-tiedosto")
+        self._counters = memoryview(self._mm).cast("q")
+        self.stripe = self._claim_stripe() if _ATOMIC_64 else None
+        self._last_checkpoint = time.monotonic()
+        self.last_award_milli = 0  # viimeisimmässä voitossa potista poistettu määrä
+
+    def _lock(self, start, length, flags):
+        fcntl.lockf(self._fd, flags, length, start)
+
+    @contextmanager
+    def _locked(self):
+        """Yhteinen lukko (otsakkeen ensimmäinen tavu); Windowsissa ei lukitusta."""
+        if fcntl is None:
+            yield
+            return
+        self._lock(0, 1, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            self._lock(0, 1, fcntl.LOCK_UN)
+
+    def _claim_stripe(self):
+        """Vapaa laskuri tälle prosessille; None = kaikki varattu (lisäykset lukon alla)."""
+        for stripe in range(self.stripes):
+            key = (os.path.abspath(self.path), stripe)
+            if key in _CLAIMED:
+                continue
+            if fcntl is not None:
+                try:
+                    self._lock(_STRIPE_OFFSET + stripe * _LINE, _LINE, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except OSError:
+                    continue
+            _CLAIMED.add(key)
+            return stripe
+        return None
+
+    def _index(self, stripe):
+        return (_STRIPE_OFFSET + stripe * _LINE) // 8
+
+    def _sum(self):
+        step = _LINE // 8
+        start = self._index(0)
+        return self._counters[_BASE] + sum(self._counters[start:start + self.stripes * step:step])
+
+    @property
+    def pool_milli(self):
+        if _ATOMIC_64:
+            return self._sum()
+        with self._locked():
+            return self._sum()
+
+    @property
+    def amount(self):
+        """Potti kokonaisina credittejä (näyttö ja voitto)."""
+        return self.pool_milli // 1000
+
+    @property
+    def wins(self):
+        return _HEADER.unpack_from(self._mm, 0)[4]
+
+    def contribute(self, bet):
+        """Panoksen osuus pottiin: oman laskurin kasvatus ilman lukkoa."""
+        milli = bet * self.contribution
+        if not milli:
+            return
+        if self.stripe is not None:
+            self._counters[self._index(self.stripe)] += milli
+        else:
+            with self._locked():
+                self._counters[_BASE] += milli
+
+    def award(self):
+        """
+        Potti voittajalle (kokonaiset creditit); potti palaa alkuarvoon, creditin
+        osat jäävät pottiin ja tila tallennetaan heti.
+        """
+        with self._locked():
+            pool = self._sum()
+            wins = self.wins
+            amount = pool // 1000
+            self.last_award_milli = amount * 1000 - self.seed_milli
+            # Pohja yhtenä 8 tavun kirjoituksena (struct kirjoittaa tavu kerrallaan)
+            self._counters[_BASE] -= self.last_award_milli
+            _WINS.pack_into(self._mm, _WINS_OFFSET, wins + 1, amount)
+            self._write_checkpoint()
+        return amount
+
+    def maybe_checkpoint(self):
+        """Kierroksen lopussa: tilannekuva, jos edellisestä on kulunut config.JACKPOT_CHECKPOINT_S."""
+        if time.monotonic() - self._last_checkpoint >= self.checkpoint_s:
+            self.checkpoint()
+
+    def checkpoint(self):
+        with self._locked():
+            self._write_checkpoint()
+
+    def _write_checkpoint(self):
+        """Tilannekuva pysyvään tiedostoon: väliaikainen tiedosto, fsync ja atominen korvaus."""
+        body = _CHECKPOINT.pack(time.time(), self._sum(), self.wins, 0)[:-4]
+        tmp = f"{self.checkpoint_path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(body + struct.pack("<I", zlib.crc32(body)))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.checkpoint_path)
+        self._last_checkpoint = time.monotonic()
+
+    def close(self):
+        if self._mm is None:
+            return
+        self.checkpoint()
+        if self.stripe is not None:
+            _CLAIMED.discard((os.path.abspath(self.path), self.stripe))
+        self._counters.release()
+        self._mm.close()
+        os.close(self._fd)  # vapauttaa myös laskurin lukon
+        self._mm = None
@@ -0,0 +1,227 @@
+# -*- coding: utf-8 -*-
+"""
+Kierrospäiväkirja: jokaisen kierroksen siemen ja tulos kiinteän mittaisina
+binäärietueina tiedoston loppuun (append-only).
+
+Kierroksen satunnaisuus johdetaan yhdestä 64-bittisestä siemenestä
+(random.Random(seed)), joten tallennettu siemen + pelaajan valinnat riittävät
+toistamaan kierroksen (tools/replay.py). Kirjoitukset kerätään jonoon ja
+kirjoitetaan erissä taustasäikeessä, jotta SD-kortin I/O ei osu ruudun
+piirtoon. Lukija käyttää mmapia ja purkaa etueet struct.iter_unpackilla.
+
+Tiedosto: 8 tavun otsake (tunniste, versio, etueen koko) + etueet.
+Etue (64 tavua, little-endian):
+    seq Q, aika d, siemen Q, peli B, held B, käsiluokka B, käden indeksi B,
+    panos I, voitto I, jaetut kortit 5s, lopulliset kortit 5s,
+    rullien pysähdykset 5s, paikka H (pelipalvelimen kaappi, 0 = paikallinen),
+    täyte, CRC32 I (edeltävistä tavuista)
+Monilinjapelissä held = linjojen määrä ja panos = kokonaispanos.
+Jackpot-etueessa held = laukaissut peli, panos 0 ja voitto = potti; kortit
+tai pysähdykset ovat laukaisseen kierroksen.
+"""
+
+import mmap
+import os
+import queue
+import random
+import struct
+import threading
+import time
+import zlib
+from collections import namedtuple
+
+import config
+
+GAME_POKER = 1
+GAME_SLOT = 2
+GAME_LINES = 3
+GAME_JACKPOT = 4
+GAME_NAMES = {GAME_POKER: "poker", GAME_SLOT: "slot", GAME_LINES: "lines", GAME_JACKPOT: "jackpot"}
+# Rullien määrä pelissä (pysähdyskentässä käytetyt tavut)
+GAME_REELS = {GAME_SLOT: 3, GAME_LINES: 5}
+
+_MAGIC = b"RJNL"
+_VERSION = 1
+_HEADER = struct.Struct("<4sHH")
+RECORD = struct.Struct("<QdQBBBBII5s5s5sH7xI")
+_CRC_SPAN = RECORD.size - 4
+
+# index: moniläpelin käsi (0 = pääkäsi, 1.. = games.hand_eval.extra_hand)
+Round = namedtuple("Round", "seq time seed game held hand index bet win dealt final stops seat valid")
+
+
+def new_round_seed(rng=random):
+    """Uuden kierroksen siemen (64 bittiä)."""
+    return rng.getrandbits(64)
+
+
+def pack_round(seq, timestamp, seed, game, bet, win, held=0, hand=0, index=0, dealt=(), final=(), stops=(), seat=0):
+    body = RECORD.pack(seq, timestamp, seed, game, held, hand, index, bet, win,
+                       bytes(dealt), bytes(final), bytes(stops), seat, 0)
+    crc = zlib.crc32(body[:_CRC_SPAN])
+    return body[:_CRC_SPAN] + struct.pack("<I", crc)
+
+
+def _unpack(fields, raw):
+    seq, ts, seed, game, held, hand, index, bet, win, dealt, final, stops, seat, crc = fields
+    reels = GAME_REELS.get(held if game == GAME_JACKPOT else game, 0)
+    return Round(seq, ts, seed, game, held, hand, index, bet, win, tuple(dealt), tuple(final),
+                 tuple(stops[:reels]), seat, zlib.crc32(raw[:_CRC_SPAN]) == crc)
+
+
+def _record_count(path):
+    """Kokonaisten etueiden määrä tiedostossa (0 jos puuttuu)."""
+    try:
+        size = os.path.getsize(path)
+    except OSError:
+        return 0
+    return max(0, size - _HEADER.size) // RECORD.size
+
+
+class RoundJournal:
+    """
+    Kirjoittaja: record_*() pakkaa etueen ja laittaa sen jonoon (ei I/O:ta
+    kutsujan säikeessä); taustasäie kirjoittaa jonon yhdellä write()-kutsulla
+    config.JOURNAL_FLUSH_MS välein ja tekee fsyncin.
+    """
+
+    def __init__(self, path=None, flush_ms=None, fsync=None):
+        self.path = config.JOURNAL_PATH if path is None else path
+        self.flush_ms = config.JOURNAL_FLUSH_MS if flush_ms is None else flush_ms
+        self.fsync = config.JOURNAL_FSYNC if fsync is None else fsync
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._file = self._open()
+        self.next_seq = _record_count(self.path)
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._writer, name="round-journal", daemon=True)
+        self._thread.start()
+
+    def _open(self):
+        f = open(self.path, "a+b")
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        if size == 0:
+            f.write(_HEADER.pack(_MAGIC, _VERSION, RECORD.size))
+            f.flush()
+        else:
+            f.seek(0)
+            magic, version, record_size = _HEADER.unpack(f.read(_HEADER.size))
+            if magic != _MAGIC or record_size != RECORD.size:
+                f.close()
+                raise ValueError(f"{self.path}: tuntematon päiväkirjamuoto")
+            # Kaatumisessa kesken jäänyt etue pois lopusta
+            whole = _HEADER.size + (size - _HEADER.size) // RECORD.size * RECORD.size
+            if whole != size:
+                f.truncate(whole)
+        return f
+
+    def _append(self, game, seed, bet, win, **fields):
+        seq = self.next_seq
+        self.next_seq += 1
+        self._queue.put(pack_round(seq, time.time(), seed, game, bet, win, **fields))
+        return seq
+
+    def record_poker(self, seed, bet, win, held, hand, dealt, final, index=0, seat=0):
+        """Pokerikäsi: held = HOLD-maski, hand = käsiluokan koodi, kortit koodeina 0–51, index = moniläpelin käsi."""
+        return self._append(GAME_POKER, seed, bet, win, held=held, hand=hand, index=index, dealt=dealt, final=final,
+                            seat=seat)
+
+    def record_slot(self, seed, bet, win, stops, seat=0):
+        return self._append(GAME_SLOT, seed, bet, win, stops=stops, seat=seat)
+
+    def record_lines(self, seed, bet, win, lines, stops, seat=0):
+        """Monilinjapeli: bet = kokonaispanos, lines = linjojen määrä, stops = 5 pysähdystä."""
+        return self._append(GAME_LINES, seed, bet, win, held=lines, stops=stops, seat=seat)
+
+    def record_jackpot(self, seed, win, game, dealt=(), final=(), stops=(), index=0, seat=0):
+        """
+        Progressiivinen jackpot: game = laukaissut peli, kortit tai pysähdykset siltä kierrokselta,
+        index = moniläpelin käsi (pokeri) tai pelattujen linjojen määrä (hedelmäpelit).
+        """
+        return self._append(GAME_JACKPOT, seed, 0, win, held=game, index=index, dealt=dealt, final=final,
+                            stops=stops, seat=seat)
+
+    def _writer(self):
+        while True:
+            batch = [self._queue.get()]
+            if batch[0] is not None:
+                # Odotetaan hetki, jotta samaan kirjoitukseen kertyy useampi etue
+                time.sleep(self.flush_ms / 1000)
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            records = [r for r in batch if r is not None]
+            if records:
+                self._file.write(b"".join(records))
+                self._file.flush()
+                if self.fsync:
+                    os.fsync(self._file.fileno())
+            if len(records) != len(batch):
+                return
+
+    def close(self):
+        """Kirjoittaa jonon loppuun ja sulkee tiedoston."""
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+        self._file.close()
+
+
+class JournalReader:
+    """Päiväkirjan lukija (mmap). len(), indeksointi ja rounds(start, stop)."""
+
+    def __init__(self, path=None):
+        self.path = config.JOURNAL_PATH if path is None else path
+        self._file = open(self.path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        if size < _HEADER.size:
+            self._file.close()
+            raise ValueError(f"{self.path}: ei päiväkirja")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, record_size = _HEADER.unpack_from(self._map)
+        if magic != _MAGIC or record_size != RECORD.size:
+            self.close()
+            raise ValueError(f"{self.path}: tuntematon päiväkirjamuoto")
+        self.count = (size - _HEADER.size) // RECORD.size
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += self.count
+        if not 0 <= i < self.count:
+            raise IndexError(i)
+        offset = _HEADER.size + i * RECORD.size
+        raw = self._map[offset:offset + RECORD.size]
+        return _unpack(RECORD.unpack(raw), raw)
+
+    def rounds(self, start=0, stop=None):
+        """Etueet start..stop-1 järjestyksessä."""
+        stop = self.count if stop is None else min(stop, self.count)
+        start = max(0, start)
+        if start >= stop:
+            return
+        view = memoryview(self._map)[_HEADER.size + start * RECORD.size:_HEADER.size + stop * RECORD.size]
+        try:
+            size = RECORD.size
+            for i, fields in enumerate(RECORD.iter_unpack(view)):
+                yield _unpack(fields, view[i * size:(i + 1) * size])
+        finally:
+            view.release()
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
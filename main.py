@@ -1,43 +1,82 @@
 # -*- coding: utf-8 -*-
 """
 Retro uhkapelialusta – Raspberry Pi 3.
-Käyttäjä lisää credittejä ja valitsee valikosta Pokerin tai hedelmäpelin (slot).
+Käyttäjä lisää credittejä ja valitsee valikosta Pokerin, hedelmäpelin (slot) tai videoslotin.
 """
 
 import pygame
 import sys
 
 import config
-from ui import init_display, get_fonts, draw_text, draw_button, draw_credits_bar, draw_scanlines
+from asset_cache import ASSETS
+from games.prefetch import game_prefetcher
+from credits import CreditStore
+from jackpot import JackpotPool
+from meters import Meters
+from journal import RoundJournal
+from remote import RemoteError, RemoteSeat
+from rng import RNG
+from idle import IDLE
+from profiler import PROFILER
+from ui import (
+    init_display, get_fonts, draw_text, draw_button, draw_credits_bar, draw_scanlines, DirtyRects,
+    blit_layer, background_layer, get_mouse_pos, px, CREDITS_BAR_HEIGHT,
+)
 
 
-def run_main_menu(screen, clock, fonts):
-    """Päävalikko: lisää credittejä, valitse Poker tai Slot."""
-    credits = 0
+def _play(game, credits, credit_store=None, server=None):
+    """Pelin ajo valikosta. Palauttaa saldon pelin jälkeen."""
+    if server is not None:
+        try:
+            game.run(credits)
+        except (OSError, RemoteError) as e:
+            print(f"Yhteys pelipalvelimeen: {e}", file=sys.stderr)
+        return server.credits  # palvelimen saldo on ainoa oikea
+    credits = game.run(credits)
+    if credit_store is not None:
+        credit_store.commit()  # esim. kesken jätetyn jaon panos
+    return credits
+
+
+def run_main_menu(screen, clock, fonts, prefetcher=None, journal=None, credit_store=None, server=None,
+                  jackpot=None, meters=None):
+    """Päävalikko: lisää credittejä, valitse Poker, Slot tai Videoslot."""
+    if server is not None:
+        credits = server.credits
+    else:
+        credits = credit_store.credits if credit_store is not None else 0
     menu_items = [
         ("Lisää credittejä", "add"),
         ("POKERI", "poker"),
         ("HEDELMÄPELI (SLOT)", "slot"),
+        ("VIDEOSLOT (5 RULLAA)", "lines"),
         ("Lopeta", "quit"),
     ]
-    button_height = 50
-    button_width = 400
-    start_y = 120
-    spacing = 60
+    button_height = px(50)
+    button_width = px(400)
+    start_y = px(120)
+    spacing = px(60)
     buttons = []
     for i, (label, key) in enumerate(menu_items):
         rect = pygame.Rect(
-            (config.SCREEN_WIDTH - button_width) // 2,
+            (config.SCENE_WIDTH - button_width) // 2,
             start_y + i * spacing,
             button_width,
             button_height,
         )
         buttons.append((rect, label, key))
+    dirty = DirtyRects(screen)
 
     while True:
+        PROFILER.frame()
         # Tapahtumat
-        mouse_pos = pygame.mouse.get_pos()
-        for event in pygame.event.get():
+        # Tyhjäkäynnillä odotetaan syötettä; esilatauksen aikana piirretään täydellä tahdilla
+        events = IDLE.events(prefetcher is not None and not prefetcher.finished)
+        # Hiiren sijainti vasta odotuksen jälkeen, jotta hover vastaa odotuksen herättänyttä liikettä
+        mouse_pos = get_mouse_pos()
+        for event in events:
+            if PROFILER.handle_event(event):
+                continue
             if event.type == pygame.QUIT:
                 return
             if event.type == pygame.KEYDOWN:
@@ -45,64 +84,160 @@ def run_main_menu(screen, clock, fonts):
                     return
             if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
                 for rect, label, key in buttons:
-                    if rect.collidepoint(mouse_pos):
+                    if rect.collidepoint(event.pos):
                         if key == "add":
-                            credits += config.DEFAULT_CREDITS_ADD
+                            if server is not None:
+                                try:
+                                    credits = server.add_credits(config.DEFAULT_CREDITS_ADD)
+                                except (OSError, RemoteError) as e:
+                                    print(f"Yhteys pelipalvelimeen: {e}", file=sys.stderr)
+                                    continue
+                            else:
+                                credits += config.DEFAULT_CREDITS_ADD
+                                if credit_store is not None:
+                                    credit_store.update(credits, added=config.DEFAULT_CREDITS_ADD)
+                                    credit_store.commit()
+                            # Mittariin vasta kun saldo on päivitetty (palvelimella tai levyllä)
+                            if meters is not None:
+                                meters.credits_in(config.DEFAULT_CREDITS_ADD)
                         elif key == "poker":
                             if credits < config.MIN_BET:
                                 continue  # ei riitä credittejä
                             from games.poker import PokerGame
-                            game = PokerGame(screen, clock, fonts)
-                            credits = game.run(credits)
+                            game = PokerGame(screen, clock, fonts, journal=journal, credit_store=credit_store,
+                                             server=server, jackpot=jackpot, meters=meters)
+                            credits = _play(game, credits, credit_store, server)
+                            dirty.invalidate()
+                            PROFILER.skip()
                         elif key == "slot":
                             if credits < config.MIN_BET:
                                 continue
                             from games.slot import SlotGame
-                            game = SlotGame(screen, clock, fonts)
-                            credits = game.run(credits)
+                            game = SlotGame(screen, clock, fonts, journal=journal, credit_store=credit_store,
+                                            server=server, jackpot=jackpot, meters=meters)
+                            credits = _play(game, credits, credit_store, server)
+                            dirty.invalidate()
+                            PROFILER.skip()
+                        elif key == "lines":
+                            if credits < config.MIN_BET:
+                                continue
+                            from games.video_slot import VideoSlotGame
+                            game = VideoSlotGame(screen, clock, fonts, journal=journal, credit_store=credit_store,
+                                                 server=server, jackpot=jackpot, meters=meters)
+                            credits = _play(game, credits, credit_store, server)
+                            dirty.invalidate()
+                            PROFILER.skip()
                         elif key == "quit":
                             return
                         break
+        PROFILER.mark("events")
 
-        # Piirto: sininen tausta, keltainen otsikko, vihreä/harmaa napit
-        screen.fill(config.COLOR_BG)
-        pygame.draw.rect(screen, config.COLOR_SCREEN_BLUE, (0, 0, config.SCREEN_WIDTH, config.SCREEN_HEIGHT))
-        bar_height = draw_credits_bar(screen, credits, fonts)
-
-        draw_text(
-            screen, "RETRO UHKAPELI",
-            config.SCREEN_WIDTH // 2, bar_height + 30,
-            fonts["title"], config.COLOR_TEXT_YELLOW, center=True
-        )
+        # Piirto: välimuistitettu tausta + otsikko, sitten credit-palkki ja napit
+        size = screen.get_size()
+        blit_layer(screen, "menu_bg", size, lambda: background_layer(
+            size, title="RETRO UHKAPELI", fonts=fonts, title_y=CREDITS_BAR_HEIGHT + px(30)))
+        PROFILER.mark("background")
+        jackpot_amount = jackpot.amount if jackpot is not None else None
+        bar_height = draw_credits_bar(screen, credits, fonts, jackpot_amount)
+        dirty.track("credits", (0, 0, config.SCENE_WIDTH, bar_height + px(2)), (credits, jackpot_amount))
+        hint_rect = None
         if credits < config.MIN_BET:
-            draw_text(
+            hint_rect = draw_text(
                 screen, "Lisaa creditteja pelataksesi",
-                config.SCREEN_WIDTH // 2, bar_height + 75,
+                config.SCENE_WIDTH // 2, bar_height + px(75),
                 fonts["small"], config.COLOR_TEXT_DIM, center=True
             )
+        dirty.track("hint", hint_rect)
 
         for rect, label, key in buttons:
             hover = rect.collidepoint(mouse_pos)
-            if key == "poker" or key == "slot":
+            if key in ("poker", "slot", "lines"):
                 if credits < config.MIN_BET:
                     hover = False
-            style = "green" if key in ("poker", "slot") else "grey"
+            style = "green" if key in ("poker", "slot", "lines") else "grey"
             if key == "quit":
                 style = "grey"
             draw_button(screen, rect, label, fonts["menu"], hover, style=style)
+            dirty.track(key, rect, hover)
+
+        PROFILER.mark("ui")
+
+        progress_rect = None
+        if prefetcher is not None and not prefetcher.finished:
+            prefetcher.step()
+            PROFILER.mark("prefetch")
+            done, total = prefetcher.progress()
+            progress_rect = draw_text(
+                screen, f"Ladataan kuvia {done}/{total}",
+                config.SCENE_WIDTH // 2, config.SCENE_HEIGHT - px(24),
+                fonts["small"], config.COLOR_TEXT_DIM, center=True
+            )
+        dirty.track("prefetch", progress_rect, prefetcher.progress() if prefetcher else None)
+
+        PROFILER.mark("ui")
 
         if config.SCANLINE_ALPHA > 0:
             draw_scanlines(screen)
-        pygame.display.flip()
-        clock.tick(30)
+        PROFILER.mark("scanlines")
+        IDLE.draw_attract(screen, fonts, dirty)
+        PROFILER.draw_overlay(screen, fonts, dirty)
+        dirty.present()
+        PROFILER.mark("present")
+        clock.tick(config.FPS)
+        PROFILER.mark("tick")
 
 
 def main():
+    server = None
+    if config.SERVER_ENABLED:
+        # Ohut asiakas: kierrokset, päiväkirja ja creditit pelipalvelimella (server.py)
+        try:
+            server = RemoteSeat()
+        except (OSError, RemoteError) as e:
+            print(f"Pelipalvelimeen {config.SERVER_HOST}:{config.SERVER_PORT} ei saada yhteyttä: {e}",
+                  file=sys.stderr)
+            sys.exit(1)
     pygame.init()
     screen = init_display()
     clock = pygame.time.Clock()
     fonts = get_fonts()
-    run_main_menu(screen, clock, fonts)
+    # Pelien kuvat ladataan valikon tyhjäkäynnillä pienissä paloissa
+    prefetcher = game_prefetcher()
+    journal = RoundJournal() if config.JOURNAL_ENABLED and server is None else None
+    # Saldo palautetaan lokista (sähkökatkon jälkeen viimeisin kierroksen rajalla tallennettu)
+    credit_store = CreditStore() if config.CREDITS_PERSIST and server is None else None
+    # Progressiivinen potti jaetussa muistissa (muut saman koneen peliprosessit)
+    jackpot = None
+    if config.JACKPOT_ENABLED and server is None:
+        try:
+            jackpot = JackpotPool()
+        except OSError as e:
+            print(f"Jackpot ei käytössä: {e}", file=sys.stderr)
+    # Kirjanpitomittarit jatkuvat edellisestä tilannekuvasta
+    meters = Meters(config.METERS_PATH) if config.METERS_ENABLED else None
+    try:
+        run_main_menu(screen, clock, fonts, prefetcher, journal, credit_store, server, jackpot, meters)
+    finally:
+        prefetcher.close()
+        if meters is not None:
+            meters.save()
+        if jackpot is not None:
+            jackpot.close()
+        if server is not None:
+            server.close()
+        if journal is not None:
+            journal.close()
+        if credit_store is not None:
+            credit_store.close()
+    if config.IDLE_REPORT:
+        print(IDLE.report())
+    if server is None:
+        if config.RNG_REPORT:
+            print(RNG.report())
+        elif RNG.health.alarms:
+            print(RNG.report(), file=sys.stderr)
+        if config.ASSET_CACHE_REPORT:
+            print(ASSETS.report())
     pygame.quit()
     sys.exit(0)
 
@@ -0,0 +1,266 @@
+# -*- coding: utf-8 -*-
+"""
+Kirjanpitomittarit: coin-in, coin-out, pelatut kierrokset, jackpotit ja
+osumat lopputuloksittain (pokerin PAYTABLE-kädet, hedelmäpelin PAYOUT-
+symbolit, videoslotin linjasymbolit ja SCAT).
+
+Mittarit ovat yhdessä esivaratussa laskuritaulukossa (array "q", indeksit
+METER_NAMES-järjestyksessä). Kierroksen kirjaus päivittää kiinteän määrän
+laskureita: kokonaismäärät sekä kolmen rengaspuskurin nykyisen lokeron
+(minuutit 60, tunnit 24, päivät 30) ja renkaan juoksevan summan. Kun lokero
+vanhenee, sen arvot vähennetään summasta ja lokero nollataan, joten
+"viimeisen tunnin hold %" luetaan suoraan summasta selaamatta historiaa.
+
+Tilannekuva (snapshot) on tiivis binäärimuoto vientiä ja uudelleen-
+käynnistystä varten: otsake (tunniste, versio, laskurien määrä, aika,
+CRC32) ja zlib-pakattu runko (mittarien nimet, kokonaismäärät ja renkaiden
+lokerot). Tulostus: python -m tools.meters data/meters.snap
+"""
+
+import os
+import struct
+import sys
+import time
+import zlib
+from array import array
+
+import config
+from journal import GAME_LINES, GAME_NAMES, GAME_POKER, GAME_SLOT
+from games.hand_eval import PAYTABLE_ORDER
+from games.lines import LINE_SYMBOLS
+from games.reels import SYMBOLS
+
+GAMES = (GAME_POKER, GAME_SLOT, GAME_LINES)
+# Pelikohtaiset mittarit (järjestys = indeksi pelin lohkossa)
+COIN_IN, COIN_OUT, PLAYED, JACKPOT_OUT = range(4)
+_GAME_METERS = ("coin_in", "coin_out", "games", "jackpot_out")
+# Osumat: pelin lopputulokset, joilla on oma laskuri
+OUTCOMES = {
+    GAME_POKER: PAYTABLE_ORDER,
+    GAME_SLOT: SYMBOLS,
+    GAME_LINES: LINE_SYMBOLS,
+}
+
+METER_NAMES = ["credits_in"]
+GAME_BASE = {}  # peli -> ensimmäisen pelikohtaisen mittarin indeksi
+HIT_INDEX = {}  # peli -> {lopputulos: indeksi}
+for _game in GAMES:
+    _prefix = GAME_NAMES[_game]
+    GAME_BASE[_game] = len(METER_NAMES)
+    METER_NAMES += [f"{_prefix}.{name}" for name in _GAME_METERS]
+for _game in GAMES:
+    _prefix = GAME_NAMES[_game]
+    HIT_INDEX[_game] = {name: len(METER_NAMES) + i for i, name in enumerate(OUTCOMES[_game])}
+    METER_NAMES += [f"{_prefix}.hit.{name}" for name in OUTCOMES[_game]]
+METER_INDEX = {name: i for i, name in enumerate(METER_NAMES)}
+CREDITS_IN = METER_INDEX["credits_in"]
+
+# Renkaat: nimi (ikkuna), lokeron pituus sekunteina, lokeroiden määrä
+RINGS = (("hour", 60, 60), ("day", 3600, 24), ("month", 86400, 30))
+
+_MAGIC = b"METR"
+_VERSION = 1
+# tunniste, versio, laskurien määrä, aika, rungon CRC32
+_HEADER = struct.Struct("<4sHHdI")
+
+
+def _counters(width):
+    return array("q", bytes(8 * width))
+
+
+def _pack_counters(values):
+    """Laskurit little-endian-tavuiksi (tilannekuvan muoto)."""
+    if sys.byteorder == "big":
+        values = array("q", values)
+        values.byteswap()
+    return values.tobytes()
+
+
+class _Ring:
+    """Yksi aikaikkuna: lokerot renkaassa ja niiden juokseva summa."""
+
+    def __init__(self, name, period, length, width):
+        self.name = name
+        self.period = period
+        self.buckets = [_counters(width) for _ in range(length)]
+        self.sum = _counters(width)
+        self.current = None  # nykyisen lokeron numero (aika // period)
+        self._zero = _counters(width)
+
+    def advance(self, now):
+        """Nykyinen lokero; vanhentuneet lokerot vähennetään summasta ja nollataan."""
+        n = int(now // self.period)
+        current = self.current
+        if current is not None and n <= current:
+            # Sama lokero (tai kello palasi taaksepäin: kirjataan nykyiseen)
+            return self.buckets[current % len(self.buckets)]
+        length = len(self.buckets)
+        if current is None or n - current >= length:
+            for bucket in self.buckets:
+                bucket[:] = self._zero
+            self.sum[:] = self._zero
+        else:
+            total = self.sum
+            for k in range(current + 1, n + 1):
+                bucket = self.buckets[k % length]
+                for i, value in enumerate(bucket):
+                    if value:
+                        total[i] -= value
+                bucket[:] = self._zero
+        self.current = n
+        return self.buckets[n % length]
+
+
+class Meters:
+    def __init__(self, path=None, save_s=None, clock=time.time):
+        self.path = path  # tilannekuvan tiedosto tai None = vain muistissa
+        self.save_s = config.METERS_SAVE_S if save_s is None else save_s
+        self.clock = clock
+        self.width = len(METER_NAMES)
+        self.totals = _counters(self.width)
+        self.rings = [_Ring(name, period, length, self.width) for name, period, length in RINGS]
+        self._ring_names = {ring.name: ring for ring in self.rings}
+        self._last_save = time.monotonic()
+        if path is not None and os.path.exists(path):
+            with open(path, "rb") as f:
+                self.restore(f.read())
+
+    def _add(self, pairs):
+        """(indeksi, määrä)-parit kokonaismääriin, nykyisiin lokeroihin ja summiin."""
+        now = self.clock()
+        targets = [self.totals]
+        for ring in self.rings:
+            targets.append(ring.advance(now))
+            targets.append(ring.sum)
+        for index, amount in pairs:
+            for counters in targets:
+                counters[index] += amount
+
+    def record_bet(self, game, bet):
+        """Panos (coin-in) veloitettaessa; kesken jäänytkin kierros on pelattu panos."""
+        self._add([(GAME_BASE[game] + COIN_IN, bet)])
+
+    def record_round(self, game, win, outcomes=(), jackpot=0):
+        """
+        Kierroksen loppu: voitto ilman jackpotia (coin-out), kierros, jackpot ja
+        lopputulokset (OUTCOMES[game]-nimiä, sama voi toistua).
+        """
+        base = GAME_BASE[game]
+        pairs = [(base + COIN_OUT, win), (base + PLAYED, 1)]
+        if jackpot:
+            pairs.append((base + JACKPOT_OUT, jackpot))
+        hits = HIT_INDEX[game]
+        pairs.extend((hits[name], 1) for name in outcomes)
+        self._add(pairs)
+        self._autosave()
+
+    def credits_in(self, amount):
+        self._add([(CREDITS_IN, amount)])
+        self._autosave()
+
+    def window(self, name=None):
+        """Laskurit: None = kaikki ajat, muuten RINGS-ikkunan juokseva summa ("hour", "day", "month")."""
+        if name is None:
+            return self.totals
+        ring = self._ring_names[name]
+        ring.advance(self.clock())
+        return ring.sum
+
+    def value(self, meter, window=None):
+        return self.window(window)[METER_INDEX[meter]]
+
+    def hold_percent(self, window=None, game=None):
+        """(coin-in - coin-out - jackpotit) / coin-in prosentteina; None jos ei panoksia."""
+        counters = self.window(window)
+        coin_in = out = 0
+        for g in GAMES if game is None else (game,):
+            base = GAME_BASE[g]
+            coin_in += counters[base + COIN_IN]
+            out += counters[base + COIN_OUT] + counters[base + JACKPOT_OUT]
+        if not coin_in:
+            return None
+        return 100.0 * (coin_in - out) / coin_in
+
+    def snapshot(self):
+        """Tiivis binäärinen tilannekuva (restore() / read_snapshot())."""
+        parts = ["\n".join(METER_NAMES).encode(), b"\0", _pack_counters(self.totals)]
+        for ring in self.rings:
+            current = -1 if ring.current is None else ring.current
+            parts.append(struct.pack("<qH", current, len(ring.buckets)))
+            parts.extend(_pack_counters(bucket) for bucket in ring.buckets)
+        body = zlib.compress(b"".join(parts), 6)
+        return _HEADER.pack(_MAGIC, _VERSION, self.width, self.clock(), zlib.crc32(body)) + body
+
+    def restore(self, data):
+        """Tila tilannekuvasta. Mittarit yhdistetään nimillä (uudet mittarit alkavat nollasta)."""
+        snap = read_snapshot(data)
+        if snap is None:
+            return False
+        mapping = [(METER_INDEX[name], i) for i, name in enumerate(snap["names"]) if name in METER_INDEX]
+        for dst, src in mapping:
+            self.totals[dst] = snap["totals"][src]
+        for ring in self.rings:
+            saved = snap["rings"].get(ring.name)
+            if saved is None or saved[0] < 0 or len(saved[1]) != len(ring.buckets):
+                continue
+            ring.current = saved[0]
+            for bucket, values in zip(ring.buckets, saved[1]):
+                for dst, src in mapping:
+                    bucket[dst] = values[src]
+            # Juokseva summa lasketaan kerran; vanhentuneet lokerot poistuvat seuraavassa advancessa
+            for i in range(self.width):
+                ring.sum[i] = sum(bucket[i] for bucket in ring.buckets)
+        return True
+
+    def _autosave(self):
+        if self.path is not None and time.monotonic() - self._last_save >= self.save_s:
+            self.save()
+
+    def save(self, path=None):
+        """Tilannekuva tiedostoon atomisesti (väliaikainen tiedosto, fsync, korvaus)."""
+        path = self.path if path is None else path
+        if path is None:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(self.snapshot())
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+        self._last_save = time.monotonic()
+
+
+def read_snapshot(data):
+    """
+    Tilannekuva sanakirjaksi: {"time", "names", "totals", "rings": {nimi: (lokero, [laskurit...])}}.
+    Väärä tunniste tai CRC -> None.
+    """
+    if len(data) < _HEADER.size:
+        return None
+    magic, version, width, saved_at, crc = _HEADER.unpack_from(data)
+    body = data[_HEADER.size:]
+    if magic != _MAGIC or version != _VERSION or zlib.crc32(body) != crc:
+        return None
+    raw = zlib.decompress(body)
+    end = raw.index(b"\0")
+    names = raw[:end].decode().split("\n")
+    offset = end + 1
+    size = 8 * width
+
+    def counters():
+        nonlocal offset
+        values = array("q")
+        values.frombytes(raw[offset:offset + size])
+        if sys.byteorder == "big":
+            values.byteswap()
+        offset += size
+        return values
+
+    totals = counters()
+    rings = {}
+    for name, _, _ in RINGS:
+        current, length = struct.unpack_from("<qH", raw, offset)
+        offset += struct.calcsize("<qH")
+        rings[name] = (current, [counters() for _ in range(length)])
+    return {"time": saved_at, "names": names, "totals": totals, "rings": rings}
@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+"""
+Ruutuajan profilointi: silmukan vaiheiden kestot rengaspuskuriin.
+
+Silmukka kutsuu PROFILER.frame() ruudun alussa ja PROFILER.mark("vaihe")
+kunkin vaiheen jälkeen; vaiheen kesto = aika edellisestä merkinnästä (saman
+nimen merkinnät ruudun sisällä lasketaan yhteen). Viimeisimmät
+config.PROFILER_FRAMES ruutua säilytetään array-puskureissa. Kun profilointi
+ei ole päällä, mark() palaa heti.
+
+F3 näyttää/piilottaa p50/p95/p99-yhteenvedon ruudulla (ja käynnistää
+keräyksen) sekä kuvavälimuistin koon, osumaprosentin ja poistot; F4 tallentaa puskurin CSV-tiedostoksi config.PROFILER_CSV_DIR-hakemistoon.
+"""
+
+import os
+import time
+from array import array
+
+import pygame
+
+import config
+from asset_cache import ASSETS
+from ui import draw_text, px
+
+# Vaiheiden näyttöjärjestys; tuntemattomat nimet näytetään näiden jälkeen
+STAGES = ["tick", "events", "update", "background", "blits", "ui", "scanlines", "overlay", "present"]
+# Koko ruudun kesto (odotus clock.tickissä mukana)
+FRAME = "frame"
+
+# Yhteenveto lasketaan uudelleen tämän monen ruudun välein
+_OVERLAY_REFRESH_FRAMES = 15
+
+
+def percentile(sorted_values, p):
+    """p (0–100) -persentiili järjestetystä listasta (lähin arvo)."""
+    if not sorted_values:
+        return 0.0
+    i = min(len(sorted_values) - 1, int(round(p / 100 * (len(sorted_values) - 1))))
+    return sorted_values[i]
+
+
+class FrameProfiler:
+    def __init__(self, frames=None, enabled=None):
+        self.frames = config.PROFILER_FRAMES if frames is None else frames
+        self.enabled = config.PROFILER_ENABLED if enabled is None else enabled
+        self.overlay = False
+        self.count = 0        # puskurissa olevat ruudut (enintään frames)
+        self._index = 0       # seuraavan ruudun paikka
+        self._columns = {}    # vaihe -> array("d"), ms
+        self._current = {}
+        self._frame_start = None
+        self._last = None
+        self._summary = []
+        self._summary_age = 0
+        self._assets = ""
+
+    def _column(self, stage):
+        col = self._columns.get(stage)
+        if col is None:
+            col = self._columns[stage] = array("d", bytes(8 * self.frames))
+        return col
+
+    def frame(self):
+        """Päättää edellisen ruudun (puskuriin) ja aloittaa uuden."""
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        if self._frame_start is not None:
+            current = self._current
+            current[FRAME] = (now - self._frame_start) * 1000
+            for stage in current:
+                self._column(stage)
+            i = self._index
+            for stage, col in self._columns.items():
+                col[i] = current.get(stage, 0.0)
+            self._index = (i + 1) % self.frames
+            self.count = min(self.count + 1, self.frames)
+            current.clear()
+            self._summary_age += 1
+        self._frame_start = now
+        self._last = now
+
+    def reset(self, frames=None):
+        """Tyhjentää puskurit (ja vaihtaa halutessa niiden koon)."""
+        if frames is not None:
+            self.frames = frames
+        self.count = 0
+        self._index = 0
+        self._columns = {}
+        self._summary = []
+        self._summary_age = 0
+        self.skip()
+
+    def skip(self):
+        """Hylkää keskeneräisen ruudun (esim. pelin ajo valikon ruudun sisällä)."""
+        self._current.clear()
+        self._frame_start = None
+        self._last = None
+
+    def mark(self, stage):
+        """Aika edellisestä merkinnästä vaiheelle `stage`."""
+        if not self.enabled or self._last is None:
+            return
+        now = time.perf_counter()
+        self._current[stage] = self._current.get(stage, 0.0) + (now - self._last) * 1000
+        self._last = now
+
+    def samples(self, stage):
+        """Vaiheen kestot vanhimmasta uusimpaan (ms)."""
+        col = self._columns.get(stage)
+        if col is None:
+            return []
+        if self.count < self.frames:
+            return list(col[:self.count])
+        return list(col[self._index:]) + list(col[:self._index])
+
+    def stages(self):
+        known = [s for s in STAGES if s in self._columns]
+        return known + sorted(s for s in self._columns if s not in STAGES and s != FRAME) + \
+            ([FRAME] if FRAME in self._columns else [])
+
+    def summary(self):
+        """[(vaihe, p50, p95, p99), ...] ms."""
+        rows = []
+        for stage in self.stages():
+            values = sorted(self.samples(stage))
+            rows.append((stage, percentile(values, 50), percentile(values, 95), percentile(values, 99)))
+        return rows
+
+    def dump_csv(self, path=None):
+        """Puskuri CSV:ksi (rivi = ruutu, sarake = vaihe). Palauttaa polun tai None."""
+        if not self.count:
+            return None
+        if path is None:
+            os.makedirs(config.PROFILER_CSV_DIR, exist_ok=True)
+            path = os.path.join(config.PROFILER_CSV_DIR, time.strftime("frames_%Y%m%d_%H%M%S.csv"))
+        stages = self.stages()
+        columns = [self.samples(s) for s in stages]
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(",".join(stages) + "\n")
+            for row in zip(*columns):
+                f.write(",".join(f"{v:.3f}" for v in row) + "\n")
+        return path
+
+    def handle_event(self, event):
+        """F3 = yhteenveto päälle/pois, F4 = CSV. True jos tapahtuma käsiteltiin."""
+        if event.type != pygame.KEYDOWN:
+            return False
+        if event.key == pygame.K_F3:
+            self.overlay = not self.overlay
+            if self.overlay:
+                self.enabled = True
+            elif not config.PROFILER_ENABLED:
+                self.enabled = False
+                self.skip()
+            return True
+        if event.key == pygame.K_F4:
+            path = self.dump_csv()
+            if path:
+                print(f"Ruutuajat tallennettu: {path}")
+            return True
+        return False
+
+    def draw_overlay(self, surface, fonts, dirty=None):
+        """Yhteenveto oikeaan yläkulmaan (jos päällä); merkitsee alueen DirtyRectsiin."""
+        rect = None
+        if self.overlay:
+            if self._summary_age >= _OVERLAY_REFRESH_FRAMES or not self._summary:
+                self._summary = self.summary()
+                s = ASSETS.stats()
+                self._assets = f"kuvat {s['bytes'] / 1048576:.1f} MB, {100 * s['hit_rate']:.0f} %, poistot {s['evictions']}"
+                self._summary_age = 0
+            font = fonts["small"]
+            line_h = font.get_linesize()
+            rows = [("ms", "p50", "p95", "p99")] + [
+                (stage, f"{p50:.1f}", f"{p95:.1f}", f"{p99:.1f}") for stage, p50, p95, p99 in self._summary
+            ]
+            # Sarakkeiden keskikohdat (fontti ei ole tasavälinen)
+            columns = [None, px(112), px(157), px(202)]
+            rect = pygame.Rect(surface.get_width() - px(234), px(50), px(226), line_h * (len(rows) + 1) + px(8))
+            pygame.draw.rect(surface, (0, 0, 0), rect)
+            pygame.draw.rect(surface, config.COLOR_BORDER, rect, 1)
+            for i, row in enumerate(rows):
+                color = config.COLOR_TEXT_YELLOW if i == 0 else config.COLOR_TEXT
+                y = rect.y + px(4) + i * line_h
+                draw_text(surface, row[0], rect.x + px(6), y, font, color)
+                for cx, cell in zip(columns[1:], row[1:]):
+                    draw_text(surface, cell, rect.x + cx, y, font, color, center=True)
+            draw_text(surface, self._assets, rect.x + px(6), rect.y + px(4) + len(rows) * line_h, font, config.COLOR_TEXT_DIM)
+        if dirty is not None:
+            dirty.track("profiler", rect, (tuple(self._summary), self._assets))
+        self.mark("overlay")
+        return rect
+
+
+PROFILER = FrameProfiler()
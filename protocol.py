@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""
+Pelipalvelimen (server.py) ja kaappien (remote.py) välinen binääriprotokolla.
+
+Viesti = otsake (tyyppi B, hyötykuorman pituus H) + kiinteän mittainen
+hyötykuorma. Kortit ovat koodeja 0–51 (games.hand_eval), pysähdykset
+tavuja ja pelit journal.GAME_*-numeroita, kuten päiväkirjassa.
+
+    HELLO paikka            -> WELCOME saldo
+    ADD määrä               -> CREDITS saldo
+    DEAL panos, kädet       -> DEALT saldo, jaetut 5 korttia
+    DRAW HOLD-maski         -> DRAWN siemen, voitto, saldo, pääkäden kortit
+    SPIN peli, panos, linjat -> SPUN siemen, voitto, saldo, pysähdykset
+    (virhe)                 -> ERROR koodi
+"""
+
+import struct
+
+HEADER = struct.Struct("<BH")
+
+HELLO, ADD, DEAL, DRAW, SPIN = 1, 2, 3, 4, 5
+WELCOME, CREDITS, DEALT, DRAWN, SPUN, ERROR = 129, 130, 131, 132, 133, 255
+
+PAYLOADS = {
+    HELLO: struct.Struct("<H"),     # paikka
+    ADD: struct.Struct("<I"),       # lisättävät creditit
+    DEAL: struct.Struct("<IB"),     # panos per käsi, kädet
+    DRAW: struct.Struct("<B"),      # HOLD-maski
+    SPIN: struct.Struct("<BIB"),    # peli, panos per linja, linjat
+    WELCOME: struct.Struct("<q"),   # saldo
+    CREDITS: struct.Struct("<q"),
+    DEALT: struct.Struct("<q5s"),   # saldo, jaetut kortit
+    DRAWN: struct.Struct("<QIq5s"),  # siemen, kokonaisvoitto, saldo, pääkäden lopulliset kortit
+    SPUN: struct.Struct("<QIq5s"),  # siemen, voitto, saldo, pysähdykset (täytetty nollilla)
+    ERROR: struct.Struct("<B"),
+}
+
+# ERROR-koodit
+ERR_REQUEST = 1   # tuntematon tai väärän mittainen viesti, virheellinen arvo
+ERR_CREDITS = 2   # saldo ei riitä panokseen
+ERR_STATE = 3     # DRAW ilman jakoa
+ERR_SEAT = 4      # HELLO puuttuu tai paikka on jo käytössä
+
+ERROR_TEXTS = {
+    ERR_REQUEST: "virheellinen pyyntö",
+    ERR_CREDITS: "saldo ei riitä",
+    ERR_STATE: "väärä kierroksen vaihe",
+    ERR_SEAT: "paikka varattu tai tuntematon",
+}
+
+
+class RequestError(Exception):
+    """Palvelin vastaa ERROR-viestillä; code = ERR_*."""
+
+    def __init__(self, code):
+        super().__init__(ERROR_TEXTS.get(code, f"virhe {code}"))
+        self.code = code
+
+
+def encode(kind, *fields):
+    payload = PAYLOADS[kind].pack(*fields)
+    return HEADER.pack(kind, len(payload)) + payload
+
+
+def decode(kind, payload):
+    """Hyötykuorman kentät; väärä tyyppi tai pituus -> RequestError(ERR_REQUEST)."""
+    fmt = PAYLOADS.get(kind)
+    if fmt is None or len(payload) != fmt.size:
+        raise RequestError(ERR_REQUEST)
+    return fmt.unpack(payload)
+
+
+async def read_message(reader):
+    """(tyyppi, hyötykuorma) asyncio-virrasta; asyncio.IncompleteReadError yhteyden katketessa."""
+    kind, size = HEADER.unpack(await reader.readexactly(HEADER.size))
+    return kind, await reader.readexactly(size)
+
+
+def _recv_exact(sock, size):
+    data = b""
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError("palvelin sulki yhteyden")
+        data += chunk
+    return data
+
+
+def recv_message(sock):
+    """(tyyppi, hyötykuorma) estävästä socketista."""
+    kind, size = HEADER.unpack(_recv_exact(sock, HEADER.size))
+    return kind, _recv_exact(sock, size)
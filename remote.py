@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""
+Kaapin yhteys pelipalvelimeen (server.py): estävä TCP-socket, yksi pyyntö
+kerrallaan. Palvelin arpoo ja kirjaa kierrokset; kaappi saa tuloksen ja
+piirtää sen. Saldo (credits) on palvelimen viimeksi ilmoittama.
+"""
+
+import socket
+
+import config
+import protocol
+from protocol import RequestError
+
+RemoteError = RequestError
+
+
+class RemoteSeat:
+    def __init__(self, host=None, port=None, seat=None, timeout=None):
+        host = config.SERVER_HOST if host is None else host
+        port = config.SERVER_PORT if port is None else port
+        self.seat = config.SERVER_SEAT if seat is None else seat
+        timeout = config.SERVER_TIMEOUT_S if timeout is None else timeout
+        self.sock = socket.create_connection((host, port), timeout=timeout)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        (self.credits,) = self._call(protocol.HELLO, protocol.WELCOME, self.seat)
+
+    def _call(self, kind, reply, *fields):
+        self.sock.sendall(protocol.encode(kind, *fields))
+        got, payload = protocol.recv_message(self.sock)
+        if got == protocol.ERROR:
+            raise RemoteError(protocol.decode(got, payload)[0])
+        if got != reply:
+            raise RemoteError(protocol.ERR_REQUEST)
+        return protocol.decode(got, payload)
+
+    def add_credits(self, amount):
+        (self.credits,) = self._call(protocol.ADD, protocol.CREDITS, amount)
+        return self.credits
+
+    def poker_deal(self, bet, hands=1):
+        """Jako: panos veloitetaan palvelimella. Palauttaa jaetut 5 korttikoodia."""
+        self.credits, dealt = self._call(protocol.DEAL, protocol.DEALT, bet, hands)
+        return list(dealt)
+
+    def poker_draw(self, held_mask):
+        """Vaihto: (kierroksen siemen, kaikkien käsien voitto, pääkäden lopulliset kortit)."""
+        seed, win, self.credits, final = self._call(protocol.DRAW, protocol.DRAWN, held_mask)
+        return seed, win, list(final)
+
+    def spin(self, game, line_bet, lines=1):
+        """Pyöräytys (journal.GAME_SLOT / GAME_LINES): (siemen, voitto, pysähdykset)."""
+        seed, win, self.credits, stops = self._call(protocol.SPIN, protocol.SPUN, game, line_bet, lines)
+        return seed, win, list(stops)
+
+    def close(self):
+        self.sock.close()
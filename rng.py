@@ -0,0 +1,296 @@
+# -*- coding: utf-8 -*-
+"""
+Satunnaislukupalvelu: kierrosten siemenet riippumattomista, puskuroiduista
+virroista ja jatkuva tulosten terveystarkistus.
+
+Jokaisella pelillä ja paikalla (pelipalvelimen kaappi) on oma virtansa
+RNG.stream(peli, paikka). Virta on SHAKE-256 laskuritilassa: avain johdetaan
+pääsiemenestä (config.RNG_SEED tai käyttöjärjestelmän entropia) ja virran
+nimestä BLAKE2b:llä, ja lohko n = SHAKE-256(avain || n). Sama pääsiemen
+antaa siis samat luvut riippumatta siitä, missä järjestyksessä virtoja
+käytetään. Luvut tuotetaan config.RNG_BUFFER 64-bittisen sanan puskureina;
+seuraava puskuri täytetään taustasäikeessä, jotta generointi ei osu ruudun
+piirtoon (jos se ei ehdi, puskuri tehdään heti ja lasketaan ohitukseksi).
+
+RngStream on random.Random-yhteensopiva (shuffle, randrange, sample,
+getrandbits), ja lukuvälin rajaus tehdään Lemiren menetelmällä ilman
+modulo-vinoumaa (randbelow). Kierroksen sisäinen satunnaisuus johdetaan
+edelleen siemenestä random.Random(seed):llä (journal.py, tools/replay.py).
+
+Terveystarkistus (HealthMonitor) laskee jaettujen korttien ja rullien
+symbolien frekvenssit juoksevasti ja tekee khiin neliö -testin
+config.RNG_HEALTH_WINDOW havainnon välein; ylitys = hälytys stderriin.
+Lisäksi jokainen puskuri tarkistetaan toistuvien sanojen varalta (jumittunut
+generaattori).
+"""
+
+import hashlib
+import math
+import operator
+import os
+import queue
+import random
+import sys
+import threading
+import time
+from array import array
+
+import config
+
+_MASK64 = (1 << 64) - 1
+# 2**-53: 53 ylintä bittiä liukuluvuksi [0, 1) kuten random.random()
+_RECIP53 = 1.0 / (1 << 53)
+
+
+def chi2_critical(df, z):
+    """Khiin neliö -jakauman kriittinen arvo (Wilson–Hilferty), z = normaalijakauman kvantiili."""
+    k = 2.0 / (9.0 * df)
+    return df * (1.0 - k + z * math.sqrt(k)) ** 3
+
+
+class ChiSquareTest:
+    """
+    Yksi juokseva frekvenssitesti: havainnot lokeroihin (O(1)), testi ja
+    nollaus `window` havainnon välein. probabilities = lokeroiden odotetut
+    osuudet (summa 1), df = vapausasteet.
+    """
+
+    def __init__(self, name, probabilities, df=None, window=None, z=None):
+        self.name = name
+        self.probabilities = list(probabilities)
+        self.df = len(self.probabilities) - 1 if df is None else df
+        self.window = config.RNG_HEALTH_WINDOW if window is None else window
+        self.critical = chi2_critical(self.df, config.RNG_HEALTH_Z if z is None else z)
+        self.counts = [0] * len(self.probabilities)
+        self.n = 0
+        self.tests = 0
+        self.failures = 0
+        self.last = None  # viimeisimmän testin khiin neliö
+
+    def add(self, index):
+        """Yksi havainto; palauttaa hälytystekstin, jos ikkuna täyttyi ja testi hylkäsi."""
+        self.counts[index] += 1
+        self.n += 1
+        if self.n >= self.window:
+            return self.evaluate()
+        return None
+
+    def evaluate(self):
+        n = self.n
+        stat = sum((c - n * p) ** 2 / (n * p) for c, p in zip(self.counts, self.probabilities) if p)
+        self.last = stat
+        self.tests += 1
+        self.counts = [0] * len(self.probabilities)
+        self.n = 0
+        if stat > self.critical:
+            self.failures += 1
+            return f"{self.name}: khiin neliö {stat:.1f} > {self.critical:.1f} ({n} havaintoa, df {self.df})"
+        return None
+
+
+class HealthMonitor:
+    """Korttien ja rullien symbolien juoksevat testit sekä hälytykset."""
+
+    def __init__(self):
+        self.cards = ChiSquareTest("kortit", [1 / 52] * 52)
+        self.reel_tests = {}  # nimi -> (ChiSquareTest, lokeron aloitus per rulla, symboli-indeksit)
+        self.alarms = []  # (aika, teksti)
+        self._lock = threading.Lock()
+
+    def observe_cards(self, codes):
+        """Jaetut korttikoodit (0–51)."""
+        for code in codes:
+            self._check(self.cards.add(code))
+
+    def observe_stops(self, name, reels, stops):
+        """Rullien pysähdykset; testi symbolien frekvensseistä rullittain (painot = odotusarvo)."""
+        entry = self.reel_tests.get(name)
+        if entry is None:
+            entry = self.reel_tests[name] = self._reel_test(name, reels)
+        test, offsets, index = entry
+        for r, stop in enumerate(stops):
+            self._check(test.add(offsets[r] + index[r][stop]))
+
+    def _reel_test(self, name, reels):
+        # Rullien testit yhdessä: lokerot (rulla, symboli), df = lokerot - rullat
+        probabilities, offsets, index = [], [], []
+        for reel in reels:
+            symbols = sorted(set(reel.symbols))
+            offsets.append(len(probabilities))
+            index.append([symbols.index(sym) for sym in reel.symbols])
+            probabilities.extend(reel.probability(sym) / len(reels) for sym in symbols)
+        test = ChiSquareTest(name, probabilities, df=len(probabilities) - len(reels),
+                             window=config.RNG_HEALTH_WINDOW * len(reels))
+        return test, offsets, index
+
+    def alarm(self, text):
+        with self._lock:
+            self.alarms.append((time.time(), text))
+        print(f"RNG-hälytys: {text}", file=sys.stderr, flush=True)
+
+    def _check(self, failure):
+        if failure is not None:
+            self.alarm(failure)
+
+    def tests(self):
+        return [self.cards] + [entry[0] for entry in self.reel_tests.values()]
+
+
+class RngStream(random.Random):
+    """
+    Yksi riippumaton virta (random.Random-rajapinta). Luvut luetaan
+    puskurista; seuraava puskuri tulee palvelun taustasäikeestä.
+    """
+
+    def __new__(cls, key, service=None):
+        return super().__new__(cls, key)
+
+    def __init__(self, key, service=None):
+        self.service = service
+        super().__init__(key)
+
+    def seed(self, a=None, version=2):
+        if isinstance(a, int):
+            a = a.to_bytes((a.bit_length() + 7) // 8 or 1, "little")
+        elif isinstance(a, str):
+            a = a.encode()
+        self.key = bytes(a) if a is not None else os.urandom(32)
+        self._block = 0      # seuraavaksi ladattava puskuri
+        self._buf = []
+        self._words = iter(self._buf)
+        self._next = None    # (lohko, puskuri) taustasäikeeltä
+        self.gauss_next = None
+
+    def getstate(self):
+        unread = operator.length_hint(self._words)
+        return self.key, self._block * len(self._buf) - unread, len(self._buf)
+
+    def setstate(self, state):
+        key, position, size = state
+        self.seed(key)
+        if size:
+            self._block = position // size
+            self._load()
+            for _ in range(position % size):
+                next(self._words)
+
+    def generate(self, block):
+        """Lohkon `block` sanat (deterministinen avaimesta ja lohkon numerosta)."""
+        size = self.service.buffer_size if self.service is not None else config.RNG_BUFFER
+        data = hashlib.shake_256(self.key + block.to_bytes(8, "little")).digest(8 * size)
+        words = array("Q", data)
+        if sys.byteorder == "big":
+            words.byteswap()
+        return words.tolist()  # listan iteraattori: nopea next() ja jäljellä olevien määrä
+
+    def _load(self):
+        ready = self._next
+        if ready is not None and ready[0] == self._block:
+            words = ready[1]
+        else:
+            words = self.generate(self._block)
+            if self.service is not None:
+                self.service.misses += 1
+        self._next = None
+        self._buf = words
+        self._words = iter(words)
+        self._block += 1
+        if self.service is not None:
+            self.service.refill(self, self._block)
+
+    def next64(self):
+        """Seuraava 64-bittinen sana."""
+        try:
+            return next(self._words)
+        except StopIteration:
+            self._load()
+            return next(self._words)
+
+    def getrandbits(self, k):
+        if k <= 64:
+            return self.next64() >> (64 - k) if k else 0
+        words = (k + 63) // 64
+        value = 0
+        for _ in range(words):
+            value = value << 64 | self.next64()
+        return value >> (words * 64 - k)
+
+    def random(self):
+        return (self.next64() >> 11) * _RECIP53
+
+    def randbelow(self, n):
+        """Tasajakautunut kokonaisluku 0..n-1 (Lemire: kertolasku ja harvinainen hylkäys)."""
+        if n <= 0:
+            raise ValueError("n <= 0")
+        if n > _MASK64:
+            return super()._randbelow_with_getrandbits(n)
+        m = self.next64() * n
+        low = m & _MASK64
+        if low < n:
+            threshold = (_MASK64 + 1 - n) % n
+            while low < threshold:
+                m = self.next64() * n
+                low = m & _MASK64
+        return m >> 64
+
+    # shuffle, randrange, choice ja sample käyttävät tätä
+    _randbelow = randbelow
+
+
+class RngService:
+    """Virrat, taustatäyttö ja terveystarkistus (moduulin RNG-singleton)."""
+
+    def __init__(self, seed=None, buffer_size=None):
+        self.buffer_size = config.RNG_BUFFER if buffer_size is None else buffer_size
+        self.health = HealthMonitor()
+        self.streams = {}
+        self.refills = 0   # taustasäikeen täyttämät puskurit
+        self.misses = 0    # puskurit, jotka jouduttiin tekemään heti
+        self._queue = queue.Queue()
+        self._thread = None
+        self.reseed(config.RNG_SEED if seed is None else seed)
+
+    def reseed(self, seed=None):
+        """Uusi pääsiemen (None = käyttöjärjestelmän entropia); vanhat virrat unohdetaan."""
+        if seed is None:
+            seed = os.urandom(32)
+        elif isinstance(seed, int):
+            seed = seed.to_bytes(32, "little")
+        elif isinstance(seed, str):
+            seed = seed.encode()
+        self._master = hashlib.blake2b(seed, digest_size=64).digest()
+        self.streams = {}
+
+    def stream(self, game, seat=0):
+        """Pelin (journal.GAME_* tai nimi) ja paikan oma virta."""
+        stream = self.streams.get((game, seat))
+        if stream is None:
+            key = hashlib.blake2b(f"{game}:{seat}".encode(), key=self._master, digest_size=32).digest()
+            stream = self.streams[(game, seat)] = RngStream(key, self)
+        return stream
+
+    def refill(self, stream, block):
+        """Pyytää lohkon `block` taustasäikeeltä."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="rng-refill", daemon=True)
+            self._thread.start()
+        self._queue.put((stream, block))
+
+    def _run(self):
+        while True:
+            stream, block = self._queue.get()
+            if stream._block != block:
+                continue  # virta ehti jo ohi (puskuri tehtiin heti)
+            words = stream.generate(block)
+            if len(set(words)) != len(words):
+                self.health.alarm(f"toistuva 64-bittinen sana puskurissa {block}")
+            stream._next = (block, words)
+            self.refills += 1
+
+    def report(self):
+        tests = ", ".join(f"{t.name} {t.tests - t.failures}/{t.tests}" for t in self.health.tests())
+        return (f"RNG: {len(self.streams)} virtaa, puskureita {self.refills} taustalla / {self.misses} heti, "
+                f"testit läpi {tests}, hälytyksiä {len(self.health.alarms)}")
+
+
+RNG = RngService()
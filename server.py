@@ -0,0 +1,306 @@
+# -*- coding: utf-8 -*-
+"""
+Pelipalvelin monen kaapin asennukseen: yksi asyncio-prosessi hoitaa kaikkien
+paikkojen (seat) satunnaisluvut, pokerin jaot, pyöräytykset, creditit ja
+kierrospäiväkirjan. Kaapit (remote.RemoteSeat) vain piirtävät tuloksen.
+
+Yksi yhteys per paikka; pyynnöt käsitellään tapahtumasilmukassa yksi
+kerrallaan (GameServer.handle), joten paikan tila ei tarvitse lukkoja.
+Credit-lokien commitit (write + fsync) tehdään taustasäikeessä ryhminä
+(GroupCommit), ja vastaus lähetetään vasta, kun saldo on levyllä.
+Pokerin siemen paljastetaan kaapille vasta vaihdon jälkeen (DRAWN), jolloin
+kaappi voi johtaa pakan ja lisäkädet itse piirtoa varten.
+
+    python -m server                          # config.SERVER_HOST:SERVER_PORT
+    python -m server --port 7421 --no-persist --journal /tmp/rounds.jnl
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import signal
+import socket
+import sys
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+import config
+import protocol
+from credits import CreditStore
+from journal import GAME_LINES, GAME_POKER, GAME_SLOT, RoundJournal, new_round_seed
+from games import hand_eval, lines, reels
+from protocol import RequestError
+from rng import RNG
+
+MAX_HANDS = max(config.POKER_HAND_COUNTS)
+
+
+class Seat:
+    """Yhden kaapin saldo, credit-loki (tai None) ja kesken oleva pokerikierros."""
+
+    def __init__(self, number, store=None):
+        self.number = number
+        self.store = store
+        self.credits = store.credits if store is not None else 0
+        self.pending = None  # (siemen, jaetut, pakka, panos, kädet) DEALin ja DRAWin välillä
+        self.connected = False
+        self.commit_due = False  # kierros päättyi: saldo levylle ennen vastausta
+
+    def update(self, credits, **meters):
+        self.credits = credits
+        if self.store is not None:
+            self.store.update(credits, **meters)
+
+    def commit(self):
+        """Kierroksen raja: commit tehdään ennen vastausta (GameServer.serve_client)."""
+        self.commit_due = self.store is not None
+
+
+class GroupCommit:
+    """
+    CreditStore.commit() taustasäikeessä, jottei fsync pysäytä tapahtumasilmukkaa.
+    Saman silmukan kierroksen ja edellisen ryhmän aikana pyydetyt commitit
+    kirjoitetaan yhtenä ryhmänä; ryhmiä on kerrallaan käynnissä yksi.
+    """
+
+    def __init__(self):
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="commit")
+        self._queued = {}  # CreditStore -> odottajien future
+        self._busy = False
+        self.batches = 0
+        self.commits = 0
+
+    def commit(self, store):
+        """Lisää storen seuraavaan ryhmään; palauttaa futuren, joka valmistuu commitin jälkeen."""
+        loop = asyncio.get_running_loop()
+        future = self._queued.get(store)
+        if future is None:
+            future = self._queued[store] = loop.create_future()
+        if not self._busy:
+            self._busy = True
+            loop.call_soon(self._start, loop)
+        return future
+
+    def _start(self, loop):
+        batch, self._queued = self._queued, {}
+        self.batches += 1
+        self.commits += len(batch)
+        job = loop.run_in_executor(self._executor, _commit_all, list(batch))
+        job.add_done_callback(lambda done: self._finish(loop, batch, done))
+
+    def _finish(self, loop, batch, job):
+        error = job.exception()
+        for future in batch.values():
+            if future.done():
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(None)
+        if self._queued:
+            self._start(loop)
+        else:
+            self._busy = False
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+
+def _commit_all(stores):
+    for store in stores:
+        store.commit()
+
+
+class GameServer:
+    def __init__(self, journal=None, data_dir=None, rng=RNG):
+        self.journal = journal  # journal.RoundJournal tai None
+        self.data_dir = data_dir  # paikkojen credit-lokit (seat_N.wal) tai None = vain muistissa
+        self.rng = rng  # rng.RngService: oma virta per peli ja paikka
+        self.seats = {}
+        self.pays = hand_eval.pay_multipliers()
+        self.commits = GroupCommit()
+
+    def seat(self, number):
+        seat = self.seats.get(number)
+        if seat is None:
+            store = None
+            if self.data_dir is not None:
+                store = CreditStore(os.path.join(self.data_dir, f"seat_{number}.wal"))
+            seat = self.seats[number] = Seat(number, store)
+        return seat
+
+    def handle(self, seat, kind, payload):
+        """Yksi pyyntö -> vastausviesti (tavuina). Virheellinen pyyntö -> ERROR."""
+        try:
+            fields = protocol.decode(kind, payload)
+            if kind == protocol.ADD:
+                return self._add(seat, *fields)
+            if kind == protocol.DEAL:
+                return self._deal(seat, *fields)
+            if kind == protocol.DRAW:
+                return self._draw(seat, *fields)
+            if kind == protocol.SPIN:
+                return self._spin(seat, *fields)
+            raise RequestError(protocol.ERR_REQUEST)
+        except RequestError as e:
+            return protocol.encode(protocol.ERROR, e.code)
+        except Exception:
+            # Käsittelijät muuttavat tilaa vasta, kun vastaus on koottu; kaappi saa aina vastauksen
+            traceback.print_exc(file=sys.stderr)
+            return protocol.encode(protocol.ERROR, protocol.ERR_REQUEST)
+
+    def _add(self, seat, amount):
+        seat.update(seat.credits + amount, added=amount)
+        seat.commit()
+        return protocol.encode(protocol.CREDITS, seat.credits)
+
+    def _deal(self, seat, bet, hands):
+        if not config.MIN_BET <= bet <= config.MAX_BET or not 1 <= hands <= MAX_HANDS:
+            raise RequestError(protocol.ERR_REQUEST)
+        if seat.credits < bet * hands:
+            raise RequestError(protocol.ERR_CREDITS)
+        # Kesken jätetty jako (kaapissa ESC) hylätään kuten paikallisesti: panos on jo veloitettu
+        seed = new_round_seed(self.rng.stream(GAME_POKER, seat.number))
+        dealt, rest = hand_eval.deal_codes(seed)
+        self.rng.health.observe_cards(dealt)
+        seat.pending = (seed, dealt, rest, bet, hands)
+        # Panos muistiin; levylle kierroksen lopussa kuten kaapissa
+        seat.update(seat.credits - bet * hands, bet=bet * hands)
+        return protocol.encode(protocol.DEALT, seat.credits, bytes(dealt))
+
+    def _draw(self, seat, mask):
+        if seat.pending is None:
+            raise RequestError(protocol.ERR_STATE)
+        seed, dealt, rest, bet, hands = seat.pending
+        mask &= 0x1F
+        finals = hand_eval.draw_hands(seed, dealt, rest, mask, hands)
+        codes = hand_eval.eval_hands(finals)
+        wins = [bet * self.pays[code] for code in codes]
+        total = sum(wins)
+        response = protocol.encode(protocol.DRAWN, seed, total, seat.credits + total, bytes(finals[0]))
+        if self.journal is not None:
+            for k, (final, code, win) in enumerate(zip(finals, codes, wins)):
+                self.journal.record_poker(seed, bet, win, mask, code, dealt, final, index=k, seat=seat.number)
+        seat.pending = None
+        seat.update(seat.credits + total, won=total)
+        seat.commit()
+        return response
+
+    def _spin(self, seat, game, line_bet, line_count):
+        if not config.MIN_BET <= line_bet <= config.MAX_BET:
+            raise RequestError(protocol.ERR_REQUEST)
+        if game == GAME_SLOT and line_count == 1:
+            wager = line_bet
+        elif game == GAME_LINES and 1 <= line_count <= lines.MAX_LINES:
+            wager = line_bet * line_count
+        else:
+            raise RequestError(protocol.ERR_REQUEST)
+        if seat.credits < wager:
+            raise RequestError(protocol.ERR_CREDITS)
+        seat.pending = None
+        seed = new_round_seed(self.rng.stream(game, seat.number))
+        rng = random.Random(seed)
+        if game == GAME_SLOT:
+            stops = reels.spin_stops(rng)
+            self.rng.health.observe_stops("slot", reels.REELS, stops)
+            win = reels.check_win(reels.stop_symbols(stops), line_bet)
+        else:
+            stops = lines.spin_stops(rng)
+            self.rng.health.observe_stops("lines", lines.LINE_REELS, stops)
+            win = lines.check_win(stops, line_bet, line_count)[0]
+        credits = seat.credits - wager + win
+        response = protocol.encode(protocol.SPUN, seed, win, credits, bytes(stops))
+        if self.journal is not None:
+            if game == GAME_SLOT:
+                self.journal.record_slot(seed, wager, win, stops, seat=seat.number)
+            else:
+                self.journal.record_lines(seed, wager, win, line_count, stops, seat=seat.number)
+        seat.update(credits, bet=wager, won=win)
+        seat.commit()
+        return response
+
+    async def serve_client(self, reader, writer):
+        """Yksi kaappi: HELLO, sitten pyyntö–vastaus-pareja kunnes yhteys katkeaa."""
+        sock = writer.get_extra_info("socket")
+        if sock is not None:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        seat = None
+        try:
+            kind, payload = await protocol.read_message(reader)
+            number = 0
+            if kind == protocol.HELLO and len(payload) == protocol.PAYLOADS[kind].size:
+                (number,) = protocol.decode(kind, payload)
+            if number == 0 or self.seat(number).connected:
+                writer.write(protocol.encode(protocol.ERROR, protocol.ERR_SEAT))
+                return
+            seat = self.seat(number)
+            seat.connected = True
+            writer.write(protocol.encode(protocol.WELCOME, seat.credits))
+            while True:
+                kind, payload = await protocol.read_message(reader)
+                response = self.handle(seat, kind, payload)
+                if seat.commit_due:
+                    seat.commit_due = False
+                    await self.commits.commit(seat.store)
+                writer.write(response)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            if seat is not None:
+                seat.connected = False
+                # Kesken jäänyt jako: panos on veloitettu, joten se kirjataan levylle
+                # (ei odoteta; sammutettaessa close() kirjoittaa loput)
+                if seat.store is not None:
+                    self.commits.commit(seat.store)
+            writer.close()
+
+    def close(self):
+        self.commits.close()
+        for seat in self.seats.values():
+            if seat.store is not None:
+                seat.store.close()
+
+
+async def serve(server, host, port):
+    """Kuuntelee, kunnes tulee SIGTERM tai SIGINT (päiväkirja ja lokit suljetaan hallitusti)."""
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except (NotImplementedError, RuntimeError):  # Windows: Ctrl+C -> KeyboardInterrupt
+            pass
+    listener = await asyncio.start_server(server.serve_client, host, port)
+    print(f"Pelipalvelin kuuntelee {host}:{port}", flush=True)
+    async with listener:
+        await stop.wait()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Monen kaapin pelipalvelin (RNG, jaot, creditit, päiväkirja)")
+    parser.add_argument("--host", default=config.SERVER_HOST)
+    parser.add_argument("--port", type=int, default=config.SERVER_PORT)
+    parser.add_argument("--journal", default=os.path.join(config.SERVER_DATA_DIR, "rounds.jnl"))
+    parser.add_argument("--no-journal", action="store_true", help="ei kierrospäiväkirjaa")
+    parser.add_argument("--data", default=config.SERVER_DATA_DIR, help="paikkojen credit-lokien hakemisto")
+    parser.add_argument("--no-persist", action="store_true", help="creditit vain muistissa")
+    args = parser.parse_args(argv)
+
+    journal = None if args.no_journal else RoundJournal(args.journal)
+    server = GameServer(journal, None if args.no_persist else args.data)
+    try:
+        asyncio.run(serve(server, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+        if journal is not None:
+            journal.close()
+        print(server.rng.report(), flush=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
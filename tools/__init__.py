@@ -0,0 +1,2 @@
+# -*- coding: utf-8 -*-
+"""Komentorivityökalut (simulaatiot, mittaukset). Ajo: python -m tools.<nimi>."""
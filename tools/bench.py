@@ -0,0 +1,340 @@
+# -*- coding: utf-8 -*-
+"""
+Suorituskykymittaukset ilman näyttöä (SDL dummy -ajuri).
+
+Pelaa PokerGamea ja SlotGamea skriptatulla syötteellä kiinteästä siemenestä:
+kello palauttaa aina saman ruutuajan (logiikka etenee deterministisesti),
+ja syöte (klikkaukset, H-näppäin) lähetetään tapahtumajonoon ennen jokaista
+ruutua. Mitataan ruutuajan p50/p95/p99 (profiler.PROFILER), kierrokset
+sekunnissa ja muistin huippukäyttö sekä mikromittaukset kuumille funktioille.
+
+Tulokset tallennetaan JSON-tiedostoon ja verrataan perustasoon: jos jokin
+mittari heikkenee enemmän kuin --threshold, paluukoodi on 1. Puuttuva
+perustaso on virhe (paluukoodi 2). Vertailukohta tools/bench_baseline.json on
+versionhallinnassa; kohdelaitteella se luodaan uudelleen --save-baseline.
+
+    python -m tools.bench
+    python -m tools.bench --save-baseline      # nykyinen tulos perustasoksi
+    python -m tools.bench --poker-rounds 100 --slot-spins 100 --threshold 0.1
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame  # noqa: E402
+
+import config  # noqa: E402
+from asset_cache import ASSETS  # noqa: E402
+from profiler import PROFILER, FRAME, percentile  # noqa: E402
+from rng import RNG  # noqa: E402
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_baseline.json")
+DEFAULT_OUTPUT = "bench_results.json"
+# Ruutuja per kierros (ylläraja) rengaspuskurin mitoitukseen
+_FRAMES_PER_ROUND = 400
+
+
+class BenchClock:
+    """pygame.time.Clockin korvike: vakio ruutuaika ja skriptattu syöte jokaisella tick()-kutsulla."""
+
+    def __init__(self, frame_ms, script):
+        self.frame_ms = frame_ms
+        self.script = script
+        self.frames = 0
+
+    def tick(self, fps=0):
+        self.frames += 1
+        self.script()
+        return self.frame_ms
+
+    def get_fps(self):
+        return 1000 / self.frame_ms
+
+
+def _click(pos):
+    # pos näytön pikseleinä (SCREEN_WIDTH x SCREEN_HEIGHT); ui.scene_event skaalaa kohtaukseen
+    pygame.event.post(pygame.event.Event(pygame.MOUSEBUTTONDOWN, button=1, pos=pos))
+
+
+def _key(key):
+    pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=key, mod=0, unicode="", scancode=0))
+
+
+def _quit():
+    pygame.event.post(pygame.event.Event(pygame.QUIT))
+
+
+def _measure(name, run, rounds):
+    """Ajaa pelin silmukan ja palauttaa {nimi.mittari: arvo}."""
+    PROFILER.reset(frames=max(1000, rounds * _FRAMES_PER_ROUND))
+    enabled = PROFILER.enabled
+    PROFILER.enabled = True
+    pygame.event.clear()
+    t0 = time.perf_counter()
+    try:
+        run()
+    finally:
+        PROFILER.enabled = enabled
+    elapsed = time.perf_counter() - t0
+    frames = sorted(PROFILER.samples(FRAME))
+    return {
+        f"{name}.frames": len(frames),
+        f"{name}.frame_p50_ms": percentile(frames, 50),
+        f"{name}.frame_p95_ms": percentile(frames, 95),
+        f"{name}.frame_p99_ms": percentile(frames, 99),
+        f"{name}.frame_max_ms": frames[-1] if frames else 0.0,
+        f"{name}.rounds_per_s": rounds / elapsed,
+    }
+
+
+def bench_poker(screen, fonts, rounds, frame_ms, seed):
+    """Jako – vihjeen mukainen HOLD (H) – DEAL, `rounds` kertaa."""
+    from games.poker import PokerGame
+    game = PokerGame(screen, None, fonts)
+    # DEAL / uusi peli -napin keskipiste (PokerGame.run: action_rect)
+    deal_pos = (config.SCREEN_WIDTH - 70, config.SCREEN_HEIGHT - 34)
+    done = [0]
+
+    def script():
+        if done[0] >= rounds:
+            _quit()
+        elif game.phase == "hold":
+            _key(pygame.K_h)
+            _click(deal_pos)
+            done[0] += 1
+        elif game.phase == "finished":
+            _click(deal_pos)
+
+    game.clock = BenchClock(frame_ms, script)
+    RNG.reseed(seed)
+    return _measure("poker", lambda: game.run(rounds * config.MIN_BET + 1), rounds)
+
+
+def bench_slot(screen, fonts, spins, frame_ms, seed):
+    """PELAA heti edellisen pyöräytyksen pysähdyttyä, `spins` kertaa."""
+    from games.slot import SlotGame
+    game = SlotGame(screen, None, fonts)
+    # PELAA-napin keskipiste (SlotGame.run: play_rect)
+    play_pos = (config.SCREEN_WIDTH // 2, 405)
+    done = [0]
+
+    def script():
+        if game.spinning:
+            return
+        if done[0] >= spins:
+            _quit()
+        else:
+            _click(play_pos)
+            done[0] += 1
+
+    game.clock = BenchClock(frame_ms, script)
+    RNG.reseed(seed)
+    return _measure("slot", lambda: game.run(spins * config.MIN_BET + 1), spins)
+
+
+def _per_call_us(fn, calls, repeat=5):
+    """Paras `repeat` ajosta, mikrosekuntia per kutsu (fn tekee `calls` kutsua)."""
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    return best / calls * 1e6
+
+
+def bench_micro(screen, fonts, seed):
+    from games import card_assets
+    from games import lines
+    from games.hand_eval import encode_cards, eval_hands, extra_hand, make_deck, pay_multipliers
+    from games.poker import CARD_WIDTH, CARD_HEIGHT, _draw_card, eval_hand
+    from games.reels import REEL_LENGTH
+    from games.slot import SlotGame
+    from ui import DrawList, LAYER_MOVING, draw_credits_bar, draw_scanlines
+
+    rng = random.Random(seed)
+    hands = [make_deck(rng)[:5] for _ in range(10000)]
+
+    def run_eval():
+        for hand in hands:
+            eval_hand(hand)
+
+    # 100 käden moniläpeli: lisäkäsien jako ja arviointi erissä (yksi kierros per kutsu)
+    pays = pay_multipliers()
+    deals = [encode_cards(make_deck(rng)) for _ in range(20)]
+
+    def run_multi():
+        for k, deck in enumerate(deals):
+            dealt, rest = deck[:5], deck[5:]
+            hands = [extra_hand(k, i, 0b00011, dealt, rest) for i in range(1, 100)]
+            sum(pays[code] for code in eval_hands(hands))
+
+    # Videoslot: 20 linjan erä-arviointi
+    line_columns = [[rng.randrange(len(reel)) for _ in range(10000)] for reel in lines.LINE_REELS]
+    lines.eval_spins([c[:1] for c in line_columns], 20)
+
+    def run_lines():
+        lines.eval_spins(line_columns, 20)
+
+    cards = [(r, s) for r in card_assets.RANKS for s in card_assets.SUITS]
+    card_assets.load_card_surface(cards[0][0], cards[0][1], CARD_WIDTH, CARD_HEIGHT)
+
+    def run_cards():
+        for _ in range(20):
+            for rank, suit in cards:
+                card_assets.load_card_surface(rank, suit, CARD_WIDTH, CARD_HEIGHT)
+
+    # Jakoanimaation ruutu: yläpalkki, pakka ja viisi lentävää korttia piirtolistan kautta
+    draws = DrawList(screen)
+
+    def run_deal():
+        for k in range(20):
+            t = k / 20
+            draws.begin()
+            draw_credits_bar(screen, 100, fonts)
+            for i in range(5):
+                _draw_card(screen, 400 + i * 2, 52 + i * 2, CARD_WIDTH, CARD_HEIGHT, None, None, fonts, face_up=False)
+            draws.layer = LAYER_MOVING
+            for i, (rank, suit) in enumerate(cards[:5]):
+                x = int(402 + (150 + i * 88 - 402) * t)
+                _draw_card(screen, x, int(54 + 114 * t), CARD_WIDTH, CARD_HEIGHT, rank, suit, fonts)
+            draws.flush()
+
+    def run_scanlines():
+        for _ in range(100):
+            draw_scanlines(screen)
+
+    slot = SlotGame(screen, None, fonts)
+    offsets = [i * 0.37 % REEL_LENGTH for i in range(100)]
+    slot._draw_reel(screen, 0, 0.0)
+
+    def run_reels():
+        for base in offsets:
+            for r in range(3):
+                slot._draw_reel(screen, r, base)
+
+    return {
+        "micro.eval_hand_us": _per_call_us(run_eval, len(hands)),
+        "micro.multi_draw_100_us": _per_call_us(run_multi, len(deals)),
+        "micro.lines_eval_20_us": _per_call_us(run_lines, len(line_columns[0])),
+        "micro.load_card_surface_us": _per_call_us(run_cards, 20 * len(cards)),
+        "micro.draw_scanlines_us": _per_call_us(run_scanlines, 100),
+        "micro.deal_frame_us": _per_call_us(run_deal, 20),
+        "micro.draw_reel_us": _per_call_us(run_reels, 3 * len(offsets)),
+    }
+
+
+def peak_rss_kb():
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == "darwin" else rss  # macOS: tavuina
+
+
+def _compared(name):
+    """Verrataanko mittaria perustasoon (kestot, muisti, läpäisy; ei ruutujen määrää)."""
+    return name.endswith(("_ms", "_us", "_kb", "_per_s"))
+
+
+def compare(results, baseline, threshold):
+    """[(mittari, perustaso, nyt, muutos)] heikentyneistä mittareista (muutos > threshold)."""
+    regressions = []
+    for name, base in sorted(baseline.items()):
+        value = results.get(name)
+        if value is None or not base or not _compared(name):
+            continue
+        if name.endswith("_per_s"):
+            change = (base - value) / base
+        else:
+            change = (value - base) / base
+        if change > threshold:
+            regressions.append((name, base, value, change))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ruudunpiirron ja pelisilmukoiden suorituskykymittaus")
+    parser.add_argument("--poker-rounds", type=int, default=30)
+    parser.add_argument("--slot-spins", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--frame-ms", type=float, default=1000 / config.FPS,
+                        help="kellon palauttama ruutuaika (logiikan eteneminen per ruutu)")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="tallenna tulokset perustasoksi")
+    parser.add_argument("--threshold", type=float, default=0.15, help="sallittu heikennys (0.15 = 15 %%)")
+    args = parser.parse_args(argv)
+
+    from ui import init_display, get_fonts
+    pygame.init()
+    screen = init_display()
+    fonts = get_fonts()
+
+    results = {}
+    results.update(bench_poker(screen, fonts, args.poker_rounds, args.frame_ms, args.seed))
+    results.update(bench_slot(screen, fonts, args.slot_spins, args.frame_ms, args.seed))
+    results.update(bench_micro(screen, fonts, args.seed))
+    rss = peak_rss_kb()
+    if rss is not None:
+        results["peak_rss_kb"] = rss
+    assets = ASSETS.stats()
+    results["asset_cache_kb"] = assets["bytes"] / 1024
+    results["asset_cache_hit_rate"] = assets["hit_rate"]
+    pygame.quit()
+
+    report = {
+        "meta": {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "machine": platform.machine(),
+            "platform": platform.platform(),
+            "seed": args.seed,
+            "frame_ms": args.frame_ms,
+            "poker_rounds": args.poker_rounds,
+            "slot_spins": args.slot_spins,
+        },
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+    for name in sorted(results):
+        print(f"{name:32} {results[name]:12.3f}")
+    print(f"Tulokset: {args.output}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        print(f"Perustaso tallennettu: {args.baseline}")
+        return 0
+    if not os.path.isfile(args.baseline):
+        # Portti ei saa mennä läpi vertaamatta: puuttuva perustaso on virhe
+        print(f"Perustasoa ei ole: {args.baseline} (--save-baseline luo sen).", file=sys.stderr)
+        return 2
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)["results"]
+    regressions = compare(results, baseline, args.threshold)
+    for name, base, value, change in regressions:
+        print(f"HEIKENTYNYT {name}: {base:.3f} -> {value:.3f} ({change * 100:+.1f} %)")
+    if regressions:
+        return 1
+    print(f"Ei heikennyksiä (raja {args.threshold * 100:.0f} %).")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""
+Progressiivisen jackpotin (jackpot.py) kilpailumittaus: N kirjoittajaprosessia
+lisää panosten osuuksia samaan jaettuun pottiin ja voittaa sen satunnaisesti.
+
+Tilat: "striped" = jokaisella prosessilla oma laskuri (pelien tapa),
+"locked" = jokainen lisäys yhteisen lukon alla (vertailukohta). Lopuksi
+tarkistetaan, ettei yksikään lisäys hävinnyt: potti = alkuarvo + lisäykset
+- voitoissa nollatut summat.
+
+    python -m tools.jackpot_bench --writers 48 --ops 20000
+    python -m tools.jackpot_bench --writers 48 --mode locked
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import jackpot  # noqa: E402
+
+# Voiton todennäköisyys lisäystä kohden (noin Royal Flush + 777 -sekoitus)
+AWARD_P = 1 / 5000
+
+
+def writer(args):
+    """Yksi kirjoittaja: (lisätyt tuhannesosat, voitoissa poistetut tuhannesosat, voitot, sekunnit)."""
+    path, checkpoint, ops, mode, seed, start = args
+    pool = jackpot.JackpotPool(path, checkpoint, seed=0, contribution=10)
+    if mode == "locked":
+        pool.stripe = None  # kaikki lisäykset yhteisen lukon alla
+    rng = random.Random(seed)
+    added = removed = wins = 0
+    while time.time() < start:
+        time.sleep(0.001)
+    t0 = time.perf_counter()
+    for _ in range(ops):
+        bet = rng.randint(1, 5)
+        pool.contribute(bet)
+        added += bet * pool.contribution
+        if rng.random() < AWARD_P:
+            pool.award()
+            wins += 1
+            removed += pool.last_award_milli
+        pool.maybe_checkpoint()  # kierroksen loppu
+    elapsed = time.perf_counter() - t0
+    pool.close()
+    return added, removed, wins, elapsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Jaetun jackpot-potin kilpailumittaus")
+    parser.add_argument("--writers", type=int, default=48)
+    parser.add_argument("--ops", type=int, default=20000, help="lisäyksiä per kirjoittaja")
+    parser.add_argument("--mode", choices=("striped", "locked"), default="striped")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    tmp = tempfile.mkdtemp(prefix="jackpot_bench")
+    path = os.path.join(tmp, "pool.shm")
+    checkpoint = os.path.join(tmp, "pool.ckpt")
+    try:
+        jackpot.JackpotPool(path, checkpoint, seed=0, stripes=max(64, args.writers)).close()
+        start = time.time() + 0.5
+        tasks = [(path, checkpoint, args.ops, args.mode, args.seed + i, start) for i in range(args.writers)]
+        t0 = time.perf_counter()
+        with multiprocessing.Pool(args.writers) as workers:
+            results = workers.map(writer, tasks)
+        wall = time.perf_counter() - t0 - 0.5
+        pool = jackpot.JackpotPool(path, checkpoint, seed=0)
+        final = pool.pool_milli
+        pool.close()
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    added = sum(r[0] for r in results)
+    removed = sum(r[1] for r in results)
+    wins = sum(r[2] for r in results)
+    ops = args.writers * args.ops
+    per_op_us = sorted(1e6 * r[3] / args.ops for r in results)
+    print(f"{args.writers} kirjoittajaa x {args.ops} lisäystä ({args.mode}): {ops / wall:,.0f} lisäystä/s, "
+          f"{wins} voittoa")
+    print(f"Lisäyksen kesto per kirjoittaja µs: mediaani {per_op_us[len(per_op_us) // 2]:.2f}, "
+          f"hitain {per_op_us[-1]:.2f}")
+    lost = added - removed - final
+    print(f"Lisätty {added / 1000:.3f}, voitoissa {removed / 1000:.3f}, potissa {final / 1000:.3f}: "
+          + ("ei hävinneitä lisäyksiä" if lost == 0 else f"HÄVINNYT {lost / 1000:.3f}"))
+    return 0 if lost == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+"""
+Pelipalvelimen (server.py) kuormitustesti: N samanaikaista paikkaa pelaa
+kierroksia asyncio-asiakkailla samalla protokollalla kuin kaapit.
+
+Pokerikierros = DEAL + DRAW (satunnainen HOLD-maski), hedelmäpeli ja
+videoslot = SPIN. Mitataan kierroksen viive (pyynnön lähetyksestä viimeiseen
+vastaukseen) p50/p95/p99/max ja kierrokset sekunnissa koko ajolta.
+
+    python -m tools.loadtest --spawn --seats 200 --rounds 50
+    python -m tools.loadtest --spawn --no-persist     # creditit vain muistissa (ei fsynciä)
+    python -m tools.loadtest --host 10.0.0.5 --seats 16 --game poker
+    python -m tools.loadtest --spawn --journal /tmp/lt.jnl && python -m tools.replay /tmp/lt.jnl
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config  # noqa: E402
+import protocol  # noqa: E402
+from journal import GAME_LINES, GAME_SLOT  # noqa: E402
+from profiler import percentile  # noqa: E402
+
+GAMES = ("poker", "slot", "lines")
+
+
+async def _call(reader, writer, kind, *fields):
+    writer.write(protocol.encode(kind, *fields))
+    reply, payload = await protocol.read_message(reader)
+    if reply == protocol.ERROR:
+        raise protocol.RequestError(protocol.decode(reply, payload)[0])
+    return protocol.decode(reply, payload)
+
+
+async def play_seat(host, port, seat, rounds, game, rng, latencies):
+    """Yksi paikka: HELLO, creditit kaikille kierroksille, sitten rounds kierrosta."""
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        await _call(reader, writer, protocol.HELLO, seat)
+        await _call(reader, writer, protocol.ADD, rounds * 100)
+        for _ in range(rounds):
+            kind = rng.choice(GAMES) if game == "mix" else game
+            t0 = time.perf_counter()
+            if kind == "poker":
+                await _call(reader, writer, protocol.DEAL, config.MIN_BET, 1)
+                await _call(reader, writer, protocol.DRAW, rng.randrange(32))
+            elif kind == "slot":
+                await _call(reader, writer, protocol.SPIN, GAME_SLOT, config.MIN_BET, 1)
+            else:
+                await _call(reader, writer, protocol.SPIN, GAME_LINES, config.MIN_BET, config.VIDEO_SLOT_LINES)
+            latencies.append(time.perf_counter() - t0)
+    finally:
+        writer.close()
+
+
+async def run(args):
+    latencies = []
+    rng = random.Random(args.seed)
+    tasks = [
+        play_seat(args.host, args.port, args.first_seat + i, args.rounds, args.game,
+                  random.Random(rng.getrandbits(64)), latencies)
+        for i in range(args.seats)
+    ]
+    t0 = time.perf_counter()
+    await asyncio.gather(*tasks)
+    return latencies, time.perf_counter() - t0
+
+
+def spawn_server(port, journal_path, data_dir=None):
+    """
+    Palvelin aliprosessina; odottaa kuuntelun alkamista. data_dir = paikkojen
+    credit-lokit (kuten tuotannossa), None = creditit vain muistissa.
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    persist = ["--no-persist"] if data_dir is None else ["--data", data_dir]
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "server", "--port", str(port), "--journal", journal_path] + persist,
+        cwd=root, stdout=subprocess.PIPE, text=True,
+    )
+    proc.stdout.readline()
+    return proc
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pelipalvelimen kuormitustesti")
+    parser.add_argument("--host", default=config.SERVER_HOST)
+    parser.add_argument("--port", type=int, default=config.SERVER_PORT)
+    parser.add_argument("--seats", type=int, default=100, help="samanaikaiset paikat")
+    parser.add_argument("--first-seat", type=int, default=1)
+    parser.add_argument("--rounds", type=int, default=100, help="kierroksia per paikka")
+    parser.add_argument("--game", choices=("mix",) + GAMES, default="mix")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--spawn", action="store_true",
+                        help="käynnistä oma palvelin (credit-lokit väliaikaiseen hakemistoon)")
+    parser.add_argument("--no-persist", action="store_true", help="käynnistetyllä palvelimella creditit vain muistissa")
+    parser.add_argument("--journal", default=None, help="käynnistetyn palvelimen päiväkirja (oletus: väliaikainen)")
+    args = parser.parse_args(argv)
+
+    proc = None
+    journal_path = args.journal
+    data_dir = None
+    if args.spawn:
+        if journal_path is None:
+            fd, journal_path = tempfile.mkstemp(suffix=".jnl")
+            os.close(fd)
+            os.remove(journal_path)
+        if not args.no_persist:
+            data_dir = tempfile.mkdtemp(prefix="loadtest_seats")
+        proc = spawn_server(args.port, journal_path, data_dir)
+    try:
+        latencies, elapsed = asyncio.run(run(args))
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait()
+            if args.journal is None:
+                os.remove(journal_path)
+            if data_dir is not None:
+                shutil.rmtree(data_dir, ignore_errors=True)
+
+    latencies.sort()
+    ms = [1000 * t for t in latencies]
+    print(f"{args.seats} paikkaa x {args.rounds} kierrosta ({args.game}): "
+          f"{len(ms)} kierrosta {elapsed:.2f} s, {len(ms) / elapsed:,.0f} kierrosta/s")
+    print(f"Kierroksen viive ms: p50 {percentile(ms, 50):.2f}  p95 {percentile(ms, 95):.2f}  "
+          f"p99 {percentile(ms, 99):.2f}  max {ms[-1] if ms else 0:.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""
+Kirjanpitomittarien tilannekuvan (meters.py) tulostus ja vienti.
+
+    python -m tools.meters                       # config.METERS_PATH
+    python -m tools.meters data/meters.snap --window hour
+    python -m tools.meters --json > mittarit.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config  # noqa: E402
+from journal import GAME_NAMES  # noqa: E402
+from meters import GAMES, METER_NAMES, RINGS, Meters  # noqa: E402
+
+WINDOW_NAMES = {None: "kaikki", "hour": "tunti", "day": "vuorokausi", "month": "30 päivää"}
+
+
+def _hold(meters, window, game=None):
+    hold = meters.hold_percent(window, game)
+    return "-" if hold is None else f"{hold:.2f} %"
+
+
+def describe(meters, window):
+    counters = meters.window(window)
+    lines = [f"Ikkuna: {WINDOW_NAMES[window]}, hold {_hold(meters, window)}, "
+             f"lisätyt creditit {meters.value('credits_in', window)}"]
+    for game in GAMES:
+        name = GAME_NAMES[game]
+        played = meters.value(f"{name}.games", window)
+        if not played:
+            continue
+        lines.append(f"  {name:<6} kierrokset {played}, coin-in {meters.value(f'{name}.coin_in', window)}, "
+                     f"coin-out {meters.value(f'{name}.coin_out', window)}, "
+                     f"jackpotit {meters.value(f'{name}.jackpot_out', window)}, hold {_hold(meters, window, game)}")
+        prefix = f"{name}.hit."
+        hits = [(meter[len(prefix):], counters[i]) for i, meter in enumerate(METER_NAMES) if meter.startswith(prefix)]
+        lines.append("         " + ", ".join(f"{hit} {count}" for hit, count in hits if count))
+    return "\n".join(lines)
+
+
+def export(meters):
+    """Kaikki ikkunat sanakirjana (JSON-vienti)."""
+    result = {"time": meters.clock(), "windows": {}}
+    for window in (None,) + tuple(name for name, _, _ in RINGS):
+        counters = meters.window(window)
+        result["windows"][window or "total"] = {
+            "hold_percent": meters.hold_percent(window),
+            "meters": {name: counters[i] for i, name in enumerate(METER_NAMES) if counters[i]},
+        }
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Kirjanpitomittarien tulostus ja vienti")
+    parser.add_argument("path", nargs="?", default=config.METERS_PATH)
+    parser.add_argument("--window", choices=[name for name, _, _ in RINGS], help="vain tämä ikkuna")
+    parser.add_argument("--json", action="store_true", help="kaikki ikkunat JSON-muodossa")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.path):
+        print(f"{args.path}: ei tilannekuvaa", file=sys.stderr)
+        return 1
+    meters = Meters(args.path)
+    if args.json:
+        json.dump(export(meters), sys.stdout, indent=2)
+        print()
+        return 0
+    saved = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(os.path.getmtime(args.path)))
+    print(f"{args.path} ({saved})")
+    windows = [args.window] if args.window else [None] + [name for name, _, _ in RINGS]
+    for window in windows:
+        print(describe(meters, window))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+"""
+Kierrospäiväkirjan toisto ja tarkistus ilman näyttöä.
+
+Jokainen kierros ajetaan uudelleen tallennetusta siemenestä samoilla
+säännöillä kuin pelissä (games.hand_eval, games.reels): pokerissa pakka
+sekoitetaan siemenellä, jaetaan viisi korttia ja vaihdetaan HOLD-maskin
+ulkopuoliset (moniläpelin lisäkädet: games.hand_eval.extra_hand);
+hedelmäpeleissä arvotaan pysähdyspaikat (games.reels, games.lines). Tulosta verrataan
+tallennettuihin kortteihin, pysähdyksiin ja voittoon. Jackpot-etueesta
+tarkistetaan, että laukaissut kierros todella antaa Royal Flushin tai 7-rivin
+(potin suuruutta ei voi laskea päiväkirjasta).
+
+    python -m tools.replay                      # koko data/rounds.jnl
+    python -m tools.replay --start 1000 --stop 2000 --show
+    python -m tools.replay muu.jnl --seq 4242 --show
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config  # noqa: E402
+from journal import GAME_JACKPOT, GAME_LINES, GAME_NAMES, GAME_POKER, GAME_SLOT, JournalReader  # noqa: E402
+from games import hand_eval, lines, reels  # noqa: E402
+
+
+def replay_poker(rnd, pays):
+    """(jaetut, lopulliset, käsiluokka, voitto) siemenestä, HOLD-maskista ja käden indeksistä."""
+    deck = hand_eval.make_deck_codes(random.Random(rnd.seed))
+    dealt = [deck.pop() for _ in range(5)]
+    if rnd.index:
+        final = hand_eval.extra_hand(rnd.seed, rnd.index, rnd.held, dealt, deck)
+    else:
+        final = [dealt[i] if rnd.held >> i & 1 else deck.pop() for i in range(5)]
+    code = hand_eval.eval_code(*final)
+    return tuple(dealt), tuple(final), code, rnd.bet * pays[code]
+
+
+def replay_slot(rnd):
+    """(pysähdykset, voitto) siemenestä."""
+    stops = reels.spin_stops(random.Random(rnd.seed))
+    return tuple(stops), reels.check_win(reels.stop_symbols(stops), rnd.bet)
+
+
+def replay_lines(rnd):
+    """(pysähdykset, voitto) siemenestä; held = linjojen määrä, panos = kokonaispanos."""
+    stops = lines.spin_stops(random.Random(rnd.seed))
+    return tuple(stops), lines.check_win(stops, rnd.bet // rnd.held, rnd.held)[0]
+
+
+def verify_jackpot(rnd):
+    """Jackpotin laukaisu: held = peli, index = käsi (pokeri) tai linjat."""
+    if rnd.held == GAME_POKER:
+        dealt = tuple(hand_eval.deal_codes(rnd.seed)[0])
+        problems = [] if dealt == rnd.dealt else [f"jaetut kortit {rnd.dealt} != {dealt}"]
+        if hand_eval.eval_code(*rnd.final) != hand_eval.HAND_CODES["Royal Flush"]:
+            problems.append("ei Royal Flush")
+        return problems
+    if rnd.held == GAME_SLOT:
+        stops = tuple(reels.spin_stops(random.Random(rnd.seed)))
+        hit = reels.is_jackpot(reels.stop_symbols(stops))
+    elif rnd.held == GAME_LINES and 1 <= rnd.index <= len(lines.PAYLINES):
+        stops = tuple(lines.spin_stops(random.Random(rnd.seed)))
+        hit = bool(lines.jackpot_lines(stops, rnd.index))
+    else:
+        return [f"tuntematon peli {rnd.held}"]
+    problems = [] if stops == rnd.stops else [f"pysähdykset {rnd.stops} != {stops}"]
+    if not hit:
+        problems.append("ei jackpot-riviä")
+    return problems
+
+
+def verify(rnd, pays):
+    """Lista ristiriidoista (tyhjä = kierros täsmää)."""
+    if not rnd.valid:
+        return ["tarkistussumma ei täsmää"]
+    if rnd.game == GAME_JACKPOT:
+        return verify_jackpot(rnd)
+    problems = []
+    if rnd.game == GAME_POKER:
+        dealt, final, code, win = replay_poker(rnd, pays)
+        if dealt != rnd.dealt:
+            problems.append(f"jaetut kortit {rnd.dealt} != {dealt}")
+        if final != rnd.final:
+            problems.append(f"lopulliset kortit {rnd.final} != {final}")
+        if code != rnd.hand:
+            problems.append(f"käsi {hand_eval.HAND_NAMES[rnd.hand]} != {hand_eval.HAND_NAMES[code]}")
+    elif rnd.game in (GAME_SLOT, GAME_LINES):
+        if rnd.game == GAME_SLOT:
+            stops, win = replay_slot(rnd)
+        elif 1 <= rnd.held <= len(lines.PAYLINES):
+            stops, win = replay_lines(rnd)
+        else:
+            return [f"linjoja {rnd.held}"]
+        if stops != rnd.stops:
+            problems.append(f"pysähdykset {rnd.stops} != {stops}")
+    else:
+        return [f"tuntematon peli {rnd.game}"]
+    if win != rnd.win:
+        problems.append(f"voitto {rnd.win} != {win}")
+    return problems
+
+
+def describe(rnd):
+    when = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(rnd.time))
+    head = f"#{rnd.seq} {when} {GAME_NAMES.get(rnd.game, rnd.game)} siemen={rnd.seed:016x} panos={rnd.bet} voitto={rnd.win}"
+    if rnd.seat:
+        head += f" paikka={rnd.seat}"
+    if rnd.game == GAME_POKER:
+        cards = " ".join(r + s for r, s in hand_eval.decode_cards(rnd.final))
+        held = "".join("H" if rnd.held >> i & 1 else "." for i in range(5))
+        hand = f" käsi {rnd.index + 1}" if rnd.index else ""
+        return f"{head}{hand} hold={held} {cards} {hand_eval.HAND_NAMES[rnd.hand] or '-'}"
+    if rnd.game == GAME_SLOT:
+        return f"{head} {' '.join(reels.stop_symbols(rnd.stops))}"
+    if rnd.game == GAME_LINES:
+        rows = zip(*lines.stop_window(rnd.stops))
+        return f"{head} linjat={rnd.held} " + " / ".join(" ".join(row) for row in rows)
+    if rnd.game == GAME_JACKPOT:
+        return f"{head} peli={GAME_NAMES.get(rnd.held, rnd.held)}"
+    return head
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Kierrospäiväkirjan toisto ja voittojen tarkistus")
+    parser.add_argument("path", nargs="?", default=config.JOURNAL_PATH)
+    parser.add_argument("--start", type=int, default=0, help="ensimmäinen etue (indeksi)")
+    parser.add_argument("--stop", type=int, default=None, help="viimeisen jälkeinen etue")
+    parser.add_argument("--seq", type=int, default=None, help="vain tämä kierros")
+    parser.add_argument("--show", action="store_true", help="tulosta kierrokset")
+    args = parser.parse_args(argv)
+
+    start, stop = args.start, args.stop
+    if args.seq is not None:
+        start, stop = args.seq, args.seq + 1
+    pays = hand_eval.pay_multipliers()
+    checked = mismatches = 0
+    bets = wins = 0
+    t0 = time.perf_counter()
+    with JournalReader(args.path) as reader:
+        for rnd in reader.rounds(start, stop):
+            problems = verify(rnd, pays)
+            checked += 1
+            bets += rnd.bet
+            wins += rnd.win
+            if args.show or problems:
+                print(describe(rnd))
+            for problem in problems:
+                print(f"  RISTIRIITA: {problem}")
+            mismatches += bool(problems)
+    elapsed = time.perf_counter() - t0
+    print(f"Kierroksia {checked}, ristiriitoja {mismatches}, panokset {bets}, voitot {wins}"
+          f" ({checked / elapsed if elapsed else 0:,.0f} kierrosta/s)")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
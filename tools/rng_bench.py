@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""
+Satunnaislukupalvelun (rng.py) läpäisymittaus ja terveystestien ajo.
+
+Vertaa samoja operaatioita globaalilla random-moduulilla (aiempi tapa) ja
+RNG-virralla: 64-bittinen siemen, pakan sekoitus, rullien pysähdykset,
+randrange ja random(). Lisäksi --health N jakaa N kättä ja pyöräyttää N
+kertaa molempia rullastoja terveystestien läpi; --bias syöttää korttitestiin
+tarkoituksella vinon jakauman (modulo 2**8 % 52) ja tarkistaa, että hälytys tulee.
+
+    python -m tools.rng_bench
+    python -m tools.rng_bench --calls 200000 --health 100000
+    python -m tools.rng_bench --health 20000 --bias
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from games import hand_eval, lines, reels  # noqa: E402
+from rng import RngService  # noqa: E402
+
+
+def _rate(fn, calls, repeat=3):
+    """Paras `repeat` ajosta, kutsua sekunnissa (fn tekee `calls` kutsua)."""
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    return calls / best
+
+
+def throughput(calls, seed):
+    service = RngService(seed=seed)
+    stream = service.stream("bench")
+    random.seed(seed)
+    deck = list(range(52))
+    cases = [
+        ("getrandbits(64)", lambda rng: [rng.getrandbits(64) for _ in range(calls)], calls),
+        ("shuffle(52)", lambda rng: [rng.shuffle(deck) for _ in range(calls // 50)], calls // 50),
+        ("reels.spin_stops", lambda rng: [reels.spin_stops(rng) for _ in range(calls // 5)], calls // 5),
+        ("lines.spin_stops", lambda rng: [lines.spin_stops(rng) for _ in range(calls // 5)], calls // 5),
+        ("randrange(52)", lambda rng: [rng.randrange(52) for _ in range(calls)], calls),
+        ("random()", lambda rng: [rng.random() for _ in range(calls)], calls),
+    ]
+    print(f"{'operaatio':<18}{'random/s':>14}{'RNG/s':>14}{'suhde':>8}")
+    for name, fn, n in cases:
+        base = _rate(lambda: fn(random), n)
+        ours = _rate(lambda: fn(stream), n)
+        print(f"{name:<18}{base:>14,.0f}{ours:>14,.0f}{ours / base:>8.2f}")
+    print(f"randbelow (Lemire) {_rate(lambda: [stream.randbelow(52) for _ in range(calls)], calls):,.0f}/s; "
+          f"puskureita {service.refills} taustalla / {service.misses} heti")
+
+
+def health(rounds, seed, bias):
+    service = RngService(seed=seed)
+    monitor = service.health
+    stream = service.stream("health")
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        if bias:
+            monitor.observe_cards([stream.getrandbits(8) % 52 for _ in range(5)])
+        else:
+            monitor.observe_cards(hand_eval.deal_codes(stream.getrandbits(64))[0])
+        monitor.observe_stops("slot", reels.REELS, reels.spin_stops(stream))
+        monitor.observe_stops("lines", lines.LINE_REELS, lines.spin_stops(stream))
+    elapsed = time.perf_counter() - t0
+    print(f"{rounds} kierrosta {elapsed:.1f} s")
+    for test in monitor.tests():
+        last = f"{test.last:.1f}" if test.last is not None else "-"
+        print(f"  {test.name:<8} testejä {test.tests:>4}, hylättyjä {test.failures}, "
+              f"viimeisin {last} (raja {test.critical:.1f}, df {test.df})")
+    return len(monitor.alarms)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="RNG-palvelun läpäisymittaus ja terveystestit")
+    parser.add_argument("--calls", type=int, default=100000)
+    parser.add_argument("--health", type=int, default=0, help="kierroksia terveystestien läpi")
+    parser.add_argument("--bias", action="store_true", help="vino korttijakauma (hälytyksen tarkistus)")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    if args.calls:
+        throughput(args.calls, args.seed)
+    if args.health:
+        alarms = health(args.health, args.seed, args.bias)
+        if args.bias:
+            return 0 if alarms else 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,213 @@
+# -*- coding: utf-8 -*-
+"""
+Pelien palautusprosentin (RTP) Monte Carlo -simulointi ilman näyttöä.
+
+Käyttää samoja sääntöjä kuin pelit (games.hand_eval, games.reels, games.lines) ja jakaa
+kierrokset prosesseille; jokaisella työerällä on oma siemenestä johdettu
+satunnaislukuvirta, joten sama --seed antaa saman tuloksen.
+
+    python -m games.strategy --best-masks      # kerran: pokerin optimistrategian maskitaulukko
+    python -m tools.simulate poker --rounds 10000000
+    python -m tools.simulate slot --rounds 100000000 --workers 4
+    python -m tools.simulate lines --rounds 10000000 --lines 50
+"""
+
+import argparse
+import math
+import multiprocessing
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from games import hand_eval, lines, reels  # noqa: E402
+
+# Kierroksia per työerä ja per eräarviointi
+TASK_ROUNDS = 1_000_000
+CHUNK = 10_000
+
+
+class Stats:
+    """Yhdistettävät summat: n, Σx, Σx², osumat (x = voitto / panos)."""
+
+    def __init__(self):
+        self.n = 0
+        self.total = 0
+        self.total_sq = 0
+        self.hits = 0
+
+    def add(self, other):
+        self.n += other.n
+        self.total += other.total
+        self.total_sq += other.total_sq
+        self.hits += other.hits
+
+    @property
+    def rtp(self):
+        return self.total / self.n if self.n else 0.0
+
+    @property
+    def variance(self):
+        if self.n < 2:
+            return 0.0
+        mean = self.rtp
+        return (self.total_sq - self.n * mean * mean) / (self.n - 1)
+
+    def confidence(self, z=1.96):
+        """RTP:n luottamusväli (oletus 95 %)."""
+        half = z * math.sqrt(self.variance / self.n) if self.n else 0.0
+        return self.rtp - half, self.rtp + half
+
+
+def _rng(seed, game, task):
+    # Merkkijonosiemen hajautetaan SHA-512:lla -> toisistaan riippumattomat virrat
+    return random.Random(f"{seed}:{game}:{task}")
+
+
+def _poker_task(args):
+    seed, task, rounds, strategy_name = args
+    rng = _rng(seed, "poker", task)
+    pays = hand_eval.pay_multipliers()
+    eval_hands = hand_eval.eval_hands
+    stats = Stats()
+    masks = None
+    if strategy_name == "optimal":
+        from games import strategy
+        masks = strategy.load_best_masks()
+        if masks is None:
+            raise SystemExit("Maskitaulukko puuttuu: aja python -m games.strategy --best-masks")
+        lookup = strategy.lookup_best_mask
+    full_deck = list(range(52))
+    done = 0
+    while done < rounds:
+        n = min(CHUNK, rounds - done)
+        finals = []
+        for _ in range(n):
+            # Kuten pelissä: 5 korttia jakoon, vaihdot seuraavista. Koko pakan
+            # sekoitus on tarpeeton; 10 kortin otos on jakaumaltaan sama.
+            cards = rng.sample(full_deck, 10)
+            hand = cards[:5]
+            if masks is not None:
+                mask = lookup(masks, hand)
+                draw = 5
+                for i in range(5):
+                    if not mask >> i & 1:
+                        hand[i] = cards[draw]
+                        draw += 1
+            elif strategy_name == "discard":
+                hand = cards[5:]
+            finals.append(hand)
+        for code in eval_hands(finals):
+            x = pays[code]
+            if x:
+                stats.hits += 1
+                stats.total += x
+                stats.total_sq += x * x
+        stats.n += n
+        done += n
+    return stats
+
+
+def _slot_task(args):
+    seed, task, rounds, _ = args
+    rng = _rng(seed, "slot", task)
+    check_win = reels.check_win
+    stats = Stats()
+    done = 0
+    while done < rounds:
+        n = min(CHUNK, rounds - done)
+        # Sama painotettu arvonta kuin WeightedReel.sample, rulla kerrallaan
+        columns = [rng.choices(reel.symbols, cum_weights=reel.cum_weights, k=n) for reel in reels.REELS]
+        for spin in zip(*columns):
+            x = check_win(spin, 1)
+            if x:
+                stats.hits += 1
+                stats.total += x
+                stats.total_sq += x * x
+        stats.n += n
+        done += n
+    return stats
+
+
+def _lines_task(args):
+    seed, task, rounds, line_count = args
+    rng = _rng(seed, "lines", task)
+    stats = Stats()
+    done = 0
+    while done < rounds:
+        n = min(CHUNK, rounds - done)
+        # Pysähdykset rulla kerrallaan, arviointi erässä (sama taulukko kuin pelissä)
+        columns = [rng.choices(range(len(reel)), cum_weights=reel.cum_weights, k=n) for reel in lines.LINE_REELS]
+        for m in lines.eval_spins(columns, line_count):
+            if m:
+                x = m / line_count
+                stats.hits += 1
+                stats.total += x
+                stats.total_sq += x * x
+        stats.n += n
+        done += n
+    return stats
+
+
+TASKS = {"poker": _poker_task, "slot": _slot_task, "lines": _lines_task}
+
+
+def simulate(game, rounds, seed=1, workers=None, strategy="optimal", line_count=20):
+    """Ajaa kierrokset rinnakkain ja palauttaa yhdistetyt Stats."""
+    workers = workers or os.cpu_count() or 1
+    # Vähintään muutama erä per prosessi, jotta kuorma tasaantuu
+    task_rounds = max(1, min(TASK_ROUNDS, -(-rounds // (workers * 4))))
+    tasks = []
+    task = 0
+    left = rounds
+    while left > 0:
+        n = min(task_rounds, left)
+        tasks.append((seed, task, n, line_count if game == "lines" else strategy))
+        task += 1
+        left -= n
+    stats = Stats()
+    if workers == 1 or len(tasks) == 1:
+        for t in tasks:
+            stats.add(TASKS[game](t))
+    else:
+        with multiprocessing.Pool(min(workers, len(tasks))) as pool:
+            for part in pool.imap_unordered(TASKS[game], tasks):
+                stats.add(part)
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pelien RTP-simulointi")
+    parser.add_argument("game", choices=sorted(TASKS))
+    parser.add_argument("--rounds", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--workers", type=int, default=0, help="prosessit (0 = kaikki ytimet)")
+    parser.add_argument("--strategy", choices=["optimal", "stand", "discard"], default="optimal",
+                        help="pokerin HOLD-strategia: optimaalinen (maskitaulukosta), pidä kaikki tai vaihda kaikki")
+    parser.add_argument("--lines", type=int, default=20, choices=range(1, lines.MAX_LINES + 1),
+                        metavar=f"1-{lines.MAX_LINES}", help="videoslotin linjat")
+    args = parser.parse_args(argv)
+
+    t0 = time.perf_counter()
+    stats = simulate(args.game, args.rounds, args.seed, args.workers or None, args.strategy, args.lines)
+    elapsed = time.perf_counter() - t0
+    lo, hi = stats.confidence()
+    detail = {"poker": f" ({args.strategy})", "lines": f" ({args.lines} linjaa)"}.get(args.game, "")
+    print(f"Peli:           {args.game}{detail}")
+    print(f"Kierroksia:     {stats.n}")
+    print(f"RTP:            {stats.rtp * 100:.4f} %  (95 % LV {lo * 100:.4f} – {hi * 100:.4f} %)")
+    print(f"Osumatiheys:    {stats.hits / stats.n * 100:.4f} %")
+    print(f"Varianssi:      {stats.variance:.4f}  (keskihajonta {math.sqrt(stats.variance):.4f})")
+    if args.game == "slot":
+        exact = reels.reel_stats()
+        print(f"Tarkka RTP:     {exact['rtp'] * 100:.4f} %  (osumatiheys {exact['hit_rate'] * 100:.4f} %)")
+    elif args.game == "lines":
+        exact = lines.line_stats(args.lines)
+        print(f"Tarkka RTP:     {exact['rtp'] * 100:.4f} %  (scatter {exact['scatter_rtp'] * 100:.4f} %)")
+    print(f"Aika:           {elapsed:.2f} s  ({stats.n / elapsed:,.0f} kierrosta/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,11 +3,24 @@
 
 import pygame
 import sys
+from collections import OrderedDict
 
 import config
 
 
+# Näyttöpinta, kun kohtaus piirretään erilliseen matalan resoluution kohteeseen (PIXEL_SCALE > 1)
+_DISPLAY = None
+# Hiiren sijaintia kantavat tapahtumat (sijainti näytön pikseleinä)
+_POS_EVENTS = (pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP, pygame.MOUSEMOTION)
+
+
 def init_display():
+    """
+    Palauttaa piirtokohteen (SCENE_WIDTH x SCENE_HEIGHT). Näyttötila on aina
+    SCREEN_WIDTH x SCREEN_HEIGHT; PIXEL_SCALE > 1: kohde on PIXEL_SCALE kertaa
+    pienempi ja skaalataan näytölle (present) lähimmän naapurin menetelmällä.
+    """
+    global _DISPLAY
     import os
     if sys.platform == "linux" and os.path.exists("/dev/fb0"):
         try:
@@ -16,99 +29,527 @@ def init_display():
         except Exception:
             pass
     pygame.display.init()
+    size = (config.SCREEN_WIDTH, config.SCREEN_HEIGHT)
     if config.FULLSCREEN:
         flags = pygame.FULLSCREEN | pygame.HWSURFACE | pygame.DOUBLEBUF
-        screen = pygame.display.set_mode((config.SCREEN_WIDTH, config.SCREEN_HEIGHT), flags)
+        screen = pygame.display.set_mode(size, flags)
     else:
-        screen = pygame.display.set_mode((config.SCREEN_WIDTH, config.SCREEN_HEIGHT))
+        screen = pygame.display.set_mode(size)
     pygame.display.set_caption("Retro Uhkapeli")
     pygame.mouse.set_visible(True)
-    return screen
+    if config.PIXEL_SCALE <= 1:
+        _DISPLAY = None
+        return screen
+    _DISPLAY = screen
+    return pygame.Surface((config.SCENE_WIDTH, config.SCENE_HEIGHT)).convert()
+
+
+def present(target, rects=None):
+    """
+    Piirtokohde näytölle: rects = muuttuneet alueet kohteen koordinaateissa
+    (None = koko ruutu). PIXEL_SCALE > 1: alueet skaalataan näyttöpinnalle.
+    """
+    if _DISPLAY is None:
+        if rects is None:
+            pygame.display.flip()
+        elif rects:
+            pygame.display.update(rects)
+        return
+    scale = _DISPLAY.get_width() // target.get_width()
+    if rects is None:
+        pygame.transform.scale(target, _DISPLAY.get_size(), _DISPLAY)
+        pygame.display.flip()
+        return
+    bounds = target.get_rect()
+    scaled = []
+    for rect in rects:
+        rect = rect.clip(bounds)
+        if not rect.w or not rect.h:
+            continue
+        dest = pygame.Rect(rect.x * scale, rect.y * scale, rect.w * scale, rect.h * scale)
+        pygame.transform.scale(target.subsurface(rect), dest.size, _DISPLAY.subsurface(dest))
+        scaled.append(dest)
+    if scaled:
+        pygame.display.update(scaled)
+
+
+def scene_event(event):
+    """Hiiritapahtuman sijainti näytön pikseleistä piirtokohteen koordinaatteihin."""
+    if _DISPLAY is None or event.type not in _POS_EVENTS:
+        return event
+    scale = config.PIXEL_SCALE
+    fields = dict(event.dict, pos=(event.pos[0] // scale, event.pos[1] // scale))
+    if "rel" in fields:
+        fields["rel"] = (event.rel[0] // scale, event.rel[1] // scale)
+    return pygame.event.Event(event.type, fields)
+
+
+def get_mouse_pos():
+    """pygame.mouse.get_pos() piirtokohteen koordinaateissa."""
+    x, y = pygame.mouse.get_pos()
+    if _DISPLAY is None:
+        return x, y
+    return x // config.PIXEL_SCALE, y // config.PIXEL_SCALE
+
+
+def px(value):
+    """Asettelun mitta (natiiviresoluution 800x480 pikseleinä) kohtauksen pikseleiksi."""
+    scaled = value // config.PIXEL_SCALE
+    # Ohuet reunat ja pienet välit eivät katoa kokonaan
+    return max(scaled, 1) if value > 0 else scaled
 
 
 def get_fonts():
     pygame.font.init()
     return {
-        "title": pygame.font.Font(None, config.FONT_SIZE_TITLE),
-        "menu": pygame.font.Font(None, config.FONT_SIZE_MENU),
-        "normal": pygame.font.Font(None, config.FONT_SIZE_NORMAL),
-        "small": pygame.font.Font(None, config.FONT_SIZE_SMALL),
+        "title": pygame.font.Font(None, px(config.FONT_SIZE_TITLE)),
+        "menu": pygame.font.Font(None, px(config.FONT_SIZE_MENU)),
+        "normal": pygame.font.Font(None, px(config.FONT_SIZE_NORMAL)),
+        "small": pygame.font.Font(None, px(config.FONT_SIZE_SMALL)),
     }
 
 
-def _scale_surface(surf, scale):
-    if scale <= 1:
-        return surf
-    w, h = surf.get_size()
-    return pygame.transform.scale(surf, (w * scale, h * scale))
+# Renderöityjen tekstien (ja valmiiden nappien) LRU-välimuisti:
+# (fontti, teksti, väri) tai ("button", ...) -> Surface.
+# Palautettuja pintoja ei saa muokata, vain blitata.
+_TEXT_CACHE = OrderedDict()
+_TEXT_CACHE_STATS = {"hits": 0, "misses": 0, "evictions": 0, "bytes": 0}
+
+
+def render_text(font, text, color):
+    """font.render() välimuistin kautta."""
+    key = (font, text, tuple(color))
+    img = _TEXT_CACHE.get(key)
+    if img is not None:
+        _TEXT_CACHE.move_to_end(key)
+        _TEXT_CACHE_STATS["hits"] += 1
+        return img
+    _TEXT_CACHE_STATS["misses"] += 1
+    return _text_cache_put(key, font.render(text, True, color))
+
+
+def _text_cache_put(key, img):
+    size = img.get_width() * img.get_height() * img.get_bytesize()
+    if size > config.TEXT_CACHE_MAX_BYTES:
+        return img
+    _TEXT_CACHE[key] = img
+    _TEXT_CACHE_STATS["bytes"] += size
+    while _TEXT_CACHE_STATS["bytes"] > config.TEXT_CACHE_MAX_BYTES:
+        _, old = _TEXT_CACHE.popitem(last=False)
+        _TEXT_CACHE_STATS["bytes"] -= old.get_width() * old.get_height() * old.get_bytesize()
+        _TEXT_CACHE_STATS["evictions"] += 1
+    return img
+
+
+def text_cache_stats():
+    """Osumat, ohitukset, poistot, tavut ja merkintöjen määrä."""
+    return dict(_TEXT_CACHE_STATS, entries=len(_TEXT_CACHE))
+
+
+# Piirtolistan kerrokset: pienin numero alimmaisena, saman kerroksen
+# piirrot lisäysjärjestyksessä
+LAYER_SPRITES = 10
+LAYER_MOVING = 20
+
+# Aktiivinen piirtolista (DrawList.begin .. flush) tai None
+_DRAW_LIST = None
+# Yksiväriset pinnat täyttöjä varten: (väri, leveys, korkeus) -> Surface
+_SOLID_CACHE = {}
+_SOLID_CACHE_MAX = 256
+
+
+def _solid(color, width, height):
+    key = (tuple(color), width, height)
+    surf = _SOLID_CACHE.get(key)
+    if surf is None:
+        if len(_SOLID_CACHE) >= _SOLID_CACHE_MAX:
+            _SOLID_CACHE.clear()
+        surf = pygame.Surface((width, height))
+        if pygame.display.get_surface() is not None:
+            surf = surf.convert()
+        surf.fill(color)
+        _SOLID_CACHE[key] = surf
+    return surf
+
 
+def _opaque(source):
+    """Peittääkö pinta kaiken alleen (ei alfaa, läpinäkyvyyttä eikä väriavainta)."""
+    return (not source.get_flags() & pygame.SRCALPHA and source.get_alpha() is None
+            and source.get_colorkey() is None)
 
-def draw_text(surface, text, x, y, font, color=config.COLOR_TEXT, center=False, pixel_scale=None):
-    if pixel_scale is None:
-        pixel_scale = config.PIXEL_SCALE
-    img = font.render(str(text), True, color)
-    if pixel_scale > 1:
-        img = _scale_surface(img, pixel_scale)
+
+class _Call:
+    """Piirtolistan muu kuin blit-piirto: fn(kohde, *args)."""
+    __slots__ = ("fn", "args")
+
+    def __init__(self, fn, args):
+        self.fn = fn
+        self.args = args
+
+
+class DrawList:
+    """
+    Ruudun piirtolista. begin() ja flush() välissä piirtoapufunktiot
+    (draw_text, draw_button, queue_blit, fill_rect, draw_call) lisäävät
+    kohteeseen menevät piirrot listaan sen sijaan, että piirtäisivät heti,
+    ja flush() vie ne kerrosjärjestyksessä yhdellä Surface.blits()-kutsulla
+    (draw_call-piirto jakaa erän kahtia). Täytetyt suorakulmiot ovat
+    yksivärisiä pintoja.
+
+    Kokonaan leikkausalueen ulkopuoliset piirrot jätetään pois lisättäessä.
+    Kun listaan lisätään läpinäkymätön, vähintään DRAW_OCCLUDER_MIN_AREA
+    kokoinen piirto (kortin selkä, rullanauha, palkki), sen alle kokonaan
+    jäävät aiemmat piirrot poistetaan. config.DRAW_LIST = False: piirrot
+    suoraan kuten ennen.
+    """
+
+    def __init__(self, target):
+        self.target = target
+        self._layers = {}  # kerros -> (piirrot, alueet (x, y, x2, y2) tai None)
+        self._layer = LAYER_SPRITES
+        self._items = self._bounds = None
+        self._clip = (0, 0, 0, 0)
+        self._min_area = 0
+        self._calls = 0
+        # Viimeisimmän ruudun tilastot
+        self.items = 0
+        self.culled = 0
+        self.batches = 0
+
+    @property
+    def layer(self):
+        """Kerros, johon seuraavat piirrot lisätään."""
+        return self._layer
+
+    @layer.setter
+    def layer(self, layer):
+        self._layer = layer
+        lists = self._layers.get(layer)
+        if lists is None:
+            lists = self._layers[layer] = ([], [])
+        self._items, self._bounds = lists
+
+    def begin(self, layer=LAYER_SPRITES):
+        """Tyhjä lista käyttöön (ellei config.DRAW_LIST ole pois)."""
+        global _DRAW_LIST
+        self._layers = {}
+        self.layer = layer
+        clip = self.target.get_clip()
+        self._clip = (clip.x, clip.y, clip.right, clip.bottom)
+        self._min_area = config.DRAW_OCCLUDER_MIN_AREA
+        self._calls = 0
+        self.items = self.culled = self.batches = 0
+        if config.DRAW_LIST:
+            _DRAW_LIST = self
+        return self
+
+    def blit(self, source, dest, area=None, opaque=None):
+        """source kohtaan dest (area = lähteen osa); opaque=None: päätellään pinnasta."""
+        x, y = dest[0], dest[1]
+        if area is None:
+            w, h = source.get_size()
+            item = (source, dest)
+        else:
+            w, h = area[2], area[3]
+            item = (source, dest, area)
+        x2 = x + w
+        y2 = y + h
+        cx, cy, cx2, cy2 = self._clip
+        if x >= cx2 or y >= cy2 or x2 <= cx or y2 <= cy:
+            self.culled += 1
+            return
+        if w * h >= self._min_area and (_opaque(source) if opaque is None else opaque):
+            self._occlude(x, y, x2, y2)
+        self._items.append(item)
+        self._bounds.append((x, y, x2, y2))
+
+    def fill(self, color, rect, width=0):
+        """pygame.draw.rect yksivärisinä pintoina (width > 0: reunus rectin sisäpuolella)."""
+        x, y, w, h = rect
+        if width <= 0 or 2 * width >= min(w, h):
+            if w > 0 and h > 0:
+                self.blit(_solid(color, w, h), (x, y), opaque=True)
+            return
+        # Reunus: ylä- ja alareuna koko leveydeltä, sivut niiden välissä
+        across = _solid(color, w, width)
+        self.blit(across, (x, y), opaque=True)
+        self.blit(across, (x, y + h - width), opaque=True)
+        if h > 2 * width:
+            side = _solid(color, width, h - 2 * width)
+            self.blit(side, (x, y + width), opaque=True)
+            self.blit(side, (x + w - width, y + width), opaque=True)
+
+    def call(self, fn, *args, rect=None):
+        """Muu piirto fn(kohde, *args) oikeassa järjestyksessä; rect = piirron alue (karsintaan)."""
+        if rect is not None:
+            x, y, w, h = rect
+            cx, cy, cx2, cy2 = self._clip
+            if x >= cx2 or y >= cy2 or x + w <= cx or y + h <= cy:
+                self.culled += 1
+                return
+            rect = (x, y, x + w, y + h)
+        self._items.append(_Call(fn, args))
+        self._bounds.append(rect)
+        self._calls += 1
+
+    def _occlude(self, x, y, x2, y2):
+        """Poistaa aiemmat (tämän ja alempien kerrosten) piirrot, jotka jäävät kokonaan alueen alle."""
+        for layer, (items, bounds) in self._layers.items():
+            if layer > self._layer:
+                continue
+            for i, b in enumerate(bounds):
+                if b is not None and b[0] >= x and b[1] >= y and b[2] <= x2 and b[3] <= y2:
+                    items[i] = None
+                    bounds[i] = None
+                    self.culled += 1
+
+    def flush(self):
+        """Piirtää listan kohteeseen ja poistaa sen käytöstä."""
+        global _DRAW_LIST
+        if _DRAW_LIST is self:
+            _DRAW_LIST = None
+        items = []
+        for layer in sorted(self._layers):
+            items.extend(self._layers[layer][0])
+        self._layers = {}
+        self._items = self._bounds = None
+        if self.culled:
+            items = [item for item in items if item is not None]
+        self.items = len(items) + self.culled
+        if not items:
+            return
+        if not self._calls:
+            self.target.blits(items, doreturn=False)
+            self.batches = 1
+            return
+        batch = []
+        for item in items:
+            if type(item) is not _Call:
+                batch.append(item)
+                continue
+            if batch:
+                self.target.blits(batch, doreturn=False)
+                self.batches += 1
+                batch = []
+            item.fn(self.target, *item.args)
+        if batch:
+            self.target.blits(batch, doreturn=False)
+            self.batches += 1
+
+
+def queue_blit(surface, source, dest, area=None):
+    """surface.blit piirtolistan kautta (jos lista on käytössä kohteelle)."""
+    draws = _DRAW_LIST
+    if draws is not None and draws.target is surface:
+        draws.blit(source, dest, area)
+    else:
+        surface.blit(source, dest, area)
+
+
+def fill_rect(surface, color, rect, width=0):
+    """pygame.draw.rect piirtolistan kautta (jos lista on käytössä kohteelle)."""
+    draws = _DRAW_LIST
+    if draws is not None and draws.target is surface:
+        draws.fill(color, rect, width)
+    else:
+        pygame.draw.rect(surface, color, rect, width)
+
+
+def draw_call(surface, fn, *args, rect=None):
+    """Muu piirto fn(surface, *args): piirtolistaan oikeaan kohtaan tai heti."""
+    draws = _DRAW_LIST
+    if draws is not None and draws.target is surface:
+        draws.call(fn, *args, rect=rect)
+    else:
+        fn(surface, *args)
+
+
+def draw_text(surface, text, x, y, font, color=config.COLOR_TEXT, center=False):
+    img = render_text(font, str(text), color)
     if center:
         x -= img.get_width() // 2
-    surface.blit(img, (x, y))
+    queue_blit(surface, img, (x, y))
     return img.get_rect(topleft=(x, y))
 
 
+def render_button(size, text, font, color, border_col, border, text_color=config.COLOR_TEXT):
+    """
+    Napin pohja, reunus ja keskitetty teksti yhdeksi pinnaksi (tekstien
+    välimuistissa), jolloin nappi piirretään yhdellä blitillä. None jos
+    teksti ei mahdu nappiin.
+    """
+    key = ("button", tuple(size), text, font, tuple(color), tuple(border_col), border, tuple(text_color))
+    img = _TEXT_CACHE.get(key)
+    if img is not None:
+        _TEXT_CACHE.move_to_end(key)
+        _TEXT_CACHE_STATS["hits"] += 1
+        return img
+    label = render_text(font, text, text_color)
+    w, h = size
+    if label.get_width() > w or label.get_height() > h:
+        return None
+    _TEXT_CACHE_STATS["misses"] += 1
+    img = pygame.Surface((w, h))
+    if pygame.display.get_surface() is not None:
+        img = img.convert()
+    img.fill(color)
+    pygame.draw.rect(img, border_col, (0, 0, w, h), border)
+    img.blit(label, (w // 2 - label.get_width() // 2, h // 2 - label.get_height() // 2))
+    return _text_cache_put(key, img)
+
+
+def _draw_button(surface, rect, text, font, color, border_col, border):
+    img = render_button(rect.size, text, font, color, border_col, border)
+    if img is not None:
+        queue_blit(surface, img, rect.topleft)
+        return rect
+    # Teksti nappia leveämpi: osat erikseen (teksti saa ylittää reunan)
+    fill_rect(surface, color, rect)
+    fill_rect(surface, border_col, rect, border)
+    img = render_text(font, text, config.COLOR_TEXT)
+    cx = rect.centerx - img.get_width() // 2
+    cy = rect.centery - img.get_height() // 2
+    queue_blit(surface, img, (cx, cy))
+    return rect
+
+
 def draw_button(surface, rect, text, font, hover=False, style="green"):
     """style: 'green' (DEAL/HOLD) tai 'grey' (ADD COIN, Takaisin)."""
     if style == "green":
         color = config.COLOR_BUTTON_GREEN_HOVER if hover else config.COLOR_BUTTON_GREEN
-        text_color = config.COLOR_TEXT
     else:
         color = config.COLOR_BUTTON_GREY_HOVER if hover else config.COLOR_BUTTON_GREY
-        text_color = config.COLOR_TEXT
-    pygame.draw.rect(surface, color, rect)
-    pygame.draw.rect(surface, config.COLOR_BORDER, rect, 2)
-    img = font.render(str(text), True, text_color)
-    img = _scale_surface(img, config.PIXEL_SCALE)
-    cx = rect.centerx - img.get_width() // 2
-    cy = rect.centery - img.get_height() // 2
-    surface.blit(img, (cx, cy))
-    return rect
+    return _draw_button(surface, rect, str(text), font, color, config.COLOR_BORDER, px(2))
 
 
 def draw_button_hold(surface, rect, text, font, active=False, hover=False):
     """HOLD-nappi: vihreä, keltainen reuna kun aktiivinen."""
     color = config.COLOR_BUTTON_GREEN_HOVER if hover else config.COLOR_BUTTON_GREEN
-    pygame.draw.rect(surface, color, rect)
     border_col = config.COLOR_CARD_HELD if active else config.COLOR_BORDER
-    pygame.draw.rect(surface, border_col, rect, 3)
-    img = font.render(str(text), True, config.COLOR_TEXT)
-    img = _scale_surface(img, config.PIXEL_SCALE)
-    cx = rect.centerx - img.get_width() // 2
-    cy = rect.centery - img.get_height() // 2
-    surface.blit(img, (cx, cy))
-    return rect
+    return _draw_button(surface, rect, str(text), font, color, border_col, px(3))
 
 
-def draw_credits_bar(surface, credits, fonts):
-    """Yläpalkki: tumma, CASH keltainen."""
-    h = 44
-    pygame.draw.rect(surface, config.COLOR_BG, (0, 0, config.SCREEN_WIDTH, h))
-    pygame.draw.line(surface, config.COLOR_BORDER, (0, h), (config.SCREEN_WIDTH, h), 2)
-    draw_text(surface, f"CASH  {credits}", 24, 10, fonts["normal"], config.COLOR_TEXT_YELLOW, pixel_scale=config.PIXEL_SCALE)
+CREDITS_BAR_HEIGHT = px(44)
+
+
+def draw_credits_bar(surface, credits, fonts, jackpot=None):
+    """Yläpalkki: tumma, CASH keltainen; jackpot = progressiivisen potin creditit oikealla (None = ei pottia)."""
+    h = CREDITS_BAR_HEIGHT
+    fill_rect(surface, config.COLOR_BG, (0, 0, config.SCENE_WIDTH, h))
+    fill_rect(surface, config.COLOR_BORDER, (0, h, config.SCENE_WIDTH, px(2)))
+    draw_text(surface, f"CASH  {credits}", px(24), px(10), fonts["normal"], config.COLOR_TEXT_YELLOW)
+    if jackpot is not None:
+        img = render_text(fonts["normal"], f"JACKPOT  {jackpot}", config.COLOR_WIN)
+        queue_blit(surface, img, (config.SCENE_WIDTH - px(24) - img.get_width(), px(10)))
     return h
 
 
 def draw_cash_big(surface, credits, fonts, center_x, y):
     """Iso keltainen CASH-näyttö (pelin alaosa)."""
     text = f"CASH  {credits}"
-    draw_text(surface, text, center_x, y, fonts["title"], config.COLOR_TEXT_YELLOW, center=True)
+    return draw_text(surface, text, center_x, y, fonts["title"], config.COLOR_TEXT_YELLOW, center=True)
+
+
+# Staattiset kerrokset: nimi -> (avain, Surface). Kerros renderöidään
+# uudelleen vain kun sen avain (syötteet: panos, resoluutio, alpha...) muuttuu.
+_LAYER_CACHE = {}
+
+
+def get_layer(name, key, render):
+    """Palauttaa kerroksen `name` välimuistista tai renderöi sen render()-kutsulla."""
+    cached = _LAYER_CACHE.get(name)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    surf = render()
+    _LAYER_CACHE[name] = (key, surf)
+    return surf
+
+
+def blit_layer(surface, name, key, render, pos=(0, 0)):
+    queue_blit(surface, get_layer(name, key, render), pos)
+
+
+def clear_layers():
+    _LAYER_CACHE.clear()
+
+
+def background_layer(size, game_left=0, title=None, fonts=None, title_y=0):
+    """Kehys + sininen pelialue (+ keltainen otsikko) yhtenä pintana."""
+    surf = pygame.Surface(size).convert()
+    surf.fill(config.COLOR_BG)
+    pygame.draw.rect(surf, config.COLOR_SCREEN_BLUE, (game_left, 0, size[0] - game_left, size[1]))
+    if title:
+        draw_text(surf, title, size[0] // 2, title_y, fonts["title"], config.COLOR_TEXT_YELLOW, center=True)
+    return surf
+
+
+def _render_scanlines(size, alpha):
+    w, h = size
+    sl = pygame.Surface((w, h))
+    sl.set_alpha(alpha)
+    for y in range(0, h, 4):
+        pygame.draw.line(sl, (0, 0, 0), (0, y), (w, y), 1)
+    return sl
+
 
 def draw_scanlines(surface, alpha=None):
     if alpha is None:
         alpha = config.SCANLINE_ALPHA
     if alpha <= 0:
         return
-    w, h = surface.get_size()
-    sl = pygame.Surface((w, h))
-    sl.set_alpha(alpha)
-    for y in range(0, h, 4):
-        pygame.draw.line(sl, (0, 0, 0), (0, y), (w, y), 1)
-    surface.blit(sl, (0, 0))
+    size = surface.get_size()
+    blit_layer(surface, "scanlines", (size, alpha), lambda: _render_scanlines(size, alpha))
+
+
+class DirtyRects:
+    """
+    Muuttuneiden alueiden seuranta. Ruutu piirretään kuten ennenkin, mutta
+    näytölle viedään vain alueet, joiden tila muuttui edellisestä ruudusta
+    (ui.present). config.DIRTY_RECTS = False -> koko ruutu.
+    """
+
+    def __init__(self, screen):
+        self.screen = screen
+        self._regions = {}     # avain -> (rect tai None, tila)
+        self._dirty = []
+        self._debug_prev = []  # edellisen ruudun debug-kehykset (pyyhitään)
+        self._full = True
+
+    def invalidate(self):
+        """Koko ruutu päivitetään seuraavalla present()-kutsulla."""
+        self._full = True
+
+    def add(self, rect):
+        self._dirty.append(pygame.Rect(rect))
+
+    def track(self, key, rect, state=None):
+        """Alue `key` sijainnissa rect (None = ei näkyvissä) ja tilalla state."""
+        if rect is not None:
+            rect = pygame.Rect(rect)
+        prev = self._regions.get(key)
+        if prev is not None and prev[0] == rect and prev[1] == state:
+            return
+        if prev is not None and prev[0] is not None:
+            self._dirty.append(prev[0])
+        if rect is not None:
+            self._dirty.append(rect)
+        self._regions[key] = (rect, state)
+
+    def present(self):
+        """Vie ruudun näytölle: muuttuneet alueet tai koko ruutu."""
+        if not config.DIRTY_RECTS or self._full:
+            self._full = False
+            self._dirty = []
+            self._debug_prev = []
+            present(self.screen)
+            return
+        rects = self._dirty
+        self._dirty = []
+        if config.DEBUG_DIRTY_RECTS:
+            outlines = [r.inflate(2, 2) for r in rects]
+            for r in outlines:
+                pygame.draw.rect(self.screen, (255, 0, 255), r, 1)
+            rects = rects + outlines + self._debug_prev
+            self._debug_prev = outlines
+        present(self.screen, rects)
+